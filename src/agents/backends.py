@@ -0,0 +1,67 @@
+import importlib
+import os
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'models')
+
+# Registrierte KI-Backends. Klassen stehen hier nur als Importpfad ('modul:Name'):
+# PyTorch, TensorFlow oder crewai/langchain werden erst importiert, wenn ein Team
+# das Backend tatsächlich auswählt.
+#   policy:     Steuerung für die Simulation (None = AIAgent mit BFS)
+#   agent:      vollständige Agenten-Klasse (KI_Torch, KI_TensorFlow, BaseAgent)
+#   model_file: Gewichte in models/, die der Policy übergeben werden
+_BACKENDS = {}
+
+# Schreibweisen aus dem GameSetupDialog und der Kommandozeile
+_ALIASES = {'': 'bfs', 'none': 'bfs', 'pytorch': 'torch', 'tf': 'tensorflow', 'ollama': 'llm'}
+
+
+def register_backend(name, policy=None, agent=None, model_file=None):
+    """Meldet ein Backend an. Importiert wird dabei noch nichts."""
+    _BACKENDS[name.lower()] = {'policy': policy, 'agent': agent, 'model_file': model_file}
+
+
+register_backend('bfs')
+register_backend('torch', policy='src.agents.model_policy:TorchPolicy',
+                 agent='src.agents.ki_torch:KI_Torch', model_file='ki_torch_model_1.pt')
+register_backend('tensorflow', policy='src.agents.model_policy:TensorFlowPolicy',
+                 agent='src.agents.ki_tensorflow:KI_TensorFlow', model_file='ki_tensorflow_model_1.h5')
+register_backend('llm', policy='src.agents.llm_policy:LLMPolicy', agent='src.agents.base_agent:BaseAgent')
+
+
+def backend_name(ai_model):
+    """Normalisiert ein ai_model ('Torch', 'BFS', None, ...) auf den Namen in der Registry."""
+    name = (ai_model or '').strip().lower()
+    name = _ALIASES.get(name, name)
+    if name not in _BACKENDS:
+        raise ValueError(f"Unbekanntes KI-Modell: {ai_model}")
+    return name
+
+
+def available_backends():
+    return list(_BACKENDS)
+
+
+def _import(path):
+    module_name, attribute = path.split(':')
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def create_policy(ai_model):
+    """
+    Baut die Steuerung für ein Team. Erst hier wird das Modul des Backends
+    importiert; Modellgewichte lädt die Policy beim ersten Forward-Pass.
+    Gibt None für Teams zurück, die mit dem AIAgent laufen.
+    """
+    backend = _BACKENDS[backend_name(ai_model)]
+    if backend['policy'] is None:
+        return None
+    policy_class = _import(backend['policy'])
+    if backend['model_file']:
+        return policy_class(os.path.join(MODELS_DIR, backend['model_file']))
+    return policy_class()
+
+
+def agent_class(ai_model):
+    """Agenten-Klasse eines Backends (importiert das Modul erst bei Bedarf), None für BFS."""
+    backend = _BACKENDS[backend_name(ai_model)]
+    return _import(backend['agent']) if backend['agent'] else None
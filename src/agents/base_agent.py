@@ -1,25 +1,51 @@
 import os
 import json
-from crewai import Agent
-from langchain_community.llms import Ollama
-from langchain_core.tools import StructuredTool
 import random
+import collections
 from typing import Dict, Any
+from src.game_logic.grid import Grid
+from src.agents.message_bus import LLM_MODEL, build_prompt, get_message_bus, parse_plan
 
 class BaseAgent:
     """
     Basisklasse für alle KI-Agenten, die die Kernfunktionen wie
     Modellverwaltung und Kommunikation bereitstellt.
+
+    Ollama-Client und CrewAI-Agent (samt crewai/langchain) werden erst beim
+    ersten Zugriff auf `llm` bzw. `crewai_agent` angelegt, damit Soldaten ohne
+    LLM (BFS, Torch, TensorFlow) nichts davon laden.
+
+    Eingehende Nachrichten gehen als Anfrage an den MessageBus, der das LLM
+    asynchron befragt. Die Antwort wird in einem späteren check_inbox als
+    `plan` übernommen; das Spiel wartet dabei nie auf das Sprachmodell.
     """
-    def __init__(self, name, model_name=None, team_mate=None, map_data=None):
+    def __init__(self, name, model_name=None, team_mate=None, map_data=None, message_bus=None):
         self.name = name
         self.model = None
         self.model_name = model_name
         self.team_mate = team_mate
-        self.inbox = []
+        self.inbox = collections.deque()
         self.map_data = map_data
-        self.llm = Ollama(model="llama2")
-        self.crewai_agent = self._create_crewai_agent()
+        self._grid = None
+        self._grid_source = None # map_data, aus der _grid erzeugt wurde
+        self.message_bus = message_bus
+        self.plan = None # letzter Plan aus einer LLM-Antwort, z.B. {'target': (x, y)}
+        self._pending_replies = [] # offene Anfragen an den MessageBus (Futures)
+        self._llm = None
+        self._crewai_agent = None
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            from langchain_community.llms import Ollama
+            self._llm = Ollama(model=LLM_MODEL)
+        return self._llm
+
+    @property
+    def crewai_agent(self):
+        if self._crewai_agent is None:
+            self._crewai_agent = self._create_crewai_agent()
+        return self._crewai_agent
 
     def _send_message_action(self, recipient_name: str, message: str) -> str:
         """Interner Helfer, der die eigentliche Nachrichtenaktion durchführt."""
@@ -33,6 +59,9 @@ class BaseAgent:
         """
         Erstellt einen CrewAI-Agenten für die Kommunikation.
         """
+        from crewai import Agent
+        from langchain_core.tools import StructuredTool
+
         send_message_tool_instance = StructuredTool.from_function(
             func=self._send_message_action,
             name="send_message_tool",
@@ -66,25 +95,44 @@ class BaseAgent:
             print(f"INFO: '{self.name}' sendet Nachricht an '{recipient.name}': {message}")
 
     def check_inbox(self):
-        messages_to_process = self.inbox.copy()
-        self.inbox.clear()
-        
-        for message in messages_to_process:
-            self._process_message(message)
+        """Übernimmt fertige LLM-Antworten und schickt neue Nachrichten ab, ohne zu warten."""
+        self._collect_replies()
+        while self.inbox:
+            self._process_message(self.inbox.popleft())
 
     def _process_message(self, message):
         print(f"INFO: '{self.name}' verarbeitet Nachricht: {message}")
+        bus = self.message_bus or get_message_bus()
+        self._pending_replies.append(bus.request(build_prompt(message)))
+
+    def _collect_replies(self):
+        pending = []
+        for future in self._pending_replies:
+            if not future.done():
+                pending.append(future)
+                continue
+            try:
+                plan = parse_plan(future.result())
+            except Exception as e:
+                print(f"WARNUNG: '{self.name}' hat keine LLM-Antwort erhalten: {e}")
+                continue
+            if plan is not None:
+                self.plan = plan
+        self._pending_replies = pending
+
+    @property
+    def grid(self):
+        """Karte als Grid; wird nur neu erzeugt, wenn map_data ersetzt wurde."""
+        if self._grid is None or self._grid_source is not self.map_data:
+            self._grid = Grid.from_map_data(self.map_data)
+            self._grid_source = self.map_data
+        return self._grid
 
     def _send_fake_flag_message(self, opposing_team_mate):
         if self.map_data:
-            map_height = len(self.map_data)
-            map_width = max(len(row) for row in self.map_data)
-            x = random.randint(0, map_width - 1)
-            y = random.randint(0, map_height - 1)
-            while self.map_data[y][x] == '#':
-                x = random.randint(0, map_width - 1)
-                y = random.randint(0, map_height - 1)
-            fake_coords = (x, y)
+            fake_coords = self.grid.random_free_cell()
+            if fake_coords is None:
+                return
             message = f"Dringend! Ich habe die Flagge bei {fake_coords} gefunden! Beweg dich schnell dorthin!"
             print(f"WARN: {self.name} hat ein Fake-Flag-Item eingesammelt und sendet eine gefälschte Nachricht an {opposing_team_mate.name}.")
             opposing_team_mate.inbox.append(message)
\ No newline at end of file
@@ -3,44 +3,61 @@ import json
 import numpy as np
 import tensorflow as tf
 from src.agents.base_agent import BaseAgent # <-- Hier wurde der Import-Pfad korrigiert
+from src.game_logic.observation import OBSERVATION_SIZE
+from src.agents.backends import MODELS_DIR
+from src.agents.model_cache import shared_tensorflow_model, release
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense, Flatten
 from tensorflow.keras.optimizers import Adam
 
+def build_model(state_size, action_size):
+    """Erstellt das neuronale Netzwerk (auch ohne Agent nutzbar, z.B. im Match-Runner)."""
+    model = Sequential([
+        Dense(64, input_shape=(state_size,), activation='relu'),
+        Dense(64, activation='relu'),
+        Dense(action_size, activation='linear')
+    ])
+    model.compile(loss='mse', optimizer=Adam(learning_rate=0.001))
+    return model
+
 class KI_TensorFlow(BaseAgent):
     """
     Ein KI-Agent, der auf einem TensorFlow/Keras-Modell basiert.
     """
     def __init__(self, name, model_name=None, team_mate=None, map_data=None):
         super().__init__(name, model_name=model_name, team_mate=team_mate, map_data=map_data)
-        self.state_size = 100 # Beispielgröße, muss an den Spielzustand angepasst werden
+        self.state_size = OBSERVATION_SIZE # Feste Größe aus dem ObservationEncoder
         self.action_size = 5  # Beispielgröße: Oben, Unten, Links, Rechts, Nichts
-        self.model = self._build_model()
-        
-        # Lade ein gespeichertes Modell, falls vorhanden
-        if model_name and os.path.exists(f'models/{model_name}'):
-            self.model.load_weights(f'models/{model_name}')
+        # Gemeinsames Modell aus dem model_cache (einmal pro Prozess geladen)
+        if model_name:
+            self.model = shared_tensorflow_model(os.path.join(MODELS_DIR, model_name),
+                                                 self.state_size, self.action_size, owner=self)
+        else:
+            self.model = self._build_model()
+        self._predict = self._compile_predict()
 
     def _build_model(self):
         """Erstellt das neuronale Netzwerk."""
-        model = Sequential([
-            Dense(64, input_shape=(self.state_size,), activation='relu'),
-            Dense(64, activation='relu'),
-            Dense(self.action_size, activation='linear')
-        ])
-        model.compile(loss='mse', optimizer=Adam(learning_rate=0.001))
-        return model
+        return build_model(self.state_size, self.action_size)
+
+    def _compile_predict(self):
+        """Kompilierte Vorhersage mit variabler Stapelgröße statt model.predict() pro Aufruf."""
+        model = self.model
+        return tf.function(lambda states: model(states, training=False),
+                           input_signature=[tf.TensorSpec([None, self.state_size], tf.float32)])
 
     def choose_action(self, game_state):
         """
         Wählt basierend auf dem Spielzustand eine Aktion aus.
         """
-        # Annahme: game_state ist ein NumPy-Array oder kann in eines umgewandelt werden
+        # Ein GameState wird über den ObservationEncoder in einen Vektor fester Länge übersetzt
+        if hasattr(game_state, 'get_state_for_ki'):
+            game_state = game_state.get_state_for_ki(self.name)
         if game_state.shape != (1, self.state_size):
             game_state = np.reshape(game_state, [1, self.state_size])
 
         # Nutze das Modell, um eine Aktion vorherzusagen
-        q_values = self.model.predict(game_state)
+        q_values = self._predict(np.asarray(game_state, dtype=np.float32)).numpy()
         action_index = np.argmax(q_values[0])
         
         # Konvertiere den Index zurück in eine Spielaktion
@@ -56,7 +73,11 @@ class KI_TensorFlow(BaseAgent):
     def load_model(self, file_path):
         """Lädt ein gespeichertes Modell."""
         if os.path.exists(file_path):
+            # Eigenes Modell statt des gemeinsamen aus dem model_cache überschreiben
+            self.model = self._build_model()
             self.model.load_weights(file_path)
+            self._predict = self._compile_predict()
+            release(self) # Referenz auf das gemeinsame Modell wird nicht mehr gebraucht
             print(f"TensorFlow-Modell von {self.name} unter '{file_path}' geladen.")
         else:
             print(f"Warnung: Modell-Datei '{file_path}' nicht gefunden.")
\ No newline at end of file
@@ -4,6 +4,9 @@ import os
 import random
 from .base_agent import BaseAgent
 from src.game_logic.game_state import GameState # Importiere die GameState Klasse
+from src.game_logic.observation import OBSERVATION_SIZE
+from src.agents.backends import MODELS_DIR
+from src.agents.model_cache import shared_torch_model, release
 
 class SimpleNet(nn.Module):
     """
@@ -24,6 +27,29 @@ class SimpleNet(nn.Module):
         x = self.fc3(x)
         return x
 
+def save_weights(model, file_path):
+    """
+    Speichert die Gewichte eines Modells. Geschrieben wird erst in eine temporäre
+    Datei, die dann umbenannt wird: Agenten, die gleichzeitig laden (model_cache),
+    sehen nie eine halb geschriebene Datei.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    temp_path = file_path + '.tmp'
+    torch.save(model.state_dict(), temp_path)
+    os.replace(temp_path, file_path)
+
+def load_weights(model, file_path):
+    """Lädt Gewichte in ein Modell; gibt False zurück, wenn die Datei fehlt oder nicht passt."""
+    if not os.path.exists(file_path):
+        print(f"Warnung: Modell-Datei '{file_path}' nicht gefunden.")
+        return False
+    try:
+        model.load_state_dict(torch.load(file_path, map_location='cpu', weights_only=True))
+    except Exception as e:
+        print(f"WARNUNG: Torch-Modell '{file_path}' konnte nicht geladen werden: {e}")
+        return False
+    return True
+
 class KI_Torch(BaseAgent):
     """
     KI-Agent, der ein PyTorch-Modell verwendet und die Logik für
@@ -32,11 +58,15 @@ class KI_Torch(BaseAgent):
     def __init__(self, name, model_name="ki_torch_model_1.pt"):
         super().__init__(name, model_name)
         # Die Größe der Ein- und Ausgänge muss an das Spiel angepasst werden
-        self.input_size = 50  # Beispielwert, muss an die Größe des GameState-Vektors angepasst werden
+        self.input_size = OBSERVATION_SIZE  # Feste Größe aus dem ObservationEncoder
         self.output_size = 5  # Beispielwert: 5 mögliche Aktionen (z.B. Oben, Unten, Links, Rechts, Pass)
         
-        self.model = SimpleNet(self.input_size, self.output_size)
-        self.load_model()
+        # Gemeinsames, schreibgeschütztes Modell aus dem model_cache (einmal pro Prozess geladen)
+        if model_name:
+            self.model = shared_torch_model(os.path.join(MODELS_DIR, model_name),
+                                            self.input_size, self.output_size, owner=self)
+        else:
+            self.model = SimpleNet(self.input_size, self.output_size)
     
     def choose_action(self, game_state: GameState):
         """
@@ -80,9 +110,9 @@ class KI_Torch(BaseAgent):
         processed_state = self._preprocess_state(game_state)
         
         if self.model:
-            state_tensor = torch.tensor(processed_state, dtype=torch.float32)
+            state_tensor = torch.from_numpy(processed_state) # teilt sich den Speicher, keine Kopie
             
-            with torch.no_grad():
+            with torch.inference_mode():
                 output = self.model(state_tensor)
             
             action_index = torch.argmax(output).item()
@@ -111,13 +141,11 @@ class KI_Torch(BaseAgent):
 
     def _preprocess_state(self, game_state):
         """
-        Bereitet den GameState für die KI auf.
+        Bereitet den GameState für die KI auf (Vektor fester Länge, wiederverwendeter Puffer).
         """
-        state_vector = [
-            game_state.get_player_health(self.name),
-            *game_state.get_player_position(self.name)
-        ]
-        return state_vector + [0] * (self.input_size - len(state_vector))
+        if getattr(self, '_state_buffer', None) is None:
+            self._state_buffer = game_state.observation_encoder.allocate()
+        return game_state.get_state_for_ki(self.name, out=self._state_buffer)
 
     def _map_action_index_to_action(self, index):
         """
@@ -126,14 +154,27 @@ class KI_Torch(BaseAgent):
         actions = ['move_up', 'move_down', 'move_left', 'move_right', 'do_nothing']
         return actions[index]
 
-    def save_model(self):
-        # ... (Methoden bleiben unverändert)
-        pass
+    def save_model(self, file_path=None):
+        """Speichert das Modell (ohne Pfad unter models/<model_name>)."""
+        file_path = file_path or os.path.join(self._get_model_directory(), self.model_name)
+        save_weights(self.model, file_path)
+        print(f"Torch-Modell von {self.name} unter '{file_path}' gespeichert.")
 
-    def load_model(self):
-        # ... (Methoden bleiben unverändert)
-        pass
+    def load_model(self, file_path=None):
+        """
+        Lädt ein gespeichertes Modell (ohne Pfad aus models/<model_name>) in ein
+        eigenes SimpleNet, damit das gemeinsame Modell aus dem model_cache
+        unverändert bleibt.
+        """
+        file_path = file_path or os.path.join(self._get_model_directory(), self.model_name)
+        model = SimpleNet(self.input_size, self.output_size)
+        if load_weights(model, file_path):
+            model.eval()
+            self.model = model
+            release(self) # Referenz auf das gemeinsame Modell wird nicht mehr gebraucht
+            print(f"Torch-Modell von {self.name} unter '{file_path}' geladen.")
+            return True
+        return False
 
     def _get_model_directory(self):
-        # ... (Methoden bleiben unverändert)
-        pass
+        return MODELS_DIR
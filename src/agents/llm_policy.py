@@ -0,0 +1,72 @@
+from src.agents.base_agent import BaseAgent
+from src.game_logic.ai_agent import AIAgent
+
+
+class LLMPolicy:
+    """
+    Steuert die Soldaten eines Teams mit LLM-Kommunikation. Bewegt wird wie beim
+    AIAgent (ein Sprachmodell ist für jeden Tick zu langsam); jeder Soldat bekommt
+    einen BaseAgent, über den er mit seinem Teammate Nachrichten austauscht.
+    Ollama-Client und CrewAI-Agent entstehen erst, wenn ein Agent sie wirklich braucht.
+
+    Wird ein Soldat getroffen, ruft er seinen Teammate zu Hilfe. Die Antwort des
+    LLM kommt asynchron über den MessageBus und wird in einem späteren Tick als
+    Ziel übernommen, bis der Soldat dort ankommt.
+
+    Der Match-Runner hält eine Instanz pro Worker über viele Partien. Sobald ein
+    neuer GameState (also eine neue Runde) auftaucht, werden deshalb alle
+    Agenten, Teammates, offenen Anfragen und Pläne der alten Runde verworfen.
+    """
+    def __init__(self, message_bus=None):
+        self.message_bus = message_bus
+        self.agents = {} # soldier_id -> BaseAgent
+        self._waiting_for_mate = {} # Team -> BaseAgent ohne Teammate
+        self._last_health = {} # soldier_id -> Gesundheit im letzten Tick
+        self._game_state = None
+        self._ai_agent = None
+
+    def reset(self):
+        """Verwirft den Zustand der laufenden Runde (Agenten, offene LLM-Anfragen, Pläne)."""
+        for agent in self.agents.values():
+            for future in agent._pending_replies:
+                future.cancel()
+        self.agents = {}
+        self._waiting_for_mate = {}
+        self._last_health = {}
+        self._game_state = None
+        self._ai_agent = None
+
+    def agent_for(self, soldier, game_state):
+        agent = self.agents.get(soldier.soldier_id)
+        if agent is None:
+            agent = BaseAgent(name=soldier.soldier_id, message_bus=self.message_bus)
+            mate = self._waiting_for_mate.pop(soldier.team, None)
+            if mate is not None:
+                agent.set_team_mate(mate)
+                mate.set_team_mate(agent)
+            else:
+                self._waiting_for_mate[soldier.team] = agent
+            self.agents[soldier.soldier_id] = agent
+        agent.map_data = game_state.map_data
+        return agent
+
+    def __call__(self, soldier, game_state):
+        if self._game_state is not game_state:
+            self.reset()
+            self._game_state = game_state
+            self._ai_agent = AIAgent(game_state)
+        agent = self.agent_for(soldier, game_state)
+
+        last_health = self._last_health.get(soldier.soldier_id, soldier.health)
+        self._last_health[soldier.soldier_id] = soldier.health
+        if soldier.health < last_health:
+            agent.send_message(agent.team_mate, f"Hilfe! Ich werde bei {soldier.position} angegriffen!")
+        agent.check_inbox()
+
+        if agent.plan is not None:
+            target = agent.plan['target']
+            next_pos = self._ai_agent.get_move_towards(soldier, target)
+            if next_pos != soldier.position:
+                return next_pos
+            agent.plan = None # Ziel erreicht oder unerreichbar
+        return self._ai_agent.get_move(soldier)
@@ -0,0 +1,188 @@
+import asyncio
+import collections
+import importlib.util
+import re
+import threading
+
+# Lokales Ollama-Modell für die Team-Kommunikation
+LLM_MODEL = "llama2"
+
+# Antwort, wenn das LLM nicht rechtzeitig (oder gar nicht) antwortet
+FALLBACK_REPLY = "WARTEN"
+DEFAULT_TIMEOUT = 2.0 # Sekunden pro Anfrage
+DEFAULT_CONCURRENCY = 2 # gleichzeitige Anfragen an das LLM
+DEFAULT_CACHE_SIZE = 256
+
+PROMPT_TEMPLATE = ("Du bist ein Soldat in MAZE-AI WAR. Dein Teammate schreibt: \"{message}\"\n"
+                   "Antworte nur mit 'ZIEL x,y', wenn du zu diesem Feld gehen sollst, sonst mit 'WARTEN'.")
+
+_COORDINATES = re.compile(r"(-?\d+)\s*,\s*(-?\d+)")
+
+
+def build_prompt(message):
+    return PROMPT_TEMPLATE.format(message=message)
+
+
+def normalize_prompt(prompt):
+    """Schlüssel für Cache und Zusammenfassen: Groß-/Kleinschreibung und Leerraum egal."""
+    return " ".join(prompt.lower().split())
+
+
+def parse_plan(reply):
+    """Übersetzt eine LLM-Antwort in einen Plan ({'target': (x, y)}) oder None."""
+    if not reply or "ZIEL" not in reply.upper():
+        return None
+    match = _COORDINATES.search(reply)
+    if match is None:
+        return None
+    return {'target': (int(match.group(1)), int(match.group(2)))}
+
+
+class StubLLM:
+    """
+    Deterministisches Ersatz-LLM für Tests ohne Ollama: schickt den Soldaten zu
+    den ersten Koordinaten der Nachricht, sonst WARTEN.
+    """
+    async def generate(self, prompt):
+        match = _COORDINATES.search(prompt)
+        if match is None:
+            return FALLBACK_REPLY
+        return f"ZIEL {match.group(1)},{match.group(2)}"
+
+
+class OllamaLLM:
+    """Ollama über langchain; der Client wird erst bei der ersten Anfrage angelegt."""
+    def __init__(self, model=LLM_MODEL):
+        self.model = model
+        self._llm = None
+
+    def _invoke(self, prompt):
+        if self._llm is None:
+            from langchain_community.llms import Ollama
+            self._llm = Ollama(model=self.model)
+        return self._llm.invoke(prompt)
+
+    async def generate(self, prompt):
+        # Der blockierende Aufruf läuft im Thread-Pool, nicht in der Event-Loop
+        return await asyncio.to_thread(self._invoke, prompt)
+
+
+def default_llm():
+    if importlib.util.find_spec('langchain_community') is None:
+        print("INFO: langchain_community nicht installiert, Team-Kommunikation nutzt das Stub-LLM.")
+        return StubLLM()
+    return OllamaLLM()
+
+
+class LLMClientPool:
+    """
+    Gemeinsamer Zugang aller Agenten zum LLM (läuft in der Event-Loop des MessageBus).
+
+    - höchstens `max_concurrency` Anfragen gleichzeitig (Semaphore)
+    - gleiche offene Anfragen (nach normalize_prompt) werden zu einer zusammengefasst
+    - Antworten landen in einem LRU-Cache mit `cache_size` Einträgen
+    - jede Anfrage hat eine Frist (`timeout`); danach gibt es `fallback`, die
+      eigentliche Anfrage läuft weiter und füllt später den Cache
+    """
+    def __init__(self, llm=None, max_concurrency=DEFAULT_CONCURRENCY, cache_size=DEFAULT_CACHE_SIZE,
+                 timeout=DEFAULT_TIMEOUT, fallback=FALLBACK_REPLY):
+        self.llm = llm or default_llm()
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self.fallback = fallback
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._cache = collections.OrderedDict() # Prompt-Schlüssel -> Antwort
+        self._pending = {} # Prompt-Schlüssel -> laufender Task
+        self.stats = {'requests': 0, 'llm_calls': 0, 'cache_hits': 0, 'coalesced': 0,
+                      'timeouts': 0, 'errors': 0}
+
+    async def ask(self, prompt, timeout=None):
+        self.stats['requests'] += 1
+        key = normalize_prompt(prompt)
+        if key in self._cache:
+            self.stats['cache_hits'] += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._call(key, prompt))
+            self._pending[key] = task
+        else:
+            self.stats['coalesced'] += 1
+        try:
+            # shield: eine abgelaufene Frist bricht die gemeinsame Anfrage nicht ab
+            return await asyncio.wait_for(asyncio.shield(task), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            return self.fallback
+
+    async def _call(self, key, prompt):
+        try:
+            async with self._semaphore:
+                self.stats['llm_calls'] += 1
+                reply = await self.llm.generate(prompt)
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"WARNUNG: LLM-Anfrage fehlgeschlagen: {e}")
+            return self.fallback
+        finally:
+            self._pending.pop(key, None)
+        self._cache[key] = reply
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return reply
+
+
+class MessageBus:
+    """
+    Führt die LLM-Anfragen der Agenten in einer asyncio-Event-Loop auf einem
+    eigenen Daemon-Thread aus. `request` kehrt sofort mit einem Future zurück;
+    der Spiel-Tick wartet nie auf ein Sprachmodell, sondern übernimmt fertige
+    Antworten in einem späteren Tick (siehe BaseAgent.check_inbox).
+    """
+    def __init__(self, pool=None):
+        self._pool = pool
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = LLMClientPool()
+        return self._pool
+
+    @property
+    def loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="message-bus", daemon=True)
+                self._thread.start()
+        return self._loop
+
+    def request(self, prompt, timeout=None):
+        """Stellt eine Anfrage an das LLM; liefert ein concurrent.futures.Future mit der Antwort."""
+        return asyncio.run_coroutine_threadsafe(self.pool.ask(prompt, timeout), self.loop)
+
+    def close(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+
+
+_default_bus = None
+
+
+def get_message_bus():
+    """Prozessweiter MessageBus (wird beim ersten Aufruf angelegt)."""
+    global _default_bus
+    if _default_bus is None:
+        _default_bus = MessageBus()
+    return _default_bus
@@ -0,0 +1,134 @@
+import os
+import threading
+import weakref
+from concurrent.futures import Future
+
+# Prozessweiter Cache geladener Modelle: (Backend, Datei, mtime) -> {'future': Future, 'refs': n}
+_models = {}
+_lock = threading.Lock()
+# Besitzer -> Finalizer seiner Referenzen (werden bei release() abgehängt)
+_finalizers = weakref.WeakKeyDictionary()
+
+
+def _key(backend, model_path):
+    path = os.path.abspath(model_path)
+    # Eine neu gespeicherte Datei (andere mtime) ergibt einen neuen Eintrag
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    return (backend, path, mtime)
+
+
+def acquire(backend, model_path, loader, owner=None):
+    """
+    Liefert das gemeinsame, schreibgeschützte Modell für `model_path`. `loader(model_path)`
+    wird nur beim ersten Zugriff aufgerufen; alle Soldaten und Teams bekommen dasselbe
+    Objekt. Geladen wird außerhalb der globalen Sperre: gleichzeitige Anfragen für
+    dasselbe Modell warten auf dessen Future, andere Modelle laden parallel.
+
+    Mit `owner` wird die Referenz freigegeben, sobald der Besitzer (Policy, Agent)
+    vom Garbage Collector entfernt wird oder `release(owner)` aufruft. Ohne Besitzer
+    bleibt das Modell bis zum Prozessende im Cache.
+    """
+    key = _key(backend, model_path)
+    with _lock:
+        entry = _models.get(key)
+        loading = entry is None
+        if loading:
+            entry = {'future': Future(), 'refs': 0}
+            _models[key] = entry
+        entry['refs'] += 1
+
+    if loading:
+        try:
+            entry['future'].set_result(loader(model_path))
+        except BaseException as e:
+            # Fehlgeschlagene Ladevorgänge nicht cachen; Wartende bekommen denselben Fehler
+            with _lock:
+                if _models.get(key) is entry:
+                    del _models[key]
+            entry['future'].set_exception(e)
+            raise
+    model = entry['future'].result()
+
+    if owner is not None:
+        # Der Finalizer hängt am Eintrag selbst, nicht am Schlüssel: ein später neu
+        # geladenes Modell unter demselben Schlüssel wird davon nicht berührt
+        finalizer = weakref.finalize(owner, _release_entry, key, entry)
+        with _lock:
+            _finalizers.setdefault(owner, []).append(finalizer)
+    return model
+
+
+def _release_entry(key, entry):
+    with _lock:
+        entry['refs'] -= 1
+        if entry['refs'] <= 0 and _models.get(key) is entry:
+            del _models[key]
+
+
+def release(owner):
+    """
+    Gibt alle Referenzen frei, die `owner` über acquire erhalten hat (z.B. wenn ein
+    Agent ein eigenes Modell lädt). Die Finalizer werden dabei ausgelöst und damit
+    abgehängt, sodass später nichts doppelt freigegeben wird.
+    """
+    with _lock:
+        finalizers = _finalizers.pop(owner, [])
+    for finalizer in finalizers:
+        finalizer()
+
+
+def cached_models():
+    """Schlüssel und Referenzzähler aller geladenen Modelle (für Diagnose)."""
+    with _lock:
+        return {key: entry['refs'] for key, entry in _models.items()}
+
+
+def load_torch_model(model_path, input_size, output_size):
+    """
+    SimpleNet mit den Gewichten aus `model_path`. Die Gewichte werden per mmap
+    eingeblendet und direkt als Parameter übernommen (assign): die Seiten liegen
+    einmal im Page-Cache und werden von allen Worker-Prozessen geteilt.
+    """
+    import torch
+    from src.agents.ki_torch import SimpleNet
+
+    model = SimpleNet(input_size, output_size)
+    if os.path.exists(model_path):
+        try:
+            try:
+                state_dict = torch.load(model_path, map_location='cpu', mmap=True, weights_only=True)
+                model.load_state_dict(state_dict, assign=True)
+            except (TypeError, RuntimeError):
+                # Ältere torch-Versionen bzw. Dateien im Altformat: normal laden
+                model.load_state_dict(torch.load(model_path, map_location='cpu'))
+            print(f"INFO: Torch-Modell '{model_path}' geladen.")
+        except Exception as e:
+            print(f"WARNUNG: Torch-Modell '{model_path}' konnte nicht geladen werden: {e}")
+    model.eval()
+    model.requires_grad_(False)
+    return model
+
+
+def load_tensorflow_model(model_path, state_size, action_size):
+    """Keras-Modell mit den Gewichten aus `model_path` (HDF5 lässt sich nicht einblenden)."""
+    from src.agents.ki_tensorflow import build_model
+
+    model = build_model(state_size, action_size)
+    if os.path.exists(model_path):
+        try:
+            model.load_weights(model_path)
+            print(f"INFO: TensorFlow-Modell '{model_path}' geladen.")
+        except Exception as e:
+            print(f"WARNUNG: TensorFlow-Modell '{model_path}' konnte nicht geladen werden: {e}")
+    model.trainable = False
+    return model
+
+
+def shared_torch_model(model_path, input_size, output_size, owner=None):
+    return acquire(('torch', input_size, output_size), model_path,
+                   lambda path: load_torch_model(path, input_size, output_size), owner)
+
+
+def shared_tensorflow_model(model_path, state_size, action_size, owner=None):
+    return acquire(('tensorflow', state_size, action_size), model_path,
+                   lambda path: load_tensorflow_model(path, state_size, action_size), owner)
@@ -0,0 +1,87 @@
+import os
+from src.game_logic.grid import Grid
+from src.game_logic.observation import OBSERVATION_SIZE, ACTION_DELTAS, apply_action
+
+
+class TorchPolicy:
+    """
+    Steuert die Soldaten eines Teams mit dem SimpleNet aus ki_torch, ohne einen
+    vollständigen KI_Torch-Agenten (und dessen LLM) anzulegen. Der Zustandsvektor
+    kommt wie bei KI_Torch aus dem ObservationEncoder. PyTorch und die Gewichte
+    werden erst beim ersten Forward-Pass geladen (über den model_cache).
+    `forward` rechnet einen ganzen Stapel Beobachtungen in einem Durchlauf
+    (genutzt vom InferenceScheduler).
+    """
+    def __init__(self, model_path, input_size=OBSERVATION_SIZE, output_size=5):
+        self.model_path = model_path
+        self.input_size = input_size
+        self.output_size = output_size
+        self.model = None # wird beim ersten Forward-Pass geladen
+        self._buffer = None
+
+    def _load(self):
+        import torch
+        from src.agents.model_cache import shared_torch_model
+
+        self.torch = torch
+        # Gemeinsames Modell aller Policies und Agenten mit derselben Datei
+        self.model = shared_torch_model(self.model_path, self.input_size, self.output_size, owner=self)
+        self._actions = torch.empty(0, dtype=torch.long) # wiederverwendeter Ausgabepuffer
+
+    def forward(self, observations):
+        """Aktions-Indizes für einen Stapel Beobachtungen (B, input_size) in einem Durchlauf."""
+        if self.model is None:
+            self._load()
+        count = len(observations)
+        if len(self._actions) < count:
+            self._actions = self.torch.empty(max(count, 2 * len(self._actions)), dtype=self.torch.long)
+        actions = self._actions[:count]
+        with self.torch.inference_mode():
+            logits = self.model(self.torch.from_numpy(observations))
+            self.torch.argmax(logits, dim=1, out=actions)
+        return actions.numpy()
+
+    def __call__(self, soldier, game_state):
+        if self._buffer is None:
+            self._buffer = game_state.observation_encoder.allocate(1)
+        state = game_state.get_state_for_ki(soldier.soldier_id, out=self._buffer)
+        action_index = int(self.forward(state.reshape(1, self.input_size))[0])
+        return apply_action(Grid.from_map_data(game_state.map_data), soldier.position, action_index)
+
+
+class TensorFlowPolicy:
+    """
+    Steuert die Soldaten eines Teams mit dem Keras-Modell aus ki_tensorflow.
+    Der Zustand kommt wie bei KI_TensorFlow aus dem ObservationEncoder.
+    TensorFlow und die Gewichte werden erst beim ersten Forward-Pass geladen.
+    Die Vorhersage ist eine kompilierte tf.function mit variabler Stapelgröße
+    (kein predict() pro Soldat).
+    """
+    def __init__(self, model_path, state_size=OBSERVATION_SIZE, action_size=5):
+        self.model_path = model_path
+        self.state_size = state_size
+        self.action_size = action_size
+        self.model = None # wird beim ersten Forward-Pass gebaut und geladen
+        self._buffer = None
+
+    def _load(self):
+        import tensorflow as tf
+        from src.agents.model_cache import shared_tensorflow_model
+
+        self.model = shared_tensorflow_model(self.model_path, self.state_size, self.action_size, owner=self)
+        self._predict = tf.function(
+            lambda observations: tf.argmax(self.model(observations, training=False), axis=1),
+            input_signature=[tf.TensorSpec([None, self.state_size], tf.float32)])
+
+    def forward(self, observations):
+        """Aktions-Indizes für einen Stapel Beobachtungen (B, state_size) in einem Durchlauf."""
+        if self.model is None:
+            self._load()
+        return self._predict(observations).numpy()
+
+    def __call__(self, soldier, game_state):
+        if self._buffer is None:
+            self._buffer = game_state.observation_encoder.allocate(1)
+        state = game_state.get_state_for_ki(soldier.soldier_id, out=self._buffer)
+        action_index = int(self.forward(state.reshape(1, self.state_size))[0])
+        return apply_action(Grid.from_map_data(game_state.map_data), soldier.position, action_index)
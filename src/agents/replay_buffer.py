@@ -0,0 +1,222 @@
+import os
+import time
+import numpy as np
+from src.game_logic.observation import OBSERVATION_SIZE
+
+
+class SumTree:
+    """
+    Binärer Summenbaum über einem flachen NumPy-Array: Blätter sind die
+    Prioritäten, jeder innere Knoten die Summe seiner Kinder. Aktualisieren und
+    Ziehen laufen für ganze Stapel gleichzeitig (eine Array-Operation pro Ebene).
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.leaves = 1
+        while self.leaves < capacity:
+            self.leaves *= 2
+        self.depth = int(np.log2(self.leaves))
+        self.tree = np.zeros(2 * self.leaves - 1, dtype=np.float64)
+
+    @property
+    def total(self):
+        return self.tree[0]
+
+    def priorities(self, indices):
+        return self.tree[indices + self.leaves - 1]
+
+    def update(self, indices, priorities):
+        nodes = np.asarray(indices) + self.leaves - 1
+        self.tree[nodes] = priorities
+        for _ in range(self.depth):
+            nodes = np.unique((nodes - 1) // 2)
+            self.tree[nodes] = self.tree[2 * nodes + 1] + self.tree[2 * nodes + 2]
+
+    def find(self, values):
+        """Blatt-Index, in dessen Prioritäts-Intervall der jeweilige Wert fällt."""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.zeros(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes + 1
+            left_sum = self.tree[left]
+            go_right = values > left_sum
+            values -= left_sum * go_right
+            nodes = left + go_right
+        return np.minimum(nodes - (self.leaves - 1), self.capacity - 1)
+
+
+class ReplayBuffer:
+    """
+    Erfahrungsspeicher fester Kapazität aus vorab angelegten NumPy-Ringpuffern
+    (Beobachtungen, Aktionen, Belohnungen, dones und der Index der
+    Folgebeobachtung); pro Übergang entsteht kein Python-Objekt.
+
+    Eingefügt wird pro Schritt für alle `num_streams` Soldaten gleichzeitig
+    (z.B. die flach gemachten (Partien, Agenten) aus VecEnv). Die Folgebeobachtung
+    wird nicht doppelt gespeichert: `next_index` zeigt auf den Platz, an dem der
+    nächste Schritt desselben Soldaten liegt. Die Übergänge des jeweils letzten
+    Schritts werden daher erst mit dem folgenden `add` ziehbar.
+
+    `prioritized=True` zieht proportional zu den Prioritäten (SumTree) und
+    liefert Importance-Sampling-Gewichte; `update_priorities` setzt sie nach dem
+    Lernschritt neu. Mit `path` liegen die Arrays als memmap-Dateien auf der
+    Platte, so dass der Speicher größer als der Arbeitsspeicher sein kann.
+    `sample` schreibt in wiederverwendete, zusammenhängende Puffer, die sich
+    direkt mit torch.from_numpy übernehmen lassen (vor dem nächsten `sample`
+    verbrauchen oder kopieren).
+    """
+    def __init__(self, capacity, num_streams=1, observation_size=OBSERVATION_SIZE, prioritized=False,
+                 alpha=0.6, beta=0.4, epsilon=1e-6, path=None, seed=None):
+        # Kapazität als Vielfaches der Ströme: ein Schritt belegt immer einen zusammenhängenden Block
+        self.capacity = max(capacity // num_streams, 2) * num_streams
+        self.num_streams = num_streams
+        self.observation_size = observation_size
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.beta = beta
+        self.epsilon = epsilon
+        self.path = path
+        self.rng = np.random.default_rng(seed)
+
+        self.observations = self._array('observations', (self.capacity, observation_size), np.float32)
+        self.actions = self._array('actions', (self.capacity,), np.int64)
+        self.rewards = self._array('rewards', (self.capacity,), np.float32)
+        self.dones = self._array('dones', (self.capacity,), np.bool_)
+        self.next_index = self._array('next_index', (self.capacity,), np.int64)
+
+        self.position = 0 # nächster Schreibplatz (Blockanfang)
+        self.size = 0 # belegte Plätze
+        self._last_slots = None # Plätze des letzten Schritts pro Strom
+        self._streams = np.arange(num_streams)
+
+        if prioritized:
+            self.tree = SumTree(self.capacity)
+            self.max_priority = 1.0
+        self._batch = {}
+
+    def _array(self, name, shape, dtype):
+        if self.path is None:
+            return np.zeros(shape, dtype=dtype)
+        os.makedirs(self.path, exist_ok=True)
+        return np.lib.format.open_memmap(os.path.join(self.path, f'{name}.npy'), mode='w+',
+                                         dtype=dtype, shape=shape)
+
+    def __len__(self):
+        """Anzahl ziehbarer Übergänge (ohne den noch offenen letzten Schritt)."""
+        return max(self.size - self.num_streams, 0)
+
+    def add(self, observations, actions, rewards, dones):
+        """
+        Speichert einen Schritt aller Ströme: Beobachtung vor der Aktion, Aktion,
+        Belohnung und Rundenende. `dones` darf pro Partie angegeben werden und wird
+        auf die Agenten verteilt (z.B. (N,) zu Aktionen der Form (N, Agenten)).
+        """
+        actions = np.asarray(actions)
+        slots = self.position + self._streams
+        self.observations[slots] = np.reshape(observations, (self.num_streams, self.observation_size))
+        self.actions[slots] = actions.reshape(-1)
+        self.rewards[slots] = np.reshape(rewards, -1)
+        dones = np.asarray(dones)
+        if dones.ndim < actions.ndim:
+            dones = dones.reshape(dones.shape + (1,) * (actions.ndim - dones.ndim))
+        dones = np.broadcast_to(dones, actions.shape).reshape(-1)
+        self.dones[slots] = dones
+        # Rundenende: keine Folgebeobachtung (zeigt auf sich selbst)
+        self.next_index[slots] = slots
+
+        if self._last_slots is not None:
+            self.next_index[self._last_slots] = np.where(self.dones[self._last_slots], self._last_slots, slots)
+        if self.prioritized:
+            # Neue Übergänge bleiben bis zum nächsten Schritt (Folgebeobachtung) mit Priorität 0
+            self.tree.update(slots, 0.0)
+            if self._last_slots is not None:
+                self.tree.update(self._last_slots, self.max_priority ** self.alpha)
+
+        self._last_slots = slots
+        self.position = (self.position + self.num_streams) % self.capacity
+        self.size = min(self.size + self.num_streams, self.capacity)
+
+    def _batch_arrays(self, batch_size):
+        batch = self._batch
+        if batch.get('size') != batch_size:
+            batch = {
+                'size': batch_size,
+                'observations': np.empty((batch_size, self.observation_size), dtype=np.float32),
+                'next_observations': np.empty((batch_size, self.observation_size), dtype=np.float32),
+                'actions': np.empty(batch_size, dtype=np.int64),
+                'rewards': np.empty(batch_size, dtype=np.float32),
+                'dones': np.empty(batch_size, dtype=np.bool_),
+                'weights': np.ones(batch_size, dtype=np.float32),
+            }
+            self._batch = batch
+        return batch
+
+    def sample(self, batch_size, beta=None):
+        """
+        Zieht `batch_size` Übergänge. Rückgabe: Dictionary mit observations,
+        actions, rewards, next_observations, dones, weights und indices.
+        """
+        if len(self) == 0:
+            raise ValueError("Der Replay-Puffer enthält noch keine vollständigen Übergänge.")
+        batch = self._batch_arrays(batch_size)
+        if self.prioritized:
+            indices = self._sample_prioritized(batch_size, batch['weights'], self.beta if beta is None else beta)
+        else:
+            # Ältester Platz + Versatz; der offene letzte Schritt liegt am Ende und wird ausgelassen
+            oldest = (self.position - self.size) % self.capacity
+            indices = (oldest + self.rng.integers(0, len(self), size=batch_size)) % self.capacity
+
+        # mode='clip': np.take schreibt dann direkt in `out` statt über einen Zwischenpuffer
+        np.take(self.observations, indices, axis=0, out=batch['observations'], mode='clip')
+        np.take(self.observations, self.next_index[indices], axis=0, out=batch['next_observations'], mode='clip')
+        np.take(self.actions, indices, out=batch['actions'], mode='clip')
+        np.take(self.rewards, indices, out=batch['rewards'], mode='clip')
+        np.take(self.dones, indices, out=batch['dones'], mode='clip')
+        result = {key: value for key, value in batch.items() if key != 'size'}
+        result['indices'] = indices
+        return result
+
+    def _sample_prioritized(self, batch_size, weights, beta):
+        # Geschichtet: ein Wert pro gleich großem Abschnitt der Gesamtpriorität
+        total = self.tree.total
+        segment = total / batch_size
+        values = (np.arange(batch_size) + self.rng.random(batch_size)) * segment
+        indices = self.tree.find(values)
+        probabilities = self.tree.priorities(indices) / total
+        np.power(len(self) * np.maximum(probabilities, 1e-12), -beta, out=weights, casting='unsafe')
+        weights /= weights.max()
+        return indices
+
+    def update_priorities(self, indices, td_errors):
+        """Neue Prioritäten aus den TD-Fehlern des letzten Lernschritts."""
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        # Noch offene Übergänge bleiben bei Priorität 0
+        open_slots = np.isin(indices, self._last_slots)
+        priorities = np.where(open_slots, 0.0, priorities ** self.alpha)
+        self.tree.update(indices, priorities)
+
+    def flush(self):
+        """Schreibt memmap-Puffer auf die Platte."""
+        for array in (self.observations, self.actions, self.rewards, self.dones, self.next_index):
+            if isinstance(array, np.memmap):
+                array.flush()
+
+
+if __name__ == '__main__':
+    # Benchmark: Dauer eines Stapels mit 256 Übergängen
+    for prioritized in (False, True):
+        buffer = ReplayBuffer(100_000, num_streams=256, prioritized=prioritized, seed=0)
+        observations = np.random.default_rng(0).random((256, OBSERVATION_SIZE), dtype=np.float32)
+        for _ in range(buffer.capacity // 256 + 1):
+            buffer.add(observations, np.zeros(256), np.ones(256), np.zeros(256, dtype=bool))
+        for _ in range(10):
+            buffer.sample(256)
+        runs = 1000
+        start = time.perf_counter()
+        for _ in range(runs):
+            batch = buffer.sample(256)
+            if prioritized:
+                buffer.update_priorities(batch['indices'], np.ones(256))
+        duration = (time.perf_counter() - start) / runs
+        print(f"{'priorisiert' if prioritized else 'gleichverteilt':>14}: {duration * 1e6:8.1f} µs pro Stapel")
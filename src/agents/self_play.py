@@ -0,0 +1,284 @@
+import os
+import queue
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from src.agents.backends import MODELS_DIR
+from src.game_logic.observation import ACTION_DELTAS
+from src.agents.replay_buffer import ReplayBuffer
+
+DEFAULT_MODEL_FILE = 'ki_torch_model_1.pt'
+
+# Standardwerte des Trainings; `train` übernimmt Abweichungen als Schlüsselwortargumente
+DEFAULT_CONFIG = {
+    'map': '31test.map',
+    'actors': 0, # 0 = alle Kerne bis auf einen (für den Lerner)
+    'envs_per_actor': 32, # Partien pro Actor (VecEnv)
+    'chunk_steps': 8, # Schritte pro Paket an den Lerner
+    'updates': 10_000,
+    'batch_size': 256,
+    'learning_rate': 1e-3,
+    'gamma': 0.99,
+    'reward_scale': 0.1, # Punkte des ScoreManagers -> Belohnung
+    'buffer_capacity': 100_000, # Übergänge insgesamt, auf die Actor-Puffer aufgeteilt (~6,8 KB pro Übergang)
+    'buffer_path': None, # Verzeichnis für memmap-Puffer auf der Platte statt im Arbeitsspeicher
+    'warmup': 2_048, # Übergänge pro Actor, bevor gelernt wird
+    'publish_every': 50, # Updates zwischen zwei Gewichts-Veröffentlichungen
+    'target_every': 500, # Updates zwischen zwei Kopien ins Zielnetz
+    'checkpoint_every': 2_000,
+    'report_seconds': 10.0,
+    'epsilon': 0.4, # Exploration des ersten Actors, weitere explorieren weniger
+    'seed': 0,
+    'model_file': DEFAULT_MODEL_FILE,
+}
+
+
+def actor_epsilons(actors, base=0.4, alpha=7):
+    """Pro Actor eine andere Exploration (von `base` bis `base ** (1 + alpha)`)."""
+    if actors == 1:
+        return [base]
+    return [base ** (1 + alpha * i / (actors - 1)) for i in range(actors)]
+
+
+def _actor(actor_id, config, epsilon, transitions, weights_name, weights_size, weights_lock, version, stop):
+    """
+    Actor-Prozess: spielt mit der aktuellen Policy in einer VecEnv und schickt
+    Pakete von `chunk_steps` Schritten an den Lerner. Neue Gewichte holt er aus
+    dem gemeinsamen Speicher, sobald sich die Version ändert.
+    """
+    import torch
+    from src.agents.ki_torch import SimpleNet
+    from src.game_logic.match_runner import load_map
+    from src.game_logic.vec_env import VecEnv
+
+    torch.set_num_threads(1)
+    env = VecEnv(load_map(config['map']), num_envs=config['envs_per_actor'], seed=config['seed'] + actor_id)
+    model = SimpleNet(env.encoder.size, len(ACTION_DELTAS))
+    model.eval()
+    shm = shared_memory.SharedMemory(name=weights_name)
+    published = np.ndarray((weights_size,), dtype=np.float32, buffer=shm.buf)
+    local_version = -1
+    rng = np.random.default_rng(config['seed'] + 1000 + actor_id)
+
+    steps = config['chunk_steps']
+    shape = (env.num_envs, env.num_agents)
+    observations = env.reset()
+    try:
+        while not stop.is_set():
+            # Neue Arrays pro Paket: die Queue serialisiert erst später in ihrem eigenen Thread
+            chunk_observations = np.empty((steps,) + shape + (env.encoder.size,), dtype=np.float32)
+            chunk_actions = np.empty((steps,) + shape, dtype=np.int64)
+            chunk_rewards = np.empty((steps,) + shape, dtype=np.float32)
+            chunk_dones = np.empty((steps, env.num_envs), dtype=bool)
+            if version.value != local_version:
+                with weights_lock:
+                    local_version = version.value
+                    parameters = torch.from_numpy(published.copy())
+                torch.nn.utils.vector_to_parameters(parameters, model.parameters())
+
+            for t in range(steps):
+                with torch.inference_mode():
+                    q_values = model(torch.from_numpy(observations.reshape(-1, env.encoder.size)))
+                actions = q_values.argmax(dim=1).numpy().reshape(shape)
+                explore = rng.random(shape) < epsilon
+                actions[explore] = rng.integers(len(ACTION_DELTAS), size=int(explore.sum()))
+                # Die VecEnv schreibt immer in denselben Beobachtungspuffer: vor dem Schritt kopieren
+                chunk_observations[t] = observations
+                observations, rewards, dones, _ = env.step(actions)
+                chunk_actions[t] = actions
+                chunk_rewards[t] = rewards
+                chunk_dones[t] = dones
+            transitions.put((actor_id, chunk_observations, chunk_actions,
+                             chunk_rewards * config['reward_scale'], chunk_dones))
+    finally:
+        shm.close()
+
+
+class Learner:
+    """
+    Lerner des Self-Play-Trainings: sammelt die Pakete der Actors in je einem
+    ReplayBuffer, trainiert das SimpleNet per DQN (Zielnetz, Huber-Verlust) und
+    veröffentlicht die Gewichte über gemeinsamen Speicher an die Actors.
+    """
+    def __init__(self, config, input_size, buffers_streams):
+        import torch
+        from src.agents.ki_torch import SimpleNet, load_weights
+
+        self.torch = torch
+        self.config = config
+        self.model_path = os.path.join(MODELS_DIR, config['model_file'])
+        self.model = SimpleNet(input_size, len(ACTION_DELTAS))
+        if load_weights(self.model, self.model_path):
+            print(f"INFO: Training setzt auf '{self.model_path}' auf.")
+        self.target = SimpleNet(input_size, len(ACTION_DELTAS))
+        self.target.load_state_dict(self.model.state_dict())
+        self.target.eval()
+        self.optimizer = torch.optim.Adam(self.model.parameters(), lr=config['learning_rate'])
+        self.buffers = [ReplayBuffer(self.actor_capacity(config, len(buffers_streams), streams), num_streams=streams,
+                                     observation_size=input_size, seed=config['seed'] + i,
+                                     path=self._buffer_path(config, i))
+                        for i, streams in enumerate(buffers_streams)]
+        total = sum(buffer.capacity for buffer in self.buffers)
+        if total > config['buffer_capacity']:
+            print(f"WARNUNG: Replay-Puffer brauchen mindestens {total} Übergänge für das Warmup "
+                  f"(buffer_capacity ist {config['buffer_capacity']}).")
+        self.updates = 0
+        self.env_steps = 0
+
+    @staticmethod
+    def actor_capacity(config, actors, streams):
+        """
+        Anteil eines Actors an buffer_capacity. Jeder Puffer fasst aber mindestens
+        das Warmup plus zwei Schritte, sonst würde der Lerner nie anfangen.
+        """
+        return max(config['buffer_capacity'] // actors, config['warmup'] + 2 * streams)
+
+    @staticmethod
+    def _buffer_path(config, actor_id):
+        if config['buffer_path'] is None:
+            return None
+        return os.path.join(config['buffer_path'], f'actor_{actor_id}')
+
+    def parameters_vector(self):
+        return self.torch.nn.utils.parameters_to_vector(self.model.parameters()).detach().numpy()
+
+    def add_chunk(self, actor_id, observations, actions, rewards, dones):
+        buffer = self.buffers[actor_id]
+        for t in range(len(actions)):
+            buffer.add(observations[t], actions[t], rewards[t], dones[t])
+        self.env_steps += actions.shape[0] * actions.shape[1] # Schritte x Partien
+
+    def ready(self):
+        return all(len(buffer) >= self.config['warmup'] for buffer in self.buffers)
+
+    def _sample(self):
+        # Gleich viele Übergänge aus jedem Actor-Puffer
+        per_buffer = -(-self.config['batch_size'] // len(self.buffers))
+        batches = [buffer.sample(per_buffer) for buffer in self.buffers]
+        keys = ('observations', 'actions', 'rewards', 'next_observations', 'dones')
+        return {key: self.torch.from_numpy(np.concatenate([batch[key] for batch in batches])) for key in keys}
+
+    def update(self):
+        torch = self.torch
+        batch = self._sample()
+        q_values = self.model(batch['observations']).gather(1, batch['actions'].unsqueeze(1)).squeeze(1)
+        with torch.no_grad():
+            next_q = self.target(batch['next_observations']).max(dim=1).values
+            targets = batch['rewards'] + self.config['gamma'] * (~batch['dones']) * next_q
+        loss = torch.nn.functional.smooth_l1_loss(q_values, targets)
+        self.optimizer.zero_grad(set_to_none=True)
+        loss.backward()
+        self.optimizer.step()
+        self.updates += 1
+        if self.updates % self.config['target_every'] == 0:
+            self.target.load_state_dict(self.model.state_dict())
+        return float(loss)
+
+    def save_checkpoint(self):
+        from src.agents.ki_torch import save_weights
+        save_weights(self.model, self.model_path)
+        print(f"INFO: Checkpoint nach {self.updates} Updates unter '{self.model_path}' gespeichert.")
+
+
+def train(**options):
+    """
+    Paralleles Self-Play-Training für den Torch-Agenten (nur CPU).
+
+    Mehrere Actor-Prozesse spielen kopflose Partien (VecEnv) mit der aktuellen
+    Policy, jeder mit eigener Exploration, und schicken ihre Übergänge über eine
+    Queue an den Lerner im Hauptprozess. Der Lerner trainiert das SimpleNet,
+    veröffentlicht alle `publish_every` Updates neue Gewichte und speichert
+    Checkpoints nach models/ (lesbar mit KI_Torch.load_model und dem model_cache).
+    Ohne Angabe nutzt das Training alle Kerne: einen für den Lerner, den Rest für
+    die Actors. Gibt die Kennzahlen des Laufs zurück.
+    """
+    import torch
+    from src.game_logic.observation import OBSERVATION_SIZE
+
+    config = dict(DEFAULT_CONFIG, **options)
+    actors = config['actors'] or max((os.cpu_count() or 2) - 1, 1)
+    torch.set_num_threads(1 if actors > 1 else max(os.cpu_count() or 1, 1))
+    torch.manual_seed(config['seed'])
+
+    from src.game_logic.vec_env import VecEnv
+    from src.game_logic.match_runner import load_map
+    probe = VecEnv(load_map(config['map']), num_envs=1)
+    streams = config['envs_per_actor'] * probe.num_agents
+    learner = Learner(config, OBSERVATION_SIZE, [streams] * actors)
+
+    initial = learner.parameters_vector()
+    shm = shared_memory.SharedMemory(create=True, size=initial.nbytes)
+    published = np.ndarray(initial.shape, dtype=np.float32, buffer=shm.buf)
+    published[:] = initial
+
+    # spawn statt fork: die Actors starten ohne die Threads des Lerner-Prozesses
+    context = mp.get_context('spawn')
+    transitions = context.Queue(maxsize=2 * actors) # Rückstau bremst die Actors, wenn der Lerner nicht nachkommt
+    weights_lock = context.Lock()
+    version = context.Value('i', 0)
+    stop = context.Event()
+    processes = [context.Process(target=_actor, daemon=True,
+                                 args=(i, config, epsilon, transitions, shm.name, initial.size,
+                                       weights_lock, version, stop))
+                 for i, epsilon in enumerate(actor_epsilons(actors, config['epsilon']))]
+    for process in processes:
+        process.start()
+    print(f"INFO: Training mit {actors} Actors x {config['envs_per_actor']} Partien auf {config['map']}.")
+
+    start = time.perf_counter()
+    last_report, last_steps, last_updates = start, 0, 0
+    loss = None
+    try:
+        while learner.updates < config['updates']:
+            # Wartende Pakete übernehmen (höchstens eines pro Actor und Update);
+            # vor dem Aufwärmen wird auf die Actors gewartet
+            for _ in range(actors):
+                try:
+                    chunk = transitions.get(block=not learner.ready(), timeout=60)
+                except queue.Empty:
+                    if not learner.ready():
+                        raise RuntimeError("Die Actors liefern keine Übergänge.")
+                    break
+                learner.add_chunk(*chunk)
+            if not learner.ready():
+                continue
+
+            loss = learner.update()
+            if learner.updates % config['publish_every'] == 0:
+                with weights_lock:
+                    published[:] = learner.parameters_vector()
+                    version.value += 1
+            if learner.updates % config['checkpoint_every'] == 0:
+                learner.save_checkpoint()
+
+            now = time.perf_counter()
+            if now - last_report >= config['report_seconds']:
+                print(f"INFO: {(learner.env_steps - last_steps) / (now - last_report):10.0f} Env-Schritte/s | "
+                      f"{(learner.updates - last_updates) / (now - last_report):7.1f} Updates/s | "
+                      f"Verlust {loss:.4f} | {learner.updates} Updates")
+                last_report, last_steps, last_updates = now, learner.env_steps, learner.updates
+    finally:
+        stop.set()
+        # Queue leeren, damit blockierte Actors ihr put() beenden können
+        deadline = time.perf_counter() + 10
+        while any(process.is_alive() for process in processes) and time.perf_counter() < deadline:
+            try:
+                transitions.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        shm.close()
+        shm.unlink()
+
+    learner.save_checkpoint()
+    duration = time.perf_counter() - start
+    stats = {'updates': learner.updates, 'env_steps': learner.env_steps, 'seconds': duration,
+             'env_steps_per_second': learner.env_steps / duration, 'updates_per_second': learner.updates / duration,
+             'loss': loss, 'model_path': learner.model_path}
+    print(f"INFO: {stats['env_steps']} Env-Schritte und {stats['updates']} Updates in {duration:.1f}s "
+          f"({stats['env_steps_per_second']:.0f} Env-Schritte/s, {stats['updates_per_second']:.1f} Updates/s).")
+    return stats
@@ -1,39 +1,133 @@
-import collections
 import random
+from src.game_logic.grid import Grid
+from src.game_logic.path_cache import DistanceFieldCache
+from src.game_logic.junction_graph import JunctionGraph
+from src.game_logic.tree_oracle import TreeDistanceOracle, get_distance_oracle
+from src.game_logic.hpa_pathfinder import HierarchicalPathfinder
+
+# Ab dieser Kartengröße (Zellen) wird über den Kreuzungsgraphen gesucht statt über volle Distanzfelder
+JUNCTION_GRAPH_MIN_CELLS = 101 * 101
+# Ab dieser Kartengröße (Zellen) wird hierarchisch gesucht, da selbst Orakel und Graph zu groß werden
+HIERARCHICAL_MIN_CELLS = 1000 * 1000
 
 class AIAgent:
-    def __init__(self, game_state):
+    def __init__(self, game_state, cache_max_bytes=None):
         self.game_state = game_state
+        self.cache_max_bytes = cache_max_bytes
+        self._grid = None
+        self._path_cache = None
+        self._junction_graph = None
+        self._tree_oracle = False # False = noch nicht geprüft, None = Karte ist kein Baum
+        self._hierarchical = None
+
+    @property
+    def grid(self):
+        """Karte als NumPy-Grid (wird einmal aus game_state.map_data erzeugt)."""
+        if self._grid is None:
+            self._grid = Grid.from_map_data(self.game_state.map_data)
+        return self._grid
+
+    @property
+    def path_cache(self):
+        """Gemeinsamer Distanzfeld-Cache aller Agenten auf derselben Karte."""
+        if self._path_cache is None:
+            self._path_cache = DistanceFieldCache.for_map(self.grid, self.cache_max_bytes)
+        return self._path_cache
+
+    @property
+    def junction_graph(self):
+        """Gemeinsamer Kreuzungsgraph der Karte (Gänge zu Kanten zusammengefasst)."""
+        if self._junction_graph is None:
+            self._junction_graph = JunctionGraph.for_map(self.grid)
+        return self._junction_graph
+
+    @property
+    def tree_oracle(self):
+        """O(1)-Distanz-Orakel für perfekte Labyrinthe, None bei Karten mit Schleifen."""
+        if self._tree_oracle is False and self._uses_hierarchical():
+            self._tree_oracle = None
+        if self._tree_oracle is False:
+            oracle = get_distance_oracle(self.grid)
+            self._tree_oracle = oracle if isinstance(oracle, TreeDistanceOracle) else None
+        return self._tree_oracle
+
+    @property
+    def hierarchical(self):
+        """Gemeinsamer HPA*-Pfadfinder für sehr große Karten."""
+        if self._hierarchical is None:
+            self._hierarchical = HierarchicalPathfinder.for_map(self.grid)
+        return self._hierarchical
+
+    def _uses_hierarchical(self):
+        cache = self.path_cache
+        return cache.width * cache.height >= HIERARCHICAL_MIN_CELLS
+
+    def _uses_junction_graph(self):
+        cache = self.path_cache
+        return cache.width * cache.height >= JUNCTION_GRAPH_MIN_CELLS
+
+    def _next_step_towards(self, start_pos, target_pos):
+        """Wählt die günstigste Pfadfindung für die Karte und liefert den nächsten Schritt."""
+        if self._uses_hierarchical():
+            return self.hierarchical.next_step(start_pos, target_pos)
+        if self.tree_oracle is not None:
+            return self.tree_oracle.next_step(start_pos, target_pos)
+        if self._uses_junction_graph():
+            return self.junction_graph.next_step(start_pos, target_pos)
+        return self.path_cache.next_step(start_pos, target_pos)
 
     def get_move(self, soldier):
         """
-        Berechnet den nächsten Schritt für den Soldaten mithilfe der Breitensuche (BFS),
-        um das nächstgelegene Item zu erreichen.
+        Berechnet den nächsten Schritt für den Soldaten, um das nächstgelegene Item
+        zu erreichen. Ist ein Item-Flussfeld vorhanden, wird der Schritt direkt daraus
+        gelesen, sonst über das Baum-Orakel bzw. die Distanzfelder des Ziels.
         """
         if not soldier.is_alive:
             return soldier.position
 
         start_pos = soldier.position
+
+        flow_field = self.game_state.item_flow_field
+        if flow_field is not None:
+            next_pos = flow_field.next_step(start_pos)
+            return next_pos if next_pos else self._get_random_valid_move(start_pos)
         
         closest_item_pos = self._find_closest_item(start_pos)
 
         if closest_item_pos:
-            path = self._find_path(start_pos, closest_item_pos)
-            
-            if path and len(path) > 1:
-                return path[1]
+            next_pos = self._next_step_towards(start_pos, closest_item_pos)
+            if next_pos:
+                return next_pos
 
         return self._get_random_valid_move(start_pos)
 
+    def get_move_towards(self, soldier, target_pos):
+        """Nächster Schritt zu einem vorgegebenen Ziel (z.B. aus einem LLM-Plan)."""
+        if not soldier.is_alive:
+            return soldier.position
+        next_pos = self._next_step_towards(soldier.position, target_pos)
+        return next_pos if next_pos else soldier.position
+
     def _find_closest_item(self, start_pos):
         """Findet die Position des nächstgelegenen Items auf der Karte."""
+        flow_field = self.game_state.item_flow_field
+        if flow_field is not None:
+            return flow_field.nearest_item(start_pos)
+
         min_distance = float('inf')
         closest_item = None
         
         items_on_map = self.game_state.items_on_map
+        # Bei perfekten Labyrinthen ist die echte Weglänge genauso billig wie Manhattan
+        oracle = self.tree_oracle
 
         for item_pos in items_on_map.keys():
-            dist = abs(item_pos[0] - start_pos[0]) + abs(item_pos[1] - start_pos[1])
+            if oracle is not None:
+                dist = oracle.distance(start_pos, item_pos)
+                if dist is None:
+                    continue
+            else:
+                dist = abs(item_pos[0] - start_pos[0]) + abs(item_pos[1] - start_pos[1])
             if dist < min_distance:
                 min_distance = dist
                 closest_item = item_pos
@@ -41,30 +135,22 @@ class AIAgent:
         return closest_item
 
     def _find_path(self, start_pos, target_pos):
-        """Führt eine Breitensuche (BFS) durch, um den kürzesten Pfad zu finden."""
-        q = collections.deque([[start_pos]])
-        visited = {start_pos}
-        map_data = self.game_state.map_data
-        
-        while q:
-            path = q.popleft()
-            current_pos = path[-1]
-
-            if current_pos == target_pos:
-                return path
-
-            x, y = current_pos
-            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                new_x, new_y = x + dx, y + dy
-                new_pos = (new_x, new_y)
-
-                if self._is_valid_move(new_x, new_y) and new_pos not in visited:
-                    visited.add(new_pos)
-                    new_path = list(path)
-                    new_path.append(new_pos)
-                    q.append(new_path)
-        
-        return None
+        """Gibt den kürzesten Pfad zurück, abgeleitet aus dem Distanzfeld des Ziels."""
+        return self.path_cache.path(start_pos, target_pos)
+
+    def get_path_distance(self, start_pos, target_pos):
+        """
+        Weglänge im Labyrinth zwischen zwei Zellen oder None. Exakt, außer auf sehr
+        großen Karten: dort liefert HPA* eine Näherung über die Clusterübergänge,
+        die nie kürzer, aber gelegentlich etwas länger als der kürzeste Weg ist.
+        """
+        if self._uses_hierarchical():
+            return self.hierarchical.distance(start_pos, target_pos)
+        if self.tree_oracle is not None:
+            return self.tree_oracle.distance(start_pos, target_pos)
+        if self._uses_junction_graph():
+            return self.junction_graph.distance(start_pos, target_pos)
+        return self.path_cache.distance(start_pos, target_pos)
 
     def _get_random_valid_move(self, current_pos):
         """Findet eine zufällige, gültige Bewegung, falls die Pfadfindung fehlschlägt."""
@@ -79,7 +165,4 @@ class AIAgent:
 
     def _is_valid_move(self, x, y):
         """Überprüft, ob eine Bewegung gültig ist (innerhalb der Karte, keine Mauer)."""
-        map_data = self.game_state.map_data
-        if not (0 <= y < len(map_data) and 0 <= x < len(map_data[y])):
-            return False
-        return map_data[y][x] != '#' and map_data[y][x] != '\n'
\ No newline at end of file
+        return self.grid.is_free(x, y)
\ No newline at end of file
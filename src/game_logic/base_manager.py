@@ -1,20 +1,27 @@
-import time
+import numpy as np
+from src.game_logic.grid import Grid
+from src.game_logic.junction_graph import JunctionGraph
+from src.game_logic.tree_oracle import TreeDistanceOracle, get_distance_oracle
+from src.game_logic.clock import REAL_TIME_CLOCK
 
 class BaseManager:
     """
     Verwaltet die Logik für eine einzelne Basis, einschließlich Gesundheit,
     Verteidigung und Kommunikation mit den eigenen Agenten.
     """
-    def __init__(self, team_name, start_position, team_agents, map_data):
+    def __init__(self, team_name, start_position, team_agents, map_data, clock=None):
         self.team_name = team_name
         self.position = start_position
         self.health = 150
         self.is_active = True
         self.team_agents = team_agents # Liste der KI-Agenten dieses Teams
-        self.map_data = map_data
+        # Nachschlagetabelle Spielername -> Team (O(1) statt Suche über team_agents)
+        self.player_teams = {agent.name: team_name for agent in team_agents}
+        self.grid = Grid.from_map_data(map_data)
         self.vision_range = 4 # Sichtweite in Steps
-        self.last_warning_time = 0 # Zeitstempel für letzte Warnung
+        self.last_warning_time = float('-inf') # Zeitstempel für letzte Warnung
         self.warning_cooldown = 10 # Sekunden
+        self.clock = clock or REAL_TIME_CLOCK
 
     def take_damage(self, damage_amount, damage_type='normal'):
         """
@@ -37,31 +44,76 @@ class BaseManager:
         
         return 0
 
-    def check_for_enemies(self, all_player_positions):
+    def check_for_enemies(self, all_player_positions, player_teams=None):
         """
         Sucht innerhalb der Sichtweite nach feindlichen Spielern.
         """
-        if not self.is_active:
-            return False
+        return self.check_all_bases([self], all_player_positions, player_teams)[self.team_name]
 
-        current_time = time.time()
-        if (current_time - self.last_warning_time) < self.warning_cooldown:
-            return False # Cooldown aktiv, keine neue Warnung senden
-        
-        base_x, base_y = self.position
-        
-        for player_name, pos in all_player_positions.items():
-            player_x, player_y = pos
-            distance = ((player_x - base_x)**2 + (player_y - base_y)**2)**0.5
-            
-            # Prüft die Entfernung und ob der Spieler nicht zum eigenen Team gehört
-            if distance <= self.vision_range and self._get_player_team(player_name) != self.team_name:
-                print(f"Basis von Team {self.team_name} hat einen Feind gesichtet!")
-                self._warn_team_members(player_name)
-                self.last_warning_time = current_time
-                return True
-        return False
+    @staticmethod
+    def build_player_team_lookup(base_managers):
+        """Gemeinsame Nachschlagetabelle Spielername -> Team für alle Basen."""
+        lookup = {}
+        for base in base_managers:
+            lookup.update(base.player_teams)
+        return lookup
+
+    @staticmethod
+    def check_all_bases(base_managers, all_player_positions, player_teams=None):
+        """
+        Prüft für alle Basen gleichzeitig, welche feindlichen Spieler in ihrer Sichtweite sind.
+        Eine Distanzmatrix (Basen x Spieler) wird vektorisiert mit quadrierten Abständen
+        berechnet. Jede Basis warnt höchstens einmal pro Cooldown ihr Team.
+        Gibt {Teamname: True/False} zurück (True = Warnung ausgelöst).
+        """
+        results = {base.team_name: False for base in base_managers}
+        if player_teams is None:
+            player_teams = BaseManager.build_player_team_lookup(base_managers)
+
+        # Alle Basen einer Partie teilen sich dieselbe Uhr
+        current_time = base_managers[0].clock.now() if base_managers else 0
+        ready = [base for base in base_managers
+                 if base.is_active and (current_time - base.last_warning_time) >= base.warning_cooldown]
+        if not ready or not all_player_positions:
+            return results
+
+        player_names = list(all_player_positions.keys())
+        player_pos = np.array([all_player_positions[name] for name in player_names], dtype=np.int32)
+        base_pos = np.array([base.position for base in ready], dtype=np.int32)
+        vision = np.array([base.vision_range for base in ready], dtype=np.int32)
+
+        # Teams als Ganzzahlen, unbekannte Spieler gelten wie bisher als 'opponent'
+        team_ids = {}
+        player_team_ids = np.array([team_ids.setdefault(player_teams.get(name, 'opponent'), len(team_ids))
+                                    for name in player_names])
+        base_team_ids = np.array([team_ids.setdefault(base.team_name, len(team_ids)) for base in ready])
+
+        delta = base_pos[:, None, :] - player_pos[None, :, :]
+        squared_distance = (delta * delta).sum(axis=2)
+        spotted = (squared_distance <= (vision * vision)[:, None]) & (player_team_ids[None, :] != base_team_ids[:, None])
+
+        for row in np.flatnonzero(spotted.any(axis=1)):
+            base = ready[row]
+            # Wie bisher wird der erste gefundene Feind (in Reihenfolge der Spieler) gemeldet
+            player_name = player_names[int(np.argmax(spotted[row]))]
+            print(f"Basis von Team {base.team_name} hat einen Feind gesichtet!")
+            base._warn_team_members(player_name)
+            base.last_warning_time = current_time
+            results[base.team_name] = True
+        return results
     
+    def get_path_distance(self, position):
+        """
+        Echte Weglänge von der Basis zu einer Position im Labyrinth oder None.
+        Auf perfekten Labyrinthen antwortet das Baum-Orakel ohne Suche, sonst der
+        eine Kreuzungsgraph der Karte, den sich alle Basen mit den AIAgents teilen
+        (liegt die Basis mitten in einem Gang, wird sie bei der Anfrage angehängt).
+        """
+        oracle = get_distance_oracle(self.grid)
+        if isinstance(oracle, TreeDistanceOracle):
+            return oracle.distance(self.position, position)
+        return JunctionGraph.for_map(self.grid).distance(self.position, position)
+
     def _warn_team_members(self, enemy_name):
         """
         Sendet eine Warnung an alle Agenten des eigenen Teams.
@@ -72,9 +124,5 @@ class BaseManager:
             
     def _get_player_team(self, player_name):
         # Hilfsfunktion, um das Team eines Spielers anhand des Namens zu finden
-        for agent in self.team_agents:
-            if agent.name == player_name:
-                return self.team_name
-        # Annahme: der gegnerische Agent befindet sich im `all_player_positions` Dict
-        # Diese Logik müsste erweitert werden, um das Team des Gegners zu finden.
-        return 'opponent'
\ No newline at end of file
+        # Gegnerische Spieler sind in der Tabelle dieser Basis nicht enthalten.
+        return self.player_teams.get(player_name, 'opponent')
\ No newline at end of file
@@ -0,0 +1,28 @@
+import time
+
+
+class RealTimeClock:
+    """Wanduhrzeit in Sekunden, wie bisher time.time(). Für die Oberfläche."""
+    def now(self):
+        return time.time()
+
+
+class VirtualClock:
+    """
+    Spielzeit aus gezählten Ticks. Die Simulation schaltet die Uhr pro Tick weiter,
+    dadurch laufen Runden so schnell wie die CPU erlaubt, während alle Zeiten
+    (Respawn, Cooldowns, Items) in Spielsekunden gleich bleiben.
+    """
+    def __init__(self, tick_seconds=0.1):
+        self.tick_seconds = tick_seconds
+        self.ticks = 0
+
+    def now(self):
+        return self.ticks * self.tick_seconds
+
+    def advance(self, ticks=1):
+        self.ticks += ticks
+
+
+# Gemeinsame Echtzeit-Uhr für alle Objekte, denen keine Uhr übergeben wird
+REAL_TIME_CLOCK = RealTimeClock()
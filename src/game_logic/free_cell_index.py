@@ -0,0 +1,106 @@
+import random
+
+
+class _CellSet:
+    """Menge von Positionen mit O(1) Einfügen, Entfernen und Zufallsauswahl (Array + Slot-Map)."""
+    def __init__(self, cells=()):
+        self.cells = list(cells)
+        self.slot = {pos: i for i, pos in enumerate(self.cells)}
+
+    def add(self, pos):
+        if pos not in self.slot:
+            self.slot[pos] = len(self.cells)
+            self.cells.append(pos)
+
+    def discard(self, pos):
+        i = self.slot.pop(pos, None)
+        if i is None:
+            return
+        # Letztes Element in die Lücke schieben, damit das Array dicht bleibt
+        last = self.cells.pop()
+        if i < len(self.cells):
+            self.cells[i] = last
+            self.slot[last] = i
+
+    def sample(self, rng):
+        return self.cells[rng.randrange(len(self.cells))] if self.cells else None
+
+    def __contains__(self, pos):
+        return pos in self.slot
+
+    def __len__(self):
+        return len(self.cells)
+
+
+class FreeCellIndex:
+    """
+    Index aller freien Felder für das Platzieren von Items und Flaggen.
+
+    Ein Feld ist frei, wenn es begehbar ist und weder ein Item noch eine Basis
+    darauf liegt. Zusätzlich wird eine Sicht ohne Soldaten gepflegt. Einfügen,
+    Entfernen und eine gleichverteilte Zufallsauswahl kosten jeweils O(1), statt
+    bei jedem Platzieren die ganze Karte abzusuchen.
+    """
+    def __init__(self, grid, rng=random):
+        self.grid = grid
+        self.rng = rng
+        free = grid.free_cells()
+        self._free = _CellSet(free)
+        self._free_without_soldiers = _CellSet(free)
+        self._blocked = {}   # Position -> Anzahl Items/Basen
+        self._soldiers = {}  # Position -> Anzahl Soldaten
+
+    def occupy(self, pos):
+        """Markiert ein Feld als belegt (Item, Flagge oder Basis)."""
+        self._blocked[pos] = self._blocked.get(pos, 0) + 1
+        self._free.discard(pos)
+        self._free_without_soldiers.discard(pos)
+
+    def release(self, pos):
+        """Gibt ein zuvor belegtes Feld wieder frei."""
+        count = self._blocked.get(pos, 0)
+        if count > 1:
+            self._blocked[pos] = count - 1
+            return
+        self._blocked.pop(pos, None)
+        x, y = pos
+        if not self.grid.is_free(x, y):
+            return
+        self._free.add(pos)
+        if pos not in self._soldiers:
+            self._free_without_soldiers.add(pos)
+
+    def add_soldier(self, pos):
+        self._soldiers[pos] = self._soldiers.get(pos, 0) + 1
+        self._free_without_soldiers.discard(pos)
+
+    def remove_soldier(self, pos):
+        count = self._soldiers.get(pos, 0)
+        if count > 1:
+            self._soldiers[pos] = count - 1
+            return
+        self._soldiers.pop(pos, None)
+        if pos in self._free:
+            self._free_without_soldiers.add(pos)
+
+    def move_soldier(self, old_pos, new_pos):
+        if old_pos == new_pos:
+            return
+        self.remove_soldier(old_pos)
+        self.add_soldier(new_pos)
+
+    def sample(self, exclude_soldiers=False):
+        """Zufälliges freies Feld (optional auch ohne Soldaten) oder None."""
+        cells = self._free_without_soldiers if exclude_soldiers else self._free
+        return cells.sample(self.rng)
+
+    def cells(self, exclude_soldiers=False):
+        """Kopie aller freien Felder."""
+        cells = self._free_without_soldiers if exclude_soldiers else self._free
+        return list(cells.cells)
+
+    def is_free(self, pos, exclude_soldiers=False):
+        return pos in (self._free_without_soldiers if exclude_soldiers else self._free)
+
+    def __len__(self):
+        return len(self._free)
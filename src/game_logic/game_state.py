@@ -1,12 +1,22 @@
 import json
 
+# Feste Item-Codes (0 = kein Item) für Arrays, z.B. im VecEnv und im Beobachtungs-Encoder
+ITEM_TYPES = [None, 'flag', 'red pill', 'blue pill', 'knife', 'gun', 'grenade', 'nuke',
+              'pink duck', 'fake_flag', 'binoculars']
+ITEM_CODES = {name: code for code, name in enumerate(ITEM_TYPES) if name}
+
 class GameState:
     def __init__(self, map_data):
         self.map_data = map_data
         self.player_data = {}
         self.item_properties = self._define_item_properties()
         self.items_on_map = {}
-        
+        self.item_flow_field = None
+        self.base_positions = {} # Teamname -> Position der Basis
+        self.time_left_fraction = 1.0 # Verbleibender Anteil der Rundenzeit
+        self.version = 0 # steigt bei jedem update(), z.B. für Caches pro Tick
+        self._observation_encoder = None
+
     def _define_item_properties(self):
         """
         Definiert die Eigenschaften (Werte) aller Objekte im Spiel,
@@ -25,20 +35,33 @@ class GameState:
             'binoculars': {'health': 0, 'attack': 0, 'range': 0, 'vision_boost': 4},
         }
 
-    def update(self, soldiers, items_on_map):
+    def update(self, soldiers, items_on_map, item_flow_field=None, base_positions=None, time_left_fraction=None):
         """
         Aktualisiert den Spielzustand mit den neuesten Daten.
+        Optional werden das Flussfeld des ItemManagers, die Basen und die Restzeit übernommen.
         """
         self.player_data = {}
         for team_soldiers in soldiers.values():
             for soldier in team_soldiers:
+                weapon = soldier.inventory.get('weapon')
                 self.player_data[soldier.soldier_id] = {
                     'team': soldier.team,
                     'position': soldier.position,
                     'health': soldier.health,
-                    'is_alive': soldier.is_alive
+                    'is_alive': soldier.is_alive,
+                    'attack': soldier.attack,
+                    'attack_range': self.item_properties[weapon]['range'] if weapon else 1,
+                    'vision_range': soldier.vision_range,
+                    'has_flag': 'flag' in soldier.inventory
                 }
         self.items_on_map = items_on_map
+        if item_flow_field is not None:
+            self.item_flow_field = item_flow_field
+        if base_positions is not None:
+            self.base_positions = base_positions
+        if time_left_fraction is not None:
+            self.time_left_fraction = time_left_fraction
+        self.version += 1
 
     def get_item_properties(self, item_type):
         """
@@ -58,25 +81,18 @@ class GameState:
         """
         return self.player_data.get(player_id, {}).get('position')
 
-    def get_state_for_ki(self, player_id):
+    @property
+    def observation_encoder(self):
+        """Encoder für Beobachtungen fester Größe (wird beim ersten Zugriff angelegt)."""
+        if self._observation_encoder is None:
+            from src.game_logic.observation import ObservationEncoder
+            self._observation_encoder = ObservationEncoder(self.map_data)
+        return self._observation_encoder
+
+    def get_state_for_ki(self, player_id, out=None):
         """
-        Bereitet den Spielzustand so auf, dass er von der KI einfach verarbeitet werden kann.
+        Bereitet den Spielzustand so auf, dass er von der KI einfach verarbeitet werden kann:
+        ein float32-Vektor fester Länge (OBSERVATION_SIZE), unabhängig von der Zahl der Items.
+        Mit `out` wird in einen vorhandenen Puffer geschrieben.
         """
-        state = []
-        
-        # Eigene Gesundheit und Position hinzufügen
-        player_info = self.player_data.get(player_id, {})
-        state.append(player_info.get('health', 0))
-        state.extend(player_info.get('position', (0,0)))
-        
-        # Positionen und Werte aller Objekte auf der Karte hinzufügen
-        for pos, item in self.items_on_map.items():
-            state.extend(pos)
-            item_values = self.get_item_properties(item)
-            if item_values:
-                state.append(item_values.get('health', 0))
-                state.append(item_values.get('attack', 0))
-                state.append(item_values.get('range', 0))
-                state.append(item_values.get('vision_boost', 0))
-        
-        return state
\ No newline at end of file
+        return self.observation_encoder.encode(self, player_id, out)
\ No newline at end of file
@@ -0,0 +1,140 @@
+import random
+import numpy as np
+
+# Zelltypen
+FLOOR = 0
+WALL = 1
+VOID = 2 # außerhalb kürzerer Zeilen bzw. Zeilenumbrüche
+
+# Übersetzung der Kartenzeichen in Zelltypen; alles Unbekannte ist begehbar
+_CHAR_TO_CODE = np.full(256, FLOOR, dtype=np.uint8)
+_CHAR_TO_CODE[ord('#')] = WALL
+_CHAR_TO_CODE[ord('\n')] = VOID
+_CHAR_TO_CODE[ord('\r')] = VOID
+
+_CODE_TO_CHAR = {FLOOR: '.', WALL: '#', VOID: ' '}
+
+
+class Grid:
+    """
+    Gemeinsames Kartenmodell aller Subsysteme.
+
+    Die Karte liegt als kompaktes uint8-NumPy-Array mit Zelltypen vor
+    (1 Byte pro Zelle statt einer Liste von Strings). Masken für freie Felder
+    und Nachbarn werden vektorisiert berechnet und zwischengespeichert; für
+    Einzelabfragen gibt es eine mit Mauern aufgefüllte Maske, sodass Schritte
+    von einem gültigen Feld aus keine Grenzprüfung brauchen.
+    """
+    def __init__(self, cells):
+        self.cells = np.ascontiguousarray(cells, dtype=np.uint8)
+        self.cells.setflags(write=False)
+        self.height, self.width = self.cells.shape
+
+        self.free_mask = self.cells == FLOOR
+        self.free_mask.setflags(write=False)
+        # Mit Mauern aufgefüllt: padded_free[y + 1][x + 1] gilt auch für x, y = -1 und Breite/Höhe
+        self.padded_free = np.pad(self.free_mask, 1, constant_values=False)
+        self.padded_free.setflags(write=False)
+        # Flache Bytes für schnelle Einzelzugriffe aus Python-Schleifen
+        self._padded_bytes = self.padded_free.tobytes()
+        self._key = None
+        self._free_flat = None
+
+    @classmethod
+    def from_map_data(cls, map_data):
+        """
+        Erstellt ein Grid aus einer Karte (Liste von Zeilen als Strings oder Zeichenlisten).
+        Ist map_data bereits ein Grid, wird es unverändert zurückgegeben.
+        """
+        if isinstance(map_data, Grid):
+            return map_data
+        rows = [''.join(row) for row in map_data]
+        height = len(rows)
+        width = max((len(row) for row in rows), default=0)
+        raw = np.full((height, width), ord('\n'), dtype=np.uint8)
+        for y, row in enumerate(rows):
+            if row:
+                raw[y, :len(row)] = np.frombuffer(row.encode('latin-1', errors='replace'), dtype=np.uint8)
+        return cls(_CHAR_TO_CODE[raw])
+
+    @classmethod
+    def load(cls, file_path):
+        """Lädt eine .map-Datei (leere Zeilen werden ignoriert)."""
+        with open(file_path, 'r') as f:
+            lines = [line.strip() for line in f if line.strip()]
+        return cls.from_map_data(lines)
+
+    def __bool__(self):
+        return self.cells.size > 0
+
+    def __len__(self):
+        return self.height
+
+    @property
+    def key(self):
+        """Eindeutiger, hashbarer Schlüssel für Caches, die pro Karte geteilt werden."""
+        if self._key is None:
+            self._key = (self.width, self.height, self.cells.tobytes())
+        return self._key
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_free(self, x, y):
+        """Begehbar? Felder außerhalb der Karte gelten als nicht begehbar."""
+        return 0 <= x < self.width and 0 <= y < self.height and self._is_free_unchecked(x, y)
+
+    def _is_free_unchecked(self, x, y):
+        """
+        Wie is_free, aber ohne Grenzprüfung; nur gültig für x, y von -1 bis Breite
+        bzw. Höhe (z.B. Nachbarn eines Feldes auf der Karte). Weiter außerhalb
+        liegende Koordinaten landen sonst in einer anderen Zeile.
+        """
+        return self._padded_bytes[(y + 1) * (self.width + 2) + x + 1] == 1
+
+    def is_wall(self, x, y):
+        return self.in_bounds(x, y) and self.cells[y, x] == WALL
+
+    def neighbour_masks(self):
+        """
+        Gibt für jede Richtung (dx, dy) eine Maske zurück, die angibt, ob das Feld
+        frei ist und der Nachbar in dieser Richtung ebenfalls.
+        """
+        padded = self.padded_free
+        h, w = self.height, self.width
+        return {
+            (0, 1): self.free_mask & padded[2:h + 2, 1:w + 1],
+            (0, -1): self.free_mask & padded[0:h, 1:w + 1],
+            (1, 0): self.free_mask & padded[1:h + 1, 2:w + 2],
+            (-1, 0): self.free_mask & padded[1:h + 1, 0:w],
+        }
+
+    def degree(self):
+        """Anzahl freier Nachbarn jedes freien Feldes (0 für Mauern)."""
+        return sum(mask.astype(np.uint8) for mask in self.neighbour_masks().values())
+
+    def walkable_bytes(self):
+        """Flache Maske der freien Felder als bytearray (1 = frei), zeilenweise."""
+        return bytearray(self.free_mask.tobytes())
+
+    def free_cells(self, mask=None):
+        """Liste aller freien Felder als (x, y), optional zusätzlich gefiltert."""
+        if mask is not None:
+            mask = self.free_mask & mask
+        else:
+            mask = self.free_mask
+        ys, xs = np.nonzero(mask)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def random_free_cell(self, rng=random):
+        """Zufälliges freies Feld oder None, falls die Karte keins hat."""
+        if self._free_flat is None:
+            self._free_flat = np.flatnonzero(self.free_mask)
+        if len(self._free_flat) == 0:
+            return None
+        idx = int(self._free_flat[rng.randrange(len(self._free_flat))])
+        return (idx % self.width, idx // self.width)
+
+    def to_lines(self):
+        """Rückumwandlung in Textzeilen im .map-Format."""
+        return [''.join(_CODE_TO_CHAR[int(code)] for code in row).rstrip() for row in self.cells]
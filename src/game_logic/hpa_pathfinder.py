@@ -0,0 +1,393 @@
+import collections
+import heapq
+import random
+import time
+from array import array
+from src.game_logic.path_cache import DistanceFieldCache
+
+# Kantenlänge eines Clusters in Zellen
+DEFAULT_CLUSTER_SIZE = 16
+# Ab dieser Länge bekommt ein Grenzabschnitt zwei Übergänge statt einem
+LONG_ENTRANCE = 6
+# Wie viele verfeinerte Teilstrecken zwischengespeichert werden
+MAX_CACHED_ROUTES = 4096
+# Wie viele Pfadfinder (Karten) gleichzeitig im Speicher gehalten werden
+MAX_CACHED_PATHFINDERS = 4
+# Landmarken für die A*-Heuristik (je ein Distanzfeld über den abstrakten Graphen)
+LANDMARKS = 8
+
+_FAR = 2 ** 31 - 1 # Knoten, die eine Landmarke nicht erreicht
+
+
+class HierarchicalPathfinder:
+    """
+    Hierarchische Pfadfindung (HPA*) für sehr große Karten.
+
+    Das Gitter wird in quadratische Cluster aufgeteilt. An den Clustergrenzen
+    entstehen Übergangsknoten, und innerhalb jedes Clusters werden die Kosten
+    zwischen allen Übergängen einmalig per Breitensuche berechnet. Eine Anfrage
+    durchsucht nur diesen abstrakten Graphen und verfeinert anschließend nur das
+    erste Teilstück im Gitter. Die verfeinerten Schritte werden zwischengespeichert,
+    sodass ein Soldat, der dem Weg folgt, beim nächsten Tick nur noch nachschlägt.
+
+    Beim Aufbau werden zusätzlich Distanzfelder von einigen weit verteilten
+    Landmarken über den abstrakten Graphen berechnet (ALT-Heuristik). Die
+    Manhattan-Distanz unterschätzt Wege im Labyrinth stark; mit den Landmarken
+    durchsucht A* nur noch einen Bruchteil der Knoten.
+    """
+    _instances = collections.OrderedDict()
+
+    def __init__(self, map_data, cluster_size=DEFAULT_CLUSTER_SIZE):
+        path_cache = DistanceFieldCache.for_map(map_data)
+        self.width = path_cache.width
+        self.height = path_cache.height
+        self.walkable = path_cache.walkable
+        self.cluster_size = cluster_size
+        self.clusters_x = (self.width + cluster_size - 1) // cluster_size
+
+        self.node_cells = []                          # Knoten-ID -> flacher Index
+        self.node_of = {}                             # flacher Index -> Knoten-ID
+        self.edges = []                               # Knoten-ID -> {Nachbar: Kosten}
+        self.cluster_nodes = collections.defaultdict(list)
+        self._routes = collections.OrderedDict()      # (Zelle, Ziel) -> nächster verfeinerter Schritt
+        self._abstract_routes = collections.OrderedDict() # (Übergang, Ziel) -> restlicher abstrakter Pfad
+
+        self._build_entrances()
+        self._build_intra_edges()
+        self.landmarks = []                           # Landmarke -> Distanz pro Knoten
+        self._build_landmarks()
+
+    @classmethod
+    def for_map(cls, map_data, cluster_size=DEFAULT_CLUSTER_SIZE):
+        """
+        Gibt den gemeinsamen Pfadfinder für diese Karte zurück. Die Clusterdaten
+        werden nur einmal pro Karte aufgebaut und über Matches hinweg wiederverwendet.
+        """
+        key = (DistanceFieldCache._map_key(map_data), cluster_size)
+        pathfinder = cls._instances.get(key)
+        if pathfinder is None:
+            pathfinder = cls(map_data, cluster_size)
+            cls._instances[key] = pathfinder
+            while len(cls._instances) > MAX_CACHED_PATHFINDERS:
+                cls._instances.popitem(last=False)
+        else:
+            cls._instances.move_to_end(key)
+        return pathfinder
+
+    # --- Aufbau ---
+
+    def _cluster_of(self, idx):
+        x, y = idx % self.width, idx // self.width
+        return (y // self.cluster_size) * self.clusters_x + x // self.cluster_size
+
+    def _cluster_bounds(self, cluster):
+        cx, cy = cluster % self.clusters_x, cluster // self.clusters_x
+        x0, y0 = cx * self.cluster_size, cy * self.cluster_size
+        return x0, y0, min(x0 + self.cluster_size, self.width), min(y0 + self.cluster_size, self.height)
+
+    def _node(self, idx):
+        node = self.node_of.get(idx)
+        if node is None:
+            node = len(self.node_cells)
+            self.node_cells.append(idx)
+            self.node_of[idx] = node
+            self.edges.append({})
+            self.cluster_nodes[self._cluster_of(idx)].append(node)
+        return node
+
+    def _connect(self, idx_a, idx_b, cost):
+        a, b = self._node(idx_a), self._node(idx_b)
+        if cost < self.edges[a].get(b, float('inf')):
+            self.edges[a][b] = cost
+            self.edges[b][a] = cost
+
+    def _build_entrances(self):
+        """Legt an jeder Clustergrenze Übergänge für zusammenhängende offene Abschnitte an."""
+        width, height, size, walkable = self.width, self.height, self.cluster_size, self.walkable
+
+        # Senkrechte Grenzen: Zelle (x, y) links, (x + 1, y) rechts
+        for x in range(size - 1, width - 1, size):
+            pairs = [(y * width + x, y * width + x + 1) for y in range(height)]
+            self._add_border(pairs, size)
+        # Waagrechte Grenzen: Zelle (x, y) oben, (x, y + 1) unten
+        for y in range(size - 1, height - 1, size):
+            pairs = [(y * width + x, (y + 1) * width + x) for x in range(width)]
+            self._add_border(pairs, size)
+
+    def _add_border(self, pairs, size):
+        run = []
+        for i, (a, b) in enumerate(pairs):
+            # Abschnitte enden, wenn die Grenze blockiert ist oder ein neuer Cluster beginnt
+            if self.walkable[a] and self.walkable[b] and not (run and i % size == 0):
+                run.append((a, b))
+                continue
+            self._add_entrance(run)
+            run = [(a, b)] if self.walkable[a] and self.walkable[b] else []
+        self._add_entrance(run)
+
+    def _add_entrance(self, run):
+        if not run:
+            return
+        if len(run) >= LONG_ENTRANCE:
+            transitions = [run[0], run[-1]]
+        else:
+            transitions = [run[len(run) // 2]]
+        for a, b in transitions:
+            self._connect(a, b, 1)
+
+    def _cluster_bfs(self, start_idx, cluster):
+        """Breitensuche, die den Cluster nicht verlässt. Gibt {Zelle: (Distanz, Vorgänger)} zurück."""
+        width, walkable = self.width, self.walkable
+        x0, y0, x1, y1 = self._cluster_bounds(cluster)
+        visited = {start_idx: (0, None)}
+        q = collections.deque([start_idx])
+        while q:
+            idx = q.popleft()
+            d = visited[idx][0] + 1
+            x, y = idx % width, idx // width
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if x0 <= nx < x1 and y0 <= ny < y1:
+                    n = ny * width + nx
+                    if walkable[n] and n not in visited:
+                        visited[n] = (d, idx)
+                        q.append(n)
+        return visited
+
+    def _build_intra_edges(self):
+        """Berechnet die Kosten zwischen allen Übergängen innerhalb jedes Clusters."""
+        for cluster, nodes in list(self.cluster_nodes.items()):
+            for i, node in enumerate(nodes):
+                reached = self._cluster_bfs(self.node_cells[node], cluster)
+                for other in nodes[i + 1:]:
+                    hit = reached.get(self.node_cells[other])
+                    if hit is not None:
+                        self._connect(self.node_cells[node], self.node_cells[other], hit[0])
+
+    def _node_distances(self, source):
+        """Dijkstra über den abstrakten Graphen von einem Knoten aus."""
+        dist = array('i', [_FAR]) * len(self.node_cells)
+        dist[source] = 0
+        heap = [(0, source)]
+        edges = self.edges
+        while heap:
+            d, node = heapq.heappop(heap)
+            if d > dist[node]:
+                continue
+            for other, cost in edges[node].items():
+                nd = d + cost
+                if nd < dist[other]:
+                    dist[other] = nd
+                    heapq.heappush(heap, (nd, other))
+        return dist
+
+    def _build_landmarks(self, count=LANDMARKS, rng=None):
+        """Wählt Landmarken nacheinander jeweils möglichst weit weg von den bisherigen."""
+        if not self.node_cells:
+            return
+        rng = rng or random.Random(0)
+        nearest = None
+        node = rng.randrange(len(self.node_cells))
+        for _ in range(count):
+            dist = self._node_distances(node)
+            self.landmarks.append(dist)
+            nearest = dist if nearest is None else array('i', map(min, nearest, dist))
+            node = max(range(len(nearest)), key=lambda n: nearest[n] if nearest[n] != _FAR else -1)
+
+    # --- Anfragen ---
+
+    def _index(self, pos):
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        idx = y * self.width + x
+        return idx if self.walkable[idx] else None
+
+    def _landmark_bounds(self, goal_costs):
+        """
+        Schranken für die Landmarken-Distanz des Ziels aus den Übergängen seines
+        Clusters: für jede Landmarke (Feld, untere, obere Schranke).
+        """
+        bounds = []
+        for field in self.landmarks:
+            values = [(field[node], cost) for node, cost in goal_costs.items() if field[node] != _FAR]
+            if values:
+                bounds.append((field, max(d - cost for d, cost in values), min(d + cost for d, cost in values)))
+        return bounds
+
+    @staticmethod
+    def _heuristic(node, bounds):
+        # Dreiecksungleichung: der Weg ist mindestens so lang wie der Unterschied der Landmarken-Distanzen
+        h = 0
+        for field, low, high in bounds:
+            d = field[node]
+            if d < low:
+                h = max(h, low - d)
+            elif high < d != _FAR:
+                h = max(h, d - high)
+        return h
+
+    def _abstract_path(self, start_idx, goal_idx):
+        """
+        A* auf dem abstrakten Graphen, Start und Ziel werden temporär eingehängt.
+        Gibt (Folge der Zellen (Start, Übergänge..., Ziel), Länge) zurück oder None.
+        """
+        start_cluster, goal_cluster = self._cluster_of(start_idx), self._cluster_of(goal_idx)
+        start_reached = self._cluster_bfs(start_idx, start_cluster)
+        goal_reached = self._cluster_bfs(goal_idx, goal_cluster)
+
+        # Kosten von den Übergängen des Zielclusters bis zum Ziel
+        goal_costs = {}
+        for node in self.cluster_nodes.get(goal_cluster, []):
+            hit = goal_reached.get(self.node_cells[node])
+            if hit is not None:
+                goal_costs[node] = hit[0]
+
+        best, best_node = float('inf'), None
+        if start_cluster == goal_cluster and goal_idx in start_reached:
+            best = start_reached[goal_idx][0] # direkter Weg innerhalb des Clusters
+
+        bounds = self._landmark_bounds(goal_costs)
+        h = {}
+        g = {}
+        came_from = {}
+        heap = []
+        for node in self.cluster_nodes.get(start_cluster, []):
+            hit = start_reached.get(self.node_cells[node])
+            if hit is not None and hit[0] < g.get(node, float('inf')):
+                g[node] = hit[0]
+                came_from[node] = None
+                h[node] = self._heuristic(node, bounds)
+                heapq.heappush(heap, (hit[0] + h[node], node))
+
+        while heap:
+            f, node = heapq.heappop(heap)
+            if f >= best:
+                break
+            d = g[node]
+            if f - h[node] > d:
+                continue # veralteter Eintrag
+            if node in goal_costs and d + goal_costs[node] < best:
+                best, best_node = d + goal_costs[node], node
+            for other, cost in self.edges[node].items():
+                nd = d + cost
+                if nd < g.get(other, float('inf')):
+                    g[other] = nd
+                    came_from[other] = node
+                    if other not in h:
+                        h[other] = self._heuristic(other, bounds)
+                    heapq.heappush(heap, (nd + h[other], other))
+
+        if best == float('inf'):
+            return None
+        if best_node is None:
+            return [start_idx, goal_idx], best
+
+        route = [goal_idx]
+        node = best_node
+        while node is not None:
+            route.append(self.node_cells[node])
+            node = came_from[node]
+        route.append(start_idx)
+        route.reverse()
+        # Doppelte Zellen entfernen (Start/Ziel können selbst Übergänge sein)
+        return [idx for i, idx in enumerate(route) if i == 0 or idx != route[i - 1]], best
+
+    def _refine(self, from_idx, to_idx):
+        """Verfeinert ein Teilstück des abstrakten Pfads in einzelne Gitterschritte."""
+        if self._cluster_of(from_idx) != self._cluster_of(to_idx):
+            return [to_idx] # Übergang zwischen zwei Clustern: genau ein Schritt
+        reached = self._cluster_bfs(to_idx, self._cluster_of(to_idx))
+        steps = []
+        current = from_idx
+        while current != to_idx:
+            current = reached[current][1]
+            steps.append(current)
+        return steps
+
+    def _remember(self, idx, goal_idx, steps):
+        for step in steps:
+            self._routes[(idx, goal_idx)] = step
+            idx = step
+        while len(self._routes) > MAX_CACHED_ROUTES:
+            self._routes.popitem(last=False)
+
+    def _remember_route(self, goal_idx, route):
+        if len(route) > 2:
+            self._abstract_routes[(route[1], goal_idx)] = route[1:]
+            while len(self._abstract_routes) > MAX_CACHED_ROUTES:
+                self._abstract_routes.popitem(last=False)
+
+    def next_step(self, start_pos, goal_pos):
+        """
+        Nächstes Feld auf dem Weg zum Ziel oder None, falls schon dort bzw. unerreichbar.
+        Wer dem Weg folgt, bekommt die folgenden Schritte aus dem Zwischenspeicher.
+        """
+        start_idx, goal_idx = self._index(start_pos), self._index(goal_pos)
+        if start_idx is None or goal_idx is None or start_idx == goal_idx:
+            return None
+
+        step = self._routes.pop((start_idx, goal_idx), None)
+        if step is None:
+            route = self._abstract_routes.pop((start_idx, goal_idx), None)
+            if route is None:
+                found = self._abstract_path(start_idx, goal_idx)
+                if found is None:
+                    return None
+                route = found[0]
+            # Nur das erste Teilstück verfeinern, der Rest folgt bei Bedarf
+            steps = self._refine(route[0], route[1])
+            self._remember_route(goal_idx, route)
+            step = steps[0]
+            self._remember(step, goal_idx, steps[1:])
+        return (step % self.width, step // self.width)
+
+    def distance(self, start_pos, goal_pos):
+        """
+        Näherung der Weglänge oder None, falls unerreichbar: die Länge des Weges
+        über die Übergänge der Cluster. Sie ist nie kürzer als der echte kürzeste
+        Weg, kann aber etwas länger sein (der Weg muss die Clustergrenzen an den
+        Übergängen kreuzen). Eine Verfeinerung im Gitter ist dafür nicht nötig.
+        """
+        start_idx, goal_idx = self._index(start_pos), self._index(goal_pos)
+        if start_idx is None or goal_idx is None:
+            return None
+        if start_idx == goal_idx:
+            return 0
+        found = self._abstract_path(start_idx, goal_idx)
+        return None if found is None else found[1]
+
+    @property
+    def node_count(self):
+        return len(self.node_cells)
+
+
+if __name__ == "__main__":
+    from src.game_logic.maze_generator import MazeGenerator
+
+    for size in [201, 501, 1001]:
+        random.seed(size)
+        maze = MazeGenerator.generate_maze(size, size)
+        open_cells = [(x, y) for y, row in enumerate(maze) for x, cell in enumerate(row) if cell != '#']
+
+        build_start = time.perf_counter()
+        pathfinder = HierarchicalPathfinder(maze)
+        build_time = time.perf_counter() - build_start
+
+        # Soldaten folgen ihrem Weg: erste Anfrage sucht, die folgenden schlagen nach
+        walkers = [tuple(random.sample(open_cells, 2)) for _ in range(20)]
+        ticks = 200
+        latencies = []
+        for start, goal in walkers:
+            pos = start
+            for _ in range(ticks):
+                query_start = time.perf_counter()
+                step = pathfinder.next_step(pos, goal)
+                latencies.append(time.perf_counter() - query_start)
+                if step is None:
+                    break
+                pos = step
+        latencies.sort()
+        print(f"{size}x{size}: {pathfinder.node_count} abstrakte Knoten (Aufbau {build_time:.1f} s) | "
+              f"Median {latencies[len(latencies) // 2] * 1e6:.1f} µs, "
+              f"Mittel {sum(latencies) / len(latencies) * 1e6:.1f} µs, "
+              f"Maximum {latencies[-1] * 1000:.1f} ms pro Schritt")
@@ -0,0 +1,48 @@
+from src.game_logic.grid import Grid
+from src.game_logic.observation import apply_action
+
+
+class InferenceScheduler:
+    """
+    Bündelt die Entscheidungen aller Soldaten, die von einem neuronalen Netz
+    gesteuert werden.
+
+    Pro Tick werden die Beobachtungen aller Soldaten eines Modells in einen
+    wiederverwendeten Puffer kodiert und mit einem einzigen Forward-Pass
+    ausgewertet, statt einen Durchlauf pro Soldat zu machen. Teams, die sich ein
+    Modell (dasselbe Policy-Objekt) teilen, landen im selben Stapel. Modelle
+    brauchen dafür eine Methode `forward(beobachtungen) -> Aktions-Indizes`.
+    """
+    def __init__(self):
+        self._buffers = {} # id(Modell) -> Eingabepuffer (Kapazität wächst bei Bedarf)
+
+    @staticmethod
+    def is_batched(policy):
+        return hasattr(policy, 'forward')
+
+    def _buffer(self, policy, encoder, count):
+        buffer = self._buffers.get(id(policy))
+        if buffer is None or len(buffer) < count:
+            capacity = max(count, 2 * len(buffer)) if buffer is not None else count
+            buffer = encoder.allocate(capacity)
+            self._buffers[id(policy)] = buffer
+        return buffer[:count]
+
+    def plan_moves(self, soldiers_by_policy, game_state):
+        """
+        `soldiers_by_policy`: Liste von (Modell, [Soldaten]). Gibt die neuen
+        Positionen als {soldier_id: (x, y)} zurück.
+        """
+        encoder = game_state.observation_encoder
+        grid = Grid.from_map_data(game_state.map_data)
+        moves = {}
+        for policy, soldiers in soldiers_by_policy:
+            if not soldiers:
+                continue
+            player_ids = [soldier.soldier_id for soldier in soldiers]
+            buffer = self._buffer(policy, encoder, len(player_ids))
+            observations = encoder.encode_game_state(game_state, player_ids, out=buffer)
+            actions = policy.forward(observations)
+            for soldier, action_index in zip(soldiers, actions):
+                moves[soldier.soldier_id] = apply_action(grid, soldier.position, int(action_index))
+        return moves
@@ -0,0 +1,186 @@
+import collections
+import heapq
+from array import array
+import numpy as np
+from src.game_logic.path_cache import DistanceFieldCache, UNREACHABLE
+
+
+class ItemFlowField:
+    """
+    Flussfeld zum jeweils nächstgelegenen Item.
+
+    Eine Breitensuche mit allen Items als Startpunkten liefert für jede freie
+    Zelle die echte Labyrinth-Distanz zum nächsten Item und das Item selbst.
+    Der nächste Schritt ist der Nachbar mit Distanz - 1. Wird ein Item platziert
+    oder eingesammelt, wird nur der betroffene Bereich neu berechnet; viele
+    Items auf einmal (Spielstart) setzt `reset` mit einer einzigen Suche.
+    """
+    def __init__(self, map_data, item_positions=()):
+        path_cache = DistanceFieldCache.for_map(map_data)
+        self.width = path_cache.width
+        self.height = path_cache.height
+        self.walkable = path_cache.walkable
+        size = self.width * self.height
+        self.dist = array('i', [UNREACHABLE]) * size
+        self.source = array('i', [-1]) * size # flacher Index des nächsten Items
+        self.sources = set()
+        self._walkable_mask = np.frombuffer(self.walkable, dtype=np.uint8).astype(bool)
+
+        self.reset(item_positions)
+
+    def reset(self, item_positions):
+        """
+        Berechnet das Feld für genau diese Items neu: eine Breitensuche mit allen
+        Items gleichzeitig als Startpunkten, Ebene für Ebene als NumPy-Operation.
+        Für das Platzieren vieler Items am Spielstart statt einer Suche pro Item.
+        """
+        width, size = self.width, self.width * self.height
+        # Sichten auf die Arrays, damit die übrigen Methoden unverändert damit arbeiten
+        dist = np.frombuffer(self.dist, dtype=np.int32)
+        source = np.frombuffer(self.source, dtype=np.int32)
+        dist.fill(UNREACHABLE)
+        source.fill(-1)
+        walkable = self._walkable_mask
+
+        frontier = np.unique(np.array([idx for idx in (self._index(pos) for pos in item_positions) if idx is not None],
+                                      dtype=np.int64))
+        self.sources = set(frontier.tolist())
+        dist[frontier] = 0
+        source[frontier] = frontier
+
+        level = 0
+        while frontier.size:
+            level += 1
+            x = frontier % width
+            parents = [frontier[x > 0], frontier[x < width - 1],
+                       frontier[frontier >= width], frontier[frontier + width < size]]
+            neighbours = np.concatenate([parents[0] - 1, parents[1] + 1, parents[2] - width, parents[3] + width])
+            parents = np.concatenate(parents)
+            new = walkable[neighbours] & (dist[neighbours] == UNREACHABLE)
+            # Erreichen mehrere Zellen denselben Nachbarn, gewinnt die erste
+            frontier, first = np.unique(neighbours[new], return_index=True)
+            dist[frontier] = level
+            source[frontier] = source[parents[new][first]]
+
+    def _index(self, pos):
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        idx = y * self.width + x
+        return idx if self.walkable[idx] else None
+
+    def _neighbours(self, idx):
+        width = self.width
+        x = idx % width
+        if x > 0:
+            yield idx - 1
+        if x < width - 1:
+            yield idx + 1
+        if idx >= width:
+            yield idx - width
+        if idx + width < width * self.height:
+            yield idx + width
+
+    def add_item(self, pos):
+        """Fügt ein Item hinzu und verbessert nur die Zellen, die jetzt näher an einem Item liegen."""
+        idx = self._index(pos)
+        if idx is None or idx in self.sources:
+            return
+        self.sources.add(idx)
+        self.dist[idx] = 0
+        self.source[idx] = idx
+
+        dist, source, walkable = self.dist, self.source, self.walkable
+        q = collections.deque([idx])
+        while q:
+            current = q.popleft()
+            next_dist = dist[current] + 1
+            for n in self._neighbours(current):
+                if walkable[n] and (dist[n] == UNREACHABLE or next_dist < dist[n]):
+                    dist[n] = next_dist
+                    source[n] = idx
+                    q.append(n)
+
+    def remove_item(self, pos):
+        """
+        Entfernt ein Item. Nur die Zellen, deren nächstes Item dieses war, werden
+        zurückgesetzt und vom Rand des übrigen Feldes aus neu aufgefüllt.
+        """
+        idx = self._index(pos)
+        if idx is None or idx not in self.sources:
+            return
+        self.sources.discard(idx)
+        dist, source, walkable = self.dist, self.source, self.walkable
+
+        # Betroffene Region sammeln (zusammenhängend, da jeder Vorgänger dieselbe Quelle hat)
+        region = [idx]
+        source[idx] = -1
+        dist[idx] = UNREACHABLE
+        q = collections.deque([idx])
+        while q:
+            current = q.popleft()
+            for n in self._neighbours(current):
+                if source[n] == idx:
+                    source[n] = -1
+                    dist[n] = UNREACHABLE
+                    region.append(n)
+                    q.append(n)
+
+        # Randzellen der übrigen Items als Startpunkte, nach Distanz geordnet
+        heap = []
+        for current in region:
+            for n in self._neighbours(current):
+                if walkable[n] and dist[n] != UNREACHABLE:
+                    heapq.heappush(heap, (dist[n], n))
+
+        while heap:
+            d, current = heapq.heappop(heap)
+            if d != dist[current]:
+                continue
+            next_dist = d + 1
+            for n in self._neighbours(current):
+                if walkable[n] and (dist[n] == UNREACHABLE or next_dist < dist[n]):
+                    dist[n] = next_dist
+                    source[n] = source[current]
+                    heapq.heappush(heap, (next_dist, n))
+
+    def sync(self, item_positions):
+        """Gleicht das Feld mit einer Menge von Item-Positionen ab (nur die Differenz wird angewendet)."""
+        wanted = {idx for idx in (self._index(pos) for pos in item_positions) if idx is not None}
+        for idx in self.sources - wanted:
+            self.remove_item(self._position(idx))
+        for idx in wanted - self.sources:
+            self.add_item(self._position(idx))
+
+    def _position(self, idx):
+        return (idx % self.width, idx // self.width)
+
+    def distance(self, pos):
+        """Labyrinth-Distanz zum nächsten Item oder None."""
+        idx = self._index(pos)
+        if idx is None or self.dist[idx] == UNREACHABLE:
+            return None
+        return self.dist[idx]
+
+    def nearest_item(self, pos):
+        """Position des nächstgelegenen Items oder None."""
+        idx = self._index(pos)
+        if idx is None or self.source[idx] < 0:
+            return None
+        return self._position(self.source[idx])
+
+    def next_step(self, pos):
+        """
+        Nächster Schritt in Richtung des nächsten Items.
+        None, wenn kein Item erreichbar ist oder die Zelle selbst ein Item enthält.
+        """
+        idx = self._index(pos)
+        if idx is None:
+            return None
+        d = self.dist[idx]
+        if d <= 0:
+            return None
+        for n in self._neighbours(idx):
+            if self.dist[n] == d - 1:
+                return self._position(n)
+        return None
@@ -1,48 +1,83 @@
 import random
-import time
+from src.game_logic.grid import Grid
+from src.game_logic.free_cell_index import FreeCellIndex
+from src.game_logic.item_flow_field import ItemFlowField
+from src.game_logic.clock import REAL_TIME_CLOCK
+
+# Item-Regeln des ursprünglichen GUI-Spiels: ein Item pro 50 Zellen, alle 20 Sekunden
+# Nachschub und eine gewichtete Auswahl (Nuke selten und nicht am Spielstart).
+# Ohne Angabe gelten die Standardregeln: ein Item pro 20 Zellen, alle 30 Sekunden, gleich verteilt.
+GUI_ITEM_RULES = {
+    'respawn_delay': 20,
+    'cells_per_item': 50,
+    'item_weights': {'knife': 10, 'gun': 8, 'grenade': 5, 'pink duck': 5, 'red pill': 6,
+                     'blue pill': 7, 'fake_flag': 3, 'binoculars': 4, 'nuke': 1},
+}
 
 class ItemManager:
     """
     Verwaltet das Platzieren, Einsammeln und Respawn von Objekten auf der Karte.
     """
-    def __init__(self, map_data, base_positions, all_soldier_positions):
-        self.map_data = map_data
+    def __init__(self, map_data, base_positions, all_soldier_positions, clock=None,
+                 respawn_delay=30, cells_per_item=20, item_weights=None):
+        self.grid = Grid.from_map_data(map_data)
         self.base_positions = base_positions
         self.soldier_positions = all_soldier_positions
-        self.map_height = len(map_data)
-        self.map_width = len(map_data[0]) if self.map_height > 0 else 0
+        self.map_height = self.grid.height
+        self.map_width = self.grid.width
         
         # Maximale Anzahl an Items basierend auf der Kartengröße
-        self.max_item_count = (self.map_width * self.map_height) // 20
+        self.max_item_count = (self.map_width * self.map_height) // cells_per_item
         
-        self.respawn_delay = 30 # Sekunden für das schrittweise Auffüllen
-        self.last_respawn_time = 0
+        self.respawn_delay = respawn_delay # Sekunden für das schrittweise Auffüllen
+        self.item_weights = item_weights # None = gleich verteilt, sonst {Item: Gewicht}
+        self.last_respawn_time = float('-inf') # Erstes Auffüllen sofort möglich
+        self.clock = clock or REAL_TIME_CLOCK
         self.items_on_map = {}
+        # Änderungen nach dem Spielstart in Reihenfolge: (Position, Item-Typ oder None = entfernt).
+        # Wird nur angehängt, damit andere Threads (Snapshots) ohne Kopie mitlesen können.
+        self.item_changes = []
         self.flag_placed = False
+        # Flussfeld zum nächsten Item, wird bei jedem Platzieren/Einsammeln inkrementell angepasst
+        self.flow_field = ItemFlowField(self.grid)
+
+        # Index der freien Felder: Basen sind dauerhaft belegt, Soldaten werden separat geführt
+        self.free_cells = FreeCellIndex(self.grid)
+        for pos in set(base_positions.values()):
+            self.free_cells.occupy(pos)
+        for pos in all_soldier_positions:
+            self.free_cells.add_soldier(pos)
 
     def place_initial_items(self):
         """
         Platziert die Flagge, optional eine Nuke und die restlichen Objekte am Spielstart.
         Stellt sicher, dass maximal eine Nuke platziert wird.
         """
+        # Viele Items auf einmal: das Flussfeld wird danach einmal für alle berechnet
         if not self.flag_placed:
-            self._place_specific_item('flag')
+            self._place_specific_item('flag', initial=True)
             self.flag_placed = True
 
         # Liste der zufälligen Items (ohne Flagge und Nuke)
         items_list = ['red pill', 'blue pill', 'knife', 'gun', 'grenade', 'pink duck', 'fake_flag', 'binoculars']
         
         # Platziere optional eine Nuke mit einer bestimmten Wahrscheinlichkeit
-        if random.random() < 0.10:  # 10% Wahrscheinlichkeit für eine Nuke am Start
-            if self._place_specific_item('nuke'):
+        if self.item_weights is None and random.random() < 0.10:  # 10% Wahrscheinlichkeit für eine Nuke am Start
+            if self._place_specific_item('nuke', initial=True):
                 print("Eine Nuke wurde am Spielstart platziert.")
 
         initial_item_count = self.max_item_count // 2
         
         # Platziere die restlichen Items
         for _ in range(initial_item_count - len(self.items_on_map)):
-            item_type = random.choice(items_list)
-            self._place_specific_item(item_type)
+            if self.item_weights is None:
+                item_type = random.choice(items_list)
+            else:
+                item_type = self._get_weighted_item(items_list)
+            self._place_specific_item(item_type, initial=True)
+
+        self.flow_field.reset(self.items_on_map)
+        print(f"{len(self.items_on_map)} Items wurden am Spielstart platziert.")
 
     def _get_random_item(self, items_list):
         """
@@ -56,27 +91,52 @@ class ItemManager:
         else:
             return random.choice([item for item in items_list if item != 'nuke'])
 
-    def _place_specific_item(self, item_type):
+    def _get_weighted_item(self, items_list):
+        """Wählt ein Item gemäß item_weights (Items ohne Gewicht kommen nicht vor)."""
+        weights = [self.item_weights.get(item, 0) for item in items_list]
+        return random.choices(items_list, weights=weights, k=1)[0]
+
+    def _place_specific_item(self, item_type, initial=False):
         """
         Platziert ein spezifisches Item an einer zufälligen, leeren Position.
+        Mit initial=True (Spielstart) bleiben Flussfeld und Ausgabe dem Aufrufer überlassen.
         """
-        empty_positions = self._get_empty_positions()
-        if empty_positions:
-            x, y = random.choice(empty_positions)
+        position = self.free_cells.sample(exclude_soldiers=True)
+        if position:
+            x, y = position
             # Item wird in einem Dictionary gespeichert, um seine Position zu verfolgen
             self.items_on_map[(x, y)] = item_type
-            print(f"Item '{item_type}' wurde bei ({x}, {y}) platziert.")
+            self.free_cells.occupy((x, y))
+            if not initial:
+                self.item_changes.append(((x, y), item_type))
+                self.flow_field.add_item((x, y))
+                print(f"Item '{item_type}' wurde bei ({x}, {y}) platziert.")
             return True
         else:
             print(f"Warnung: Nicht genug Platz für neue Objekte. '{item_type}' konnte nicht platziert werden.")
             return False
 
+    def collect_item(self, position):
+        """
+        Entfernt das Item an der Position von der Karte und gibt seinen Typ zurück.
+        """
+        item_type = self.items_on_map.pop(position, None)
+        if item_type is not None:
+            self.item_changes.append((position, None))
+            self.flow_field.remove_item(position)
+            self.free_cells.release(position)
+        return item_type
+
+    def move_soldier(self, old_position, new_position):
+        """Hält den Index der freien Felder aktuell, wenn sich ein Soldat bewegt."""
+        self.free_cells.move_soldier(old_position, new_position)
+
     def update_item_respawn(self):
         """
         Überprüft, ob neue Items platziert werden sollen, um das Maximum aufzufüllen.
         """
         if len(self.items_on_map) < self.max_item_count and \
-           (time.time() - self.last_respawn_time) > self.respawn_delay:
+           (self.clock.now() - self.last_respawn_time) > self.respawn_delay:
             
             # Platziere ein einzelnes neues Item
             items_list = ['red pill', 'blue pill', 'nuke', 'knife', 'gun', 'grenade', 'pink duck', 'fake_flag', 'binoculars']
@@ -85,25 +145,17 @@ class ItemManager:
             if 'nuke' in self.items_on_map.values():
                 items_list.remove('nuke')
                 
-            new_item = self._get_random_item(items_list)
+            if self.item_weights is None:
+                new_item = self._get_random_item(items_list)
+            else:
+                new_item = self._get_weighted_item(items_list)
             
             if self._place_specific_item(new_item):
-                self.last_respawn_time = time.time()
+                self.last_respawn_time = self.clock.now()
                 print(f"Neues Item '{new_item}' wurde platziert.")
 
     def _get_empty_positions(self):
         """
-        Findet alle leeren Positionen auf der Karte, die keine Mauern, Basen, Items oder Soldaten sind.
+        Gibt alle leeren Positionen auf der Karte zurück, die keine Mauern, Basen, Items oder Soldaten sind.
         """
-        map_height = len(self.map_data)
-        map_width = len(self.map_data[0]) if map_height > 0 else 0
-        
-        # Füge die Positionen der Soldaten zur Liste der zu vermeidenden Positionen hinzu
-        occupied_positions = set(self.items_on_map.keys()) | set(self.base_positions.values()) | set(self.soldier_positions)
-        
-        empty_positions = []
-        for y in range(map_height):
-            for x in range(map_width):
-                if self.map_data[y][x] == ' ' and (x, y) not in occupied_positions:
-                    empty_positions.append((x, y))
-        return empty_positions
\ No newline at end of file
+        return self.free_cells.cells(exclude_soldiers=True)
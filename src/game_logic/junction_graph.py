@@ -0,0 +1,334 @@
+import collections
+import heapq
+import random
+import time
+from array import array
+from src.game_logic.path_cache import DistanceFieldCache
+
+# Wie viele kompilierte Graphen gleichzeitig im Speicher gehalten werden
+MAX_CACHED_GRAPHS = 8
+# Wie viele angefangene Suchen (eine pro Ziel) ein Graph weiterführen kann
+MAX_TARGET_SEARCHES = 64
+
+
+class _TargetSearch:
+    """
+    Dijkstra vom Ziel aus, die nur so weit läuft wie nötig und bei der nächsten
+    Anfrage zum selben Ziel weitergeführt wird. Pro Knoten: Distanz zum Ziel und
+    das nächste Feld in Richtung Ziel.
+    """
+    def __init__(self):
+        self.dist = {}
+        self.step = {}
+        self.settled = set()
+        self.heap = []
+
+
+class JunctionGraph:
+    """
+    Kompilierte Graph-Darstellung einer Karte für die Pfadfindung.
+
+    Knoten sind Kreuzungen, Sackgassen sowie zusätzliche Schlüsselzellen
+    (z.B. Basen und Items). Kanten sind die 1 Feld breiten Gänge dazwischen,
+    jeweils mit ihrer Länge und ihren Zellen. Suchanfragen laufen auf diesem
+    deutlich kleineren Graphen; ins Gitter zurückübersetzt wird nur der nächste
+    Schritt. Die Suche läuft vom Ziel aus und wird pro Ziel aufbewahrt: folgt ein
+    Soldat Tick für Tick demselben Ziel, sind seine Knoten meist schon bekannt.
+    """
+    _instances = collections.OrderedDict()
+
+    def __init__(self, map_data, key_positions=()):
+        path_cache = DistanceFieldCache.for_map(map_data)
+        self.width = path_cache.width
+        self.height = path_cache.height
+        self.walkable = path_cache.walkable
+
+        size = self.width * self.height
+        self.node_cells = []                              # Knoten-ID -> flacher Index
+        self.node_of = {}                                 # flacher Index -> Knoten-ID
+        self.adjacency = []                               # Knoten-ID -> [(Nachbar, Länge, erstes Feld vom Nachbarn zurück)]
+        self.corridors = []                               # Gang-ID -> (Knoten A, Knoten B, Zellen)
+        self.corridor_of = array('i', [-1]) * size        # Zelle -> Gang-ID
+        self.corridor_offset = array('i', [0]) * size     # Zelle -> Abstand zu Knoten A
+        self._searches = collections.OrderedDict()        # Ziel (flacher Index) -> _TargetSearch
+
+        self._build(key_positions)
+
+    @classmethod
+    def for_map(cls, map_data, key_positions=()):
+        """
+        Gibt den gemeinsamen Graphen für diese Karte und diese Schlüsselzellen zurück.
+        """
+        key = (DistanceFieldCache._map_key(map_data), frozenset(key_positions))
+        graph = cls._instances.get(key)
+        if graph is None:
+            graph = cls(map_data, key_positions)
+            cls._instances[key] = graph
+            while len(cls._instances) > MAX_CACHED_GRAPHS:
+                cls._instances.popitem(last=False)
+        else:
+            cls._instances.move_to_end(key)
+        return graph
+
+    # --- Aufbau ---
+
+    def _neighbours(self, idx):
+        width = self.width
+        x = idx % width
+        result = []
+        if x > 0 and self.walkable[idx - 1]:
+            result.append(idx - 1)
+        if x < width - 1 and self.walkable[idx + 1]:
+            result.append(idx + 1)
+        if idx >= width and self.walkable[idx - width]:
+            result.append(idx - width)
+        if idx + width < width * self.height and self.walkable[idx + width]:
+            result.append(idx + width)
+        return result
+
+    def _add_node(self, idx):
+        node = len(self.node_cells)
+        self.node_cells.append(idx)
+        self.node_of[idx] = node
+        self.adjacency.append([])
+        return node
+
+    def _build(self, key_positions):
+        width = self.width
+        keys = {y * width + x for x, y in key_positions
+                if 0 <= x < width and 0 <= y < self.height and self.walkable[y * width + x]}
+
+        for idx in range(width * self.height):
+            if self.walkable[idx] and (idx in keys or len(self._neighbours(idx)) != 2):
+                self._add_node(idx)
+
+        for node in range(len(self.node_cells)):
+            self._trace_corridors(node)
+
+        # Geschlossene Ringe ohne Kreuzung bekommen einen künstlichen Knoten
+        for idx in range(width * self.height):
+            if self.walkable[idx] and idx not in self.node_of and self.corridor_of[idx] < 0:
+                self._trace_corridors(self._add_node(idx))
+
+    def _trace_corridors(self, node):
+        """Folgt von einem Knoten aus jedem Gang bis zum nächsten Knoten."""
+        start = self.node_cells[node]
+        for first in self._neighbours(start):
+            if first in self.node_of:
+                # Direkt benachbarte Knoten: Gang ohne Zellen, nur einmal anlegen
+                other = self.node_of[first]
+                if node < other:
+                    self._add_corridor(node, other, [])
+                continue
+            if self.corridor_of[first] >= 0:
+                continue # Gang wurde bereits vom anderen Ende aus angelegt
+
+            cells = []
+            prev, current = start, first
+            while current not in self.node_of:
+                cells.append(current)
+                following = [n for n in self._neighbours(current) if n != prev]
+                prev, current = current, following[0]
+            self._add_corridor(node, self.node_of[current], cells)
+
+    def _add_corridor(self, node_a, node_b, cells):
+        corridor = len(self.corridors)
+        self.corridors.append((node_a, node_b, array('i', cells)))
+        for offset, idx in enumerate(cells, start=1):
+            self.corridor_of[idx] = corridor
+            self.corridor_offset[idx] = offset
+        if node_a != node_b:
+            length = len(cells) + 1
+            # Vom Nachbarn aus betritt man den Gang am anderen Ende
+            self.adjacency[node_a].append((node_b, length, cells[-1] if cells else self.node_cells[node_a]))
+            self.adjacency[node_b].append((node_a, length, cells[0] if cells else self.node_cells[node_b]))
+
+    # --- Anfragen ---
+
+    def _index(self, pos):
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        idx = y * self.width + x
+        return idx if self.walkable[idx] else None
+
+    def _attach(self, idx):
+        """
+        Liefert die Knoten, über die eine Zelle den Graphen erreicht:
+        [(Knoten, Kosten, erster Schritt im Gitter)].
+        """
+        node = self.node_of.get(idx)
+        if node is not None:
+            return [(node, 0, None)]
+        corridor = self.corridor_of[idx]
+        node_a, node_b, cells = self.corridors[corridor]
+        offset = self.corridor_offset[idx]
+        step_a = cells[offset - 2] if offset > 1 else self.node_cells[node_a]
+        step_b = cells[offset] if offset < len(cells) else self.node_cells[node_b]
+        return [(node_a, offset, step_a), (node_b, len(cells) + 1 - offset, step_b)]
+
+    def _target_search(self, target_idx):
+        search = self._searches.get(target_idx)
+        if search is None:
+            search = _TargetSearch()
+            for node, cost, entry in self._entries(target_idx):
+                if cost < search.dist.get(node, float('inf')):
+                    search.dist[node] = cost
+                    search.step[node] = entry
+                    heapq.heappush(search.heap, (cost, node))
+            self._searches[target_idx] = search
+            while len(self._searches) > MAX_TARGET_SEARCHES:
+                self._searches.popitem(last=False)
+        else:
+            self._searches.move_to_end(target_idx)
+        return search
+
+    def _settle(self, search, options, best):
+        """
+        Führt die Suche vom Ziel aus fort, bis für jede Anschlussmöglichkeit
+        (Knoten, Kosten vom Start) die Distanz feststeht oder sie `best` nicht mehr
+        unterbieten kann. Gibt die beste Weglänge über die Knoten zurück.
+        """
+        dist, step, settled, heap = search.dist, search.step, search.settled, search.heap
+        inf = float('inf')
+        pending = {}
+        for node, cost, _ in options:
+            if node in settled:
+                best = min(best, cost + dist[node])
+            else:
+                # Ringgang: beide Enden können derselbe Knoten sein
+                pending[node] = min(cost, pending.get(node, inf))
+        cheapest = min(pending.values(), default=0)
+        while heap and pending:
+            if heap[0][0] + cheapest >= best:
+                break
+            d, node = heapq.heappop(heap)
+            if node in settled or d > dist[node]:
+                continue
+            settled.add(node)
+            if node in pending:
+                best = min(best, pending.pop(node) + d)
+                cheapest = min(pending.values(), default=0)
+            for other, length, back in self.adjacency[node]:
+                nd = d + length
+                if nd < dist.get(other, inf):
+                    dist[other] = nd
+                    step[other] = back
+                    heapq.heappush(heap, (nd, other))
+        return best
+
+    def _search(self, start_idx, target_idx):
+        """
+        Kürzester Weg über den Knoten-Graphen. Gibt (Distanz, erster Schritt als flacher Index) zurück.
+        """
+        if start_idx == target_idx:
+            return 0, None
+
+        best, best_step = float('inf'), None
+
+        # Start und Ziel im selben Gang: direkter Weg ohne Knoten
+        start_corridor = self.corridor_of[start_idx]
+        if start_corridor >= 0 and start_corridor == self.corridor_of[target_idx]:
+            offset_start = self.corridor_offset[start_idx]
+            offset_target = self.corridor_offset[target_idx]
+            cells = self.corridors[start_corridor][2]
+            best = abs(offset_start - offset_target)
+            best_step = cells[offset_start] if offset_target > offset_start else cells[offset_start - 2]
+
+        search = self._target_search(target_idx)
+        options = self._attach(start_idx)
+        via_nodes = self._settle(search, options, best)
+        if via_nodes < best:
+            for node, cost, step in options:
+                if node in search.settled and cost + search.dist[node] == via_nodes:
+                    best = via_nodes
+                    best_step = step if step is not None else search.step[node]
+                    break
+
+        if best == float('inf'):
+            return None, None
+        return best, best_step
+
+    def _entries(self, idx):
+        """
+        Wie `_attach`, aber aus Sicht des Ziels: [(Knoten, Restkosten, erste Zelle vom Knoten aus)].
+        """
+        node = self.node_of.get(idx)
+        if node is not None:
+            return [(node, 0, None)]
+        corridor = self.corridor_of[idx]
+        node_a, node_b, cells = self.corridors[corridor]
+        offset = self.corridor_offset[idx]
+        return [(node_a, offset, cells[0]), (node_b, len(cells) + 1 - offset, cells[-1])]
+
+    def distance(self, start_pos, target_pos):
+        """Kürzeste Weglänge zwischen zwei Zellen oder None, falls unerreichbar."""
+        start_idx, target_idx = self._index(start_pos), self._index(target_pos)
+        if start_idx is None or target_idx is None:
+            return None
+        return self._search(start_idx, target_idx)[0]
+
+    def next_step(self, start_pos, target_pos):
+        """
+        Nächstes Feld auf dem kürzesten Weg zum Ziel.
+        None, wenn das Ziel bereits erreicht oder nicht erreichbar ist.
+        """
+        start_idx, target_idx = self._index(start_pos), self._index(target_pos)
+        if start_idx is None or target_idx is None:
+            return None
+        step = self._search(start_idx, target_idx)[1]
+        if step is None:
+            return None
+        return (step % self.width, step // self.width)
+
+    @property
+    def node_count(self):
+        return len(self.node_cells)
+
+
+def _grid_bfs_distance(path_cache, start_pos, target_pos):
+    """Einfache Breitensuche im Gitter mit frühem Abbruch (Vergleichswert für den Benchmark)."""
+    width = path_cache.width
+    walkable = path_cache.walkable
+    start = start_pos[1] * width + start_pos[0]
+    target = target_pos[1] * width + target_pos[0]
+    dist = {start: 0}
+    q = collections.deque([start])
+    while q:
+        idx = q.popleft()
+        if idx == target:
+            return dist[idx]
+        for n in (idx - 1, idx + 1, idx - width, idx + width):
+            if 0 <= n < len(walkable) and walkable[n] and n not in dist:
+                dist[n] = dist[idx] + 1
+                q.append(n)
+    return None
+
+
+if __name__ == "__main__":
+    from src.game_logic.maze_generator import MazeGenerator
+
+    queries = 200
+    for size in [31, 101, 201, 501]:
+        random.seed(size)
+        maze = MazeGenerator.generate_maze(size, size)
+        open_cells = [(x, y) for y, row in enumerate(maze) for x, cell in enumerate(row) if cell != '#']
+        pairs = [tuple(random.sample(open_cells, 2)) for _ in range(queries)]
+
+        build_start = time.perf_counter()
+        graph = JunctionGraph(maze)
+        build_time = time.perf_counter() - build_start
+        path_cache = DistanceFieldCache.for_map(maze)
+
+        bfs_start = time.perf_counter()
+        bfs_results = [_grid_bfs_distance(path_cache, a, b) for a, b in pairs]
+        bfs_time = time.perf_counter() - bfs_start
+
+        graph_start = time.perf_counter()
+        graph_results = [graph.distance(a, b) for a, b in pairs]
+        graph_time = time.perf_counter() - graph_start
+
+        assert bfs_results == graph_results, "Graph und BFS liefern unterschiedliche Distanzen!"
+        print(f"{size}x{size}: {len(open_cells)} Zellen -> {graph.node_count} Knoten "
+              f"(Aufbau {build_time * 1000:.1f} ms) | BFS {bfs_time / queries * 1000:.3f} ms/Anfrage, "
+              f"Graph {graph_time / queries * 1000:.3f} ms/Anfrage, Faktor {bfs_time / graph_time:.1f}x")
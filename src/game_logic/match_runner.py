@@ -0,0 +1,108 @@
+import contextlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from src.agents.backends import backend_name, create_policy
+from src.game_logic.grid import Grid
+from src.game_logic.simulation import run_match
+from src.utils.config import ConfigManager
+
+_SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAPS_DIR = os.path.join(_SRC_DIR, 'assets', 'maps')
+
+# Caches pro Worker-Prozess: jede Karte und jedes Modell wird nur einmal geladen,
+# egal wie viele Partien der Worker spielt.
+_map_cache = {}
+_policy_cache = {}
+
+
+def load_map(map_name):
+    """Lädt eine Karte aus src/assets/maps (oder einen Pfad) über den Worker-Cache."""
+    grid = _map_cache.get(map_name)
+    if grid is None:
+        path = map_name if os.path.exists(map_name) else os.path.join(MAPS_DIR, map_name)
+        grid = Grid.load(path)
+        _map_cache[map_name] = grid
+    return grid
+
+
+def load_policy(ai_model):
+    """
+    Steuerung für ein ai_model über den Worker-Cache. Ohne Modell (None/'BFS')
+    läuft das Team mit dem AIAgent. Das Backend (Torch, TensorFlow, LLM) wird
+    über die Registry erst importiert, wenn eine Partie es tatsächlich braucht.
+    """
+    name = backend_name(ai_model)
+    if name not in _policy_cache:
+        _policy_cache[name] = create_policy(name)
+    return _policy_cache[name]
+
+
+def make_spec(map_name, teams, seed=None, best_of=None, **options):
+    """
+    Beschreibt eine Partie. `teams` sind Dictionaries wie aus dem GameSetupDialog
+    ({'name': ..., 'ai_model': 'Torch'/'TensorFlow'}) oder nur Teamnamen.
+    best_of kommt ohne Angabe aus den Einstellungen des ConfigManagers.
+    """
+    if best_of is None:
+        best_of = ConfigManager().load_settings().get('best_of', 3)
+    teams = [team if isinstance(team, dict) else {'name': team} for team in teams]
+    return {'map': map_name, 'teams': teams, 'seed': seed, 'best_of': best_of, 'options': options}
+
+
+def play_match(spec, verbose=False):
+    """Spielt eine Partie nach Spezifikation (läuft im Worker-Prozess)."""
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        grid = load_map(spec['map'])
+        policies = {}
+        for team in spec['teams']:
+            policy = load_policy(team.get('ai_model'))
+            if policy is not None:
+                policies[team['name']] = policy
+        match = run_match(grid, spec['teams'], best_of=spec['best_of'], seed=spec['seed'],
+                          policies=policies, **spec.get('options', {}))
+    match['spec'] = spec
+    return match
+
+
+def run_matches(specs, max_workers=None, verbose=False):
+    """
+    Verteilt die Partien auf einen ProcessPoolExecutor und liefert die Ergebnisse,
+    sobald sie fertig sind (nicht in Eingabereihenfolge). Mit max_workers=1 wird
+    ohne Prozesse im aktuellen Prozess gespielt.
+    """
+    if max_workers == 1:
+        for spec in specs:
+            yield play_match(spec, verbose)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(play_match, spec, verbose) for spec in specs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def aggregate(results):
+    """
+    Fasst Partie-Ergebnisse zusammen: Punkte (ScoreManager) und Kills über alle
+    Runden, gewonnene Runden und gewonnene Partien pro Team.
+    """
+    totals = {'matches': 0, 'rounds': 0, 'ticks': 0,
+              'scores': {}, 'kills': {}, 'round_wins': {}, 'match_wins': {}, 'draws': 0}
+    for match in results:
+        totals['matches'] += 1
+        if match['winner'] is None:
+            totals['draws'] += 1
+        else:
+            totals['match_wins'][match['winner']] = totals['match_wins'].get(match['winner'], 0) + 1
+        for result in match['rounds']:
+            totals['rounds'] += 1
+            totals['ticks'] += result['ticks']
+            for team, score in result['scores'].items():
+                totals['scores'][team] = totals['scores'].get(team, 0) + score
+            for team, kills in result['kills'].items():
+                totals['kills'][team] = totals['kills'].get(team, 0) + kills
+            if result['winner'] is not None:
+                totals['round_wins'][result['winner']] = totals['round_wins'].get(result['winner'], 0) + 1
+    return totals
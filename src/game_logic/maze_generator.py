@@ -26,24 +26,35 @@ class MazeGenerator:
         
         def carve_path(x, y):
             """
-            Rekursiver Backtracking-Algorithmus zur Erstellung des Labyrinths.
+            Backtracking-Algorithmus zur Erstellung des Labyrinths.
+            Arbeitet mit einem expliziten Stack statt mit Rekursion, damit auch sehr
+            große Karten nicht an das Rekursionslimit von Python stoßen. Die Reihenfolge
+            der Zellen ist identisch zur rekursiven Variante.
             """
-            # Setze die aktuelle Zelle als Weg
+            # Setze die Startzelle als Weg
             maze[y][x] = '.'
 
-            # Erstelle eine zufällige Liste von Richtungen
+            # Jeder Stack-Eintrag: Zelle und ihre noch nicht probierten, zufällig sortierten Richtungen
             directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
             random.shuffle(directions)
+            stack = [(x, y, iter(directions))]
 
-            for dx, dy in directions:
-                nx, ny = x + dx * 2, y + dy * 2
+            while stack:
+                cx, cy, remaining = stack[-1]
+                for dx, dy in remaining:
+                    nx, ny = cx + dx * 2, cy + dy * 2
 
-                # Überprüfe, ob die neue Zelle innerhalb der Grenzen liegt und eine Wand ist
-                if 0 <= nx < width and 0 <= ny < height and maze[ny][nx] == '#':
-                    # Schlage einen Gang zwischen der aktuellen und der neuen Zelle
-                    maze[y + dy][x + dx] = '.'
-                    # Rufe die Funktion rekursiv für die neue Zelle auf
-                    carve_path(nx, ny)
+                    # Überprüfe, ob die neue Zelle innerhalb der Grenzen liegt und eine Wand ist
+                    if 0 <= nx < width and 0 <= ny < height and maze[ny][nx] == '#':
+                        # Schlage einen Gang zwischen der aktuellen und der neuen Zelle
+                        maze[cy + dy][cx + dx] = '.'
+                        maze[ny][nx] = '.'
+                        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
+                        random.shuffle(directions)
+                        stack.append((nx, ny, iter(directions)))
+                        break
+                else:
+                    stack.pop()
 
         # Beginne mit dem Schnitzen von einem zufälligen ungeraden Startpunkt
         start_x = random.randrange(1, width, 2)
@@ -0,0 +1,265 @@
+import numpy as np
+from src.game_logic.grid import Grid
+from src.game_logic.game_state import ITEM_TYPES, ITEM_CODES
+
+# Sichtfenster um den Soldaten: (2 * Radius + 1)^2 Felder
+DEFAULT_RADIUS = 5
+
+# Kanäle des Sichtfensters: Mauern, je ein Kanal pro Item-Typ (außer der Flagge),
+# Verbündete, Gegner, eigene Basis und Flagge (liegend oder getragen)
+CHANNELS = (['walls'] + [name for name in ITEM_TYPES[1:] if name != 'flag']
+            + ['allies', 'enemies', 'own_base', 'flag'])
+WALLS_CHANNEL = 0
+ALLIES_CHANNEL = CHANNELS.index('allies')
+ENEMIES_CHANNEL = CHANNELS.index('enemies')
+OWN_BASE_CHANNEL = CHANNELS.index('own_base')
+FLAG_CHANNEL = CHANNELS.index('flag')
+# Item-Code -> Kanal
+ITEM_CHANNELS = {code: (FLAG_CHANNEL if name == 'flag' else CHANNELS.index(name))
+                 for name, code in ITEM_CODES.items()}
+
+# Skalare Merkmale hinter dem Fenster
+SCALAR_FEATURES = ['health', 'attack', 'attack_range', 'vision', 'alive', 'carrying_flag',
+                   'x', 'y', 'base_dx', 'base_dy', 'time_left']
+
+# Normierung der Skalare (Nuke-Werte werden abgeschnitten)
+HEALTH_SCALE = 25
+ATTACK_CLIP = 100
+RANGE_CLIP = 10
+VISION_SCALE = 10
+
+
+def observation_size(radius=DEFAULT_RADIUS):
+    """Länge des flachen Beobachtungsvektors; hängt nur vom Radius ab, nicht von der Karte."""
+    window = 2 * radius + 1
+    return len(CHANNELS) * window * window + len(SCALAR_FEATURES)
+
+
+OBSERVATION_SIZE = observation_size()
+
+# Gemeinsame Reihenfolge der Modell-Ausgänge von KI_Torch und KI_TensorFlow:
+# Oben, Unten, Links, Rechts, Nichts
+ACTION_DELTAS = [(0, -1), (0, 1), (-1, 0), (1, 0), (0, 0)]
+
+
+def apply_action(grid, position, action_index):
+    """Führt eine Modell-Aktion aus; Schritte gegen eine Mauer lassen den Soldaten stehen."""
+    dx, dy = ACTION_DELTAS[action_index]
+    x, y = position[0] + dx, position[1] + dy
+    # Die Position liegt auf der Karte, ihr Nachbar also höchstens ein Feld daneben
+    return (x, y) if grid._is_free_unchecked(x, y) else position
+
+
+class ObservationEncoder:
+    """
+    Kodiert den Spielzustand in Beobachtungen fester Größe.
+
+    Jeder Soldat sieht ein egozentrisches Fenster (Kanäle x Fenster x Fenster)
+    plus einen Vektor skalarer Merkmale, flach hintereinander in einem
+    float32-Vektor der Länge `size`. Geschrieben wird in vorab angelegte
+    NumPy-Puffer, die mit `to_torch` (torch.from_numpy) bzw. `to_tensorflow`
+    ohne Kopie an die Modelle gehen. `encode_batch` kodiert alle Soldaten
+    aller Partien in einem Aufruf, `encode` einen Soldaten aus einem GameState.
+    Das Item-Gitter eines GameState wird nur einmal pro Tick (GameState.version)
+    aufgebaut und von allen Soldaten dieses Ticks geteilt.
+    """
+    def __init__(self, map_data, radius=DEFAULT_RADIUS):
+        self.grid = Grid.from_map_data(map_data)
+        self.radius = radius
+        self.window = 2 * radius + 1
+        self.window_cells = self.window * self.window
+        self.window_size = len(CHANNELS) * self.window_cells
+        self.size = self.window_size + len(SCALAR_FEATURES)
+
+        # Karte rundum um den Radius mit Mauern aufgefüllt: Fenster brauchen keine Grenzprüfung
+        self.padded_width = self.grid.width + 2 * radius
+        self.padded_height = self.grid.height + 2 * radius
+        walls = np.pad(~self.grid.free_mask, radius, constant_values=True)
+        self.walls = np.ascontiguousarray(walls, dtype=np.float32).ravel()
+        dy, dx = np.mgrid[0:self.window, 0:self.window]
+        self.offsets = (dy * self.padded_width + dx).ravel()
+
+        self._items = np.zeros((0, self.padded_height, self.padded_width), dtype=np.int8)
+        self._item_codes = np.array(sorted(ITEM_CHANNELS), dtype=np.int8)
+        self._item_channels = np.array([ITEM_CHANNELS[code] for code in self._item_codes])
+        self._item_grid = None # (GameState, version, aufgefülltes Item-Gitter)
+
+    def allocate(self, *batch_shape):
+        """Legt einen wiederverwendbaren Ausgabepuffer der Form (*batch_shape, size) an."""
+        return np.zeros(batch_shape + (self.size,), dtype=np.float32)
+
+    def encode_batch(self, state, out=None):
+        """
+        Kodiert alle Soldaten von G Partien mit je A Soldaten. `state` ist ein
+        Dictionary von Arrays (Kartenkoordinaten, ohne Auffüllung):
+          'items' (G, H, W) Item-Codes (oder 'padded_items' bereits um den Radius
+          aufgefüllt), 'x'/'y' (G, A), 'team' (A,) oder (G, A),
+          'alive', 'carrying_flag', 'health', 'attack', 'attack_range', 'vision' (G, A),
+          'bases_x'/'bases_y' (G, Teams), 'time_left' (G,) als Anteil der Rundenzeit.
+        Gibt `out` mit Form (G, A, size) zurück.
+        """
+        x = np.asarray(state['x'])
+        y = np.asarray(state['y'])
+        games, agents = x.shape
+        if out is None:
+            out = self.allocate(games, agents)
+        team = np.broadcast_to(state['team'], (games, agents))
+        alive = np.asarray(state['alive'], dtype=bool)
+        carrying = np.asarray(state['carrying_flag'], dtype=bool)
+
+        flat = out.reshape(games * agents, self.size)
+        windows = flat[:, :self.window_size].reshape(games * agents, len(CHANNELS), self.window_cells)
+        r = self.radius
+
+        # Mauern und Items: Fenster aus der aufgefüllten Karte ausschneiden
+        if 'padded_items' in state:
+            items = state['padded_items']
+        else:
+            if self._items.shape[0] < games:
+                self._items = np.zeros((games, self.padded_height, self.padded_width), dtype=np.int8)
+            items = self._items[:games]
+            items[:, r:r + self.grid.height, r:r + self.grid.width] = state['items']
+        idx = (y * self.padded_width + x).reshape(-1, 1) + self.offsets
+        np.take(self.walls, idx, out=windows[:, WALLS_CHANNEL])
+        game_of_row = np.repeat(np.arange(games), agents)
+        codes = items.reshape(games, -1)[game_of_row[:, None], idx]
+        for code, channel in zip(self._item_codes, self._item_channels):
+            np.equal(codes, code, out=windows[:, channel], casting='unsafe')
+        # Soldaten- und Basiskanäle leeren; der Flaggenkanal enthält schon die liegende Flagge
+        windows[:, ALLIES_CHANNEL:OWN_BASE_CHANNEL + 1].fill(0)
+
+        # Soldaten relativ zum Betrachter (Zeile i, Spalte j = Soldat j aus Sicht von i)
+        dx = x[:, None, :] - x[:, :, None]
+        dy = y[:, None, :] - y[:, :, None]
+        visible = (np.abs(dx) <= r) & (np.abs(dy) <= r) & alive[:, None, :]
+        cell = (dy + r) * self.window + (dx + r)
+        rows = np.arange(games * agents).reshape(games, agents)[:, :, None]
+        rows = np.broadcast_to(rows, visible.shape)
+        others = visible & ~np.eye(agents, dtype=bool)
+        channel = np.where(team[:, None, :] == team[:, :, None], ALLIES_CHANNEL, ENEMIES_CHANNEL)
+        np.add.at(windows, (rows[others], channel[others], cell[others]), 1)
+        carriers = visible & carrying[:, None, :]
+        np.add.at(windows, (rows[carriers], FLAG_CHANNEL, cell[carriers]), 1)
+
+        # Eigene Basis
+        bases_x = np.asarray(state['bases_x'])
+        bases_y = np.asarray(state['bases_y'])
+        base_x = np.take_along_axis(bases_x, team, axis=1)
+        base_y = np.take_along_axis(bases_y, team, axis=1)
+        base_dx = base_x - x
+        base_dy = base_y - y
+        sees_base = ((np.abs(base_dx) <= r) & (np.abs(base_dy) <= r)).ravel()
+        base_cell = ((base_dy + r) * self.window + (base_dx + r)).ravel()
+        windows[np.flatnonzero(sees_base), OWN_BASE_CHANNEL, base_cell[sees_base]] = 1
+
+        # Skalare Merkmale
+        scalars = out[..., self.window_size:]
+        scalars[..., 0] = np.maximum(state['health'], 0) / HEALTH_SCALE
+        scalars[..., 1] = np.minimum(state['attack'], ATTACK_CLIP) / ATTACK_CLIP
+        scalars[..., 2] = np.minimum(state['attack_range'], RANGE_CLIP) / RANGE_CLIP
+        scalars[..., 3] = np.asarray(state['vision']) / VISION_SCALE
+        scalars[..., 4] = alive
+        scalars[..., 5] = carrying
+        scalars[..., 6] = x / self.grid.width
+        scalars[..., 7] = y / self.grid.height
+        scalars[..., 8] = base_dx / self.grid.width
+        scalars[..., 9] = base_dy / self.grid.height
+        scalars[..., 10] = np.asarray(state['time_left'])[:, None]
+        return out
+
+    def state_from_game_state(self, game_state, player_ids=None):
+        """Übersetzt einen GameState (eine Partie) in die Arrays für encode_batch."""
+        players = game_state.player_data
+        if player_ids is None:
+            player_ids = list(players)
+        teams = {}
+        for info in players.values():
+            teams.setdefault(info['team'], len(teams))
+        for team in game_state.base_positions:
+            teams.setdefault(team, len(teams))
+
+        # Teams ohne bekannte Basis liegen weit außerhalb jedes Fensters
+        far = -10 * (self.padded_width + self.padded_height)
+        bases_x = np.full((1, len(teams)), far)
+        bases_y = np.full((1, len(teams)), far)
+        for team, (base_x, base_y) in game_state.base_positions.items():
+            bases_x[0, teams[team]] = base_x
+            bases_y[0, teams[team]] = base_y
+
+        def column(key, default=0):
+            return np.array([[players[pid].get(key, default) for pid in player_ids]])
+
+        positions = [players[pid]['position'] for pid in player_ids]
+        return {
+            'padded_items': self._padded_item_grid(game_state),
+            'x': np.array([[pos[0] for pos in positions]]),
+            'y': np.array([[pos[1] for pos in positions]]),
+            'team': np.array([[teams[players[pid]['team']] for pid in player_ids]]),
+            'alive': column('is_alive', True),
+            'carrying_flag': column('has_flag', False),
+            'health': column('health'),
+            'attack': column('attack', 1),
+            'attack_range': column('attack_range', 1),
+            'vision': column('vision_range', 2),
+            'bases_x': bases_x,
+            'bases_y': bases_y,
+            'time_left': np.array([game_state.time_left_fraction]),
+        }
+
+    def _padded_item_grid(self, game_state):
+        """Item-Codes auf der aufgefüllten Karte, Form (1, H + 2r, W + 2r); einmal pro Tick."""
+        cached = self._item_grid
+        if cached is not None and cached[0] is game_state and cached[1] == game_state.version:
+            return cached[2]
+        r = self.radius
+        items = np.zeros((1, self.padded_height, self.padded_width), dtype=np.int8)
+        for (item_x, item_y), item_type in game_state.items_on_map.items():
+            items[0, item_y + r, item_x + r] = ITEM_CODES.get(item_type, 0)
+        self._item_grid = (game_state, game_state.version, items)
+        return items
+
+    def encode_game_state(self, game_state, player_ids=None, out=None):
+        """Kodiert mehrere (ohne Angabe: alle) Soldaten eines GameState; Form (Soldaten, size)."""
+        if player_ids is None:
+            player_ids = list(game_state.player_data)
+        state = self.state_from_game_state(game_state, player_ids)
+        if out is not None:
+            out = out.reshape(1, len(player_ids), self.size)
+        return self.encode_batch(state, out).reshape(len(player_ids), self.size)
+
+    def encode(self, game_state, player_id, out=None):
+        """Kodiert einen Soldaten; Form (size,)."""
+        return self.encode_game_state(game_state, [player_id], out).reshape(self.size)
+
+
+def to_torch(array):
+    """NumPy-Puffer als torch-Tensor ohne Kopie (teilt sich den Speicher)."""
+    import torch
+    return torch.from_numpy(array)
+
+
+def to_tensorflow(array):
+    """NumPy-Puffer als TensorFlow-Tensor, per DLPack ohne Kopie, wo TensorFlow das unterstützt."""
+    import tensorflow as tf
+    try:
+        return tf.experimental.dlpack.from_dlpack(array.__dlpack__())
+    except (AttributeError, TypeError, ValueError):
+        return tf.convert_to_tensor(array)
+
+
+if __name__ == '__main__':
+    # Kontrolle: eine liegende Flagge erscheint im Flaggenkanal, ein Messer in seinem Kanal
+    from src.game_logic.game_state import GameState
+    from src.game_logic.soldier import Soldier
+
+    game_state = GameState(['#######', '#.....#', '#.....#', '#######'])
+    soldier = Soldier('A', 'A-soldier-1', (2, 1))
+    game_state.update({'A': [soldier]}, {(4, 1): 'flag', (1, 2): 'knife'}, base_positions={'A': (2, 1)})
+    encoder = game_state.observation_encoder
+    windows = encoder.encode(game_state, 'A-soldier-1')[:encoder.window_size].reshape(len(CHANNELS), encoder.window, encoder.window)
+    r = encoder.radius
+    assert windows[FLAG_CHANNEL, r, r + 2] == 1, "Flagge fehlt im Flaggenkanal"
+    assert windows[FLAG_CHANNEL].sum() == 1
+    assert windows[CHANNELS.index('knife'), r + 1, r - 1] == 1, "Messer fehlt in seinem Kanal"
+    assert windows[OWN_BASE_CHANNEL, r, r] == 1
+    print("Beobachtungen OK")
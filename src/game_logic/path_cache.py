@@ -0,0 +1,164 @@
+import collections
+from array import array
+from src.game_logic.grid import Grid
+
+# Standard-Speicherlimit für alle Distanzfelder einer Karte (in Bytes)
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Wie viele verschiedene Karten gleichzeitig im Cache gehalten werden
+MAX_CACHED_MAPS = 8
+
+UNREACHABLE = -1
+
+
+class DistanceFieldCache:
+    """
+    Zwischenspeicher für BFS-Distanzfelder einer Karte.
+
+    Die Mauern ändern sich nach dem Laden der Karte nicht mehr, deshalb wird für
+    jedes Ziel nur einmal eine Breitensuche ausgeführt. Das Ergebnis ist ein
+    flaches Integer-Array (eine Distanz pro Zelle), das per LRU verdrängt wird,
+    sobald das Speicherlimit überschritten ist. Alle AIAgent-Instanzen auf
+    derselben Karte teilen sich über `for_map` einen Cache.
+    """
+    _instances = collections.OrderedDict()
+
+    def __init__(self, map_data, max_bytes=DEFAULT_MAX_BYTES):
+        grid = Grid.from_map_data(map_data)
+        self.height = grid.height
+        self.width = grid.width
+        self.max_bytes = max_bytes
+        self.walkable = grid.walkable_bytes()
+        self._fields = collections.OrderedDict()
+        self._used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_map(cls, map_data, max_bytes=None):
+        """
+        Gibt den gemeinsamen Cache für diese Karte zurück und legt ihn bei Bedarf an.
+        """
+        key = cls._map_key(map_data)
+        cache = cls._instances.get(key)
+        if cache is None:
+            cache = cls(map_data, max_bytes or DEFAULT_MAX_BYTES)
+            cls._instances[key] = cache
+            while len(cls._instances) > MAX_CACHED_MAPS:
+                cls._instances.popitem(last=False)
+        else:
+            cls._instances.move_to_end(key)
+            if max_bytes is not None:
+                cache.set_max_bytes(max_bytes)
+        return cache
+
+    @staticmethod
+    def _map_key(map_data):
+        return Grid.from_map_data(map_data).key
+
+    def set_max_bytes(self, max_bytes):
+        """Ändert das Speicherlimit und verdrängt sofort überzählige Felder."""
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def is_walkable(self, pos):
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return False
+        return self.walkable[y * self.width + x] == 1
+
+    def distance_field(self, target_pos):
+        """
+        Gibt das Distanzfeld zum Ziel zurück (berechnet es beim ersten Zugriff).
+        Nicht erreichbare Zellen und Mauern haben den Wert UNREACHABLE.
+        """
+        field = self._fields.get(target_pos)
+        if field is not None:
+            self._fields.move_to_end(target_pos)
+            self.hits += 1
+            return field
+
+        self.misses += 1
+        field = self._compute_field(target_pos)
+        self._fields[target_pos] = field
+        self._used_bytes += field.itemsize * len(field)
+        self._evict()
+        return field
+
+    def distance(self, start_pos, target_pos):
+        """Kürzeste Weglänge zwischen zwei Zellen oder None, falls unerreichbar."""
+        if not self.is_walkable(start_pos) or not self.is_walkable(target_pos):
+            return None
+        x, y = start_pos
+        dist = self.distance_field(target_pos)[y * self.width + x]
+        return None if dist == UNREACHABLE else dist
+
+    def next_step(self, start_pos, target_pos):
+        """
+        Gibt das Nachbarfeld mit der kleinsten Distanz zum Ziel zurück.
+        None, wenn das Ziel bereits erreicht oder nicht erreichbar ist.
+        """
+        if not self.is_walkable(start_pos) or not self.is_walkable(target_pos):
+            return None
+        field = self.distance_field(target_pos)
+        width = self.width
+        x, y = start_pos
+        dist = field[y * width + x]
+        if dist <= 0:
+            return None
+
+        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < self.height and field[ny * width + nx] == dist - 1:
+                return (nx, ny)
+        return None
+
+    def path(self, start_pos, target_pos):
+        """Rekonstruiert den vollständigen Pfad (inklusive Start und Ziel) aus dem Distanzfeld."""
+        if self.distance(start_pos, target_pos) is None:
+            return None
+        path = [start_pos]
+        current = start_pos
+        while current != target_pos:
+            current = self.next_step(current, target_pos)
+            path.append(current)
+        return path
+
+    def _compute_field(self, target_pos):
+        """Breitensuche vom Ziel aus über das flache Gitter."""
+        width, height = self.width, self.height
+        field = array('i', [UNREACHABLE]) * (width * height)
+        if not self.is_walkable(target_pos):
+            return field
+
+        walkable = self.walkable
+        start = target_pos[1] * width + target_pos[0]
+        field[start] = 0
+        q = collections.deque([start])
+        while q:
+            idx = q.popleft()
+            next_dist = field[idx] + 1
+            x = idx % width
+            # Nachbarn: links, rechts, oben, unten
+            if x > 0 and walkable[idx - 1] and field[idx - 1] == UNREACHABLE:
+                field[idx - 1] = next_dist
+                q.append(idx - 1)
+            if x < width - 1 and walkable[idx + 1] and field[idx + 1] == UNREACHABLE:
+                field[idx + 1] = next_dist
+                q.append(idx + 1)
+            if idx >= width and walkable[idx - width] and field[idx - width] == UNREACHABLE:
+                field[idx - width] = next_dist
+                q.append(idx - width)
+            if idx + width < width * height and walkable[idx + width] and field[idx + width] == UNREACHABLE:
+                field[idx + width] = next_dist
+                q.append(idx + width)
+        return field
+
+    def _evict(self):
+        """Verdrängt die am längsten nicht genutzten Felder, bis das Limit eingehalten wird."""
+        while self._used_bytes > self.max_bytes and len(self._fields) > 1:
+            _, field = self._fields.popitem(last=False)
+            self._used_bytes -= field.itemsize * len(field)
+
+    def clear(self):
+        self._fields.clear()
+        self._used_bytes = 0
@@ -1,15 +1,16 @@
-import time
+from src.game_logic.clock import REAL_TIME_CLOCK
 
 class PlayerManager:
     """
     Verwaltet das Spawnen und Respawn von Spielern auf der Karte.
     """
-    def __init__(self, map_data, teams_config, base_managers):
+    def __init__(self, map_data, teams_config, base_managers, clock=None):
         self.map_data = map_data
         self.teams_config = teams_config  # Format: {'blue': [agent1, agent2], 'red': [agent3, agent4]}
         self.base_managers = base_managers # Format: {'blue': BaseManager, 'red': BaseManager}
         self.player_positions = {}
         self.respawn_timers = {}
+        self.clock = clock or REAL_TIME_CLOCK
 
     def initial_spawn(self):
         """Platziert alle Soldaten am Anfang des Spiels."""
@@ -30,12 +31,12 @@ class PlayerManager:
         if cause_of_death == 'nuke':
             respawn_time = 15
         
-        self.respawn_timers[player_name] = time.time() + respawn_time
+        self.respawn_timers[player_name] = self.clock.now() + respawn_time
         print(f"Soldat {player_name} ist gestorben. Respawn in {respawn_time} Sekunden.")
 
     def update_respawns(self):
         """Überprüft und führt Respawn durch, wenn die Basis noch aktiv ist."""
-        current_time = time.time()
+        current_time = self.clock.now()
         
         for player_name, respawn_time in self.respawn_timers.items():
             if respawn_time > 0 and current_time >= respawn_time:
@@ -1,9 +1,10 @@
-import time
+from src.game_logic.clock import REAL_TIME_CLOCK
 
 class ScoreManager:
-    def __init__(self, teams):
+    def __init__(self, teams, clock=None):
+        self.clock = clock or REAL_TIME_CLOCK
         self.scores = {team: 0 for team in teams}
-        self.round_start_time = time.time()
+        self.round_start_time = self.clock.now()
         self.round_duration = 300  # Rundenzeit in Sekunden (5 Minuten)
         self.points = {
             'flag_collect': 25,
@@ -28,12 +29,12 @@ class ScoreManager:
 
     def get_time_left(self):
         """Gibt die verbleibende Rundenzeit zurück."""
-        elapsed_time = time.time() - self.round_start_time
+        elapsed_time = self.clock.now() - self.round_start_time
         time_left = self.round_duration - elapsed_time
         return max(0, int(time_left))
         
     def reset_round(self, teams):
         """Setzt die Punkte und den Timer für eine neue Runde zurück."""
         self.scores = {team: 0 for team in teams}
-        self.round_start_time = time.time()
+        self.round_start_time = self.clock.now()
         print("Runde zurückgesetzt. Neue Runde startet.")
\ No newline at end of file
@@ -0,0 +1,300 @@
+import random
+import time
+from src.game_logic.grid import Grid
+from src.game_logic.soldier import Soldier
+from src.game_logic.base_manager import BaseManager
+from src.game_logic.item_manager import ItemManager
+from src.game_logic.score_manager import ScoreManager
+from src.game_logic.game_state import GameState
+from src.game_logic.ai_agent import AIAgent
+from src.game_logic.spatial_index import SpatialIndex
+from src.game_logic.clock import VirtualClock
+from src.game_logic.snapshot import Snapshot, SoldierSnapshot
+from src.game_logic.inference_scheduler import InferenceScheduler
+
+# Dauer eines Spiel-Ticks in Sekunden (entspricht dem 100ms-Timer der Oberfläche)
+TICK_SECONDS = 0.1
+# Mindestabstand (Manhattan) zwischen zwei Basen
+MIN_BASE_DISTANCE = 4
+# Reichweite eines Soldaten ohne Waffe
+DEFAULT_ATTACK_RANGE = 1
+
+
+class Simulation:
+    """
+    Eine Spielrunde ohne Oberfläche.
+
+    Die Simulation besitzt die komplette Spiellogik: Basen, Soldaten, Items,
+    Punkte und die KI-Bewegung. `step()` rechnet genau einen Tick, `run()`
+    beliebig viele so schnell wie die CPU erlaubt. Das GameWindow ist nur noch
+    eine Ansicht darauf: ein SimulationWorker ruft `step()` auf einem eigenen
+    Thread auf (siehe snapshot.py). Für Training, Benchmarks und Turniere
+    reicht dieses Modul allein (kein PyQt6 nötig).
+
+    Alle Zeiten laufen über eine Uhr: ohne Angabe eine VirtualClock, die pro
+    Tick um `tick_seconds` weiterläuft. Für Echtzeit bremst der SimulationWorker
+    die Ticks.
+
+    `policies` ordnet Teams optional eine Steuerung zu (Aufruf mit Soldat und
+    GameState, Rückgabe: neue Position), z.B. ein Torch- oder TensorFlow-Modell.
+    Teams ohne Eintrag laufen mit dem AIAgent zum nächsten Item. Modelle mit
+    `forward` werden pro Tick gebündelt ausgewertet (ein Durchlauf pro Modell).
+
+    `item_rules` überschreibt die Item-Regeln des ItemManagers (Nachschub-Intervall,
+    Zellen pro Item, Gewichte), z.B. GUI_ITEM_RULES für das Spiel im Fenster.
+    """
+    def __init__(self, map_data, teams, seed=None, soldiers_per_team=2,
+                 round_duration=None, tick_seconds=TICK_SECONDS, clock=None, policies=None,
+                 item_rules=None):
+        if seed is not None:
+            # ItemManager und KI nutzen das globale random-Modul
+            random.seed(seed)
+        self.seed = seed
+        self.grid = Grid.from_map_data(map_data)
+        if not self.grid:
+            raise ValueError("Die Karte enthält keine Felder.")
+
+        # Teams als Namen oder als Dictionaries aus dem GameSetupDialog
+        self.teams_info = [team if isinstance(team, dict) else {'name': team} for team in teams]
+        self.team_names = [team['name'] for team in self.teams_info]
+
+        self.policies = policies or {}
+        self.inference_scheduler = InferenceScheduler()
+        self.tick_seconds = tick_seconds
+        self.clock = clock or VirtualClock(tick_seconds)
+        self.tick_count = 0
+        self.kills = {team: 0 for team in self.team_names}
+
+        self.score_manager = ScoreManager(self.team_names, self.clock)
+        if round_duration is not None:
+            self.score_manager.round_duration = round_duration
+        self.round_duration = self.score_manager.round_duration
+
+        # Basen
+        self.base_positions = self._place_bases()
+        self.bases = {team: BaseManager(team, pos, [], self.grid, self.clock) for team, pos in self.base_positions.items()}
+
+        # Soldaten starten an der Basis ihres Teams
+        self.spatial_index = SpatialIndex()
+        self.soldiers = {}
+        self.player_teams = {}
+        for team, base_pos in self.base_positions.items():
+            self.soldiers[team] = []
+            for i in range(soldiers_per_team):
+                soldier = Soldier(team, f"{team}-soldier-{i+1}", base_pos, self.clock)
+                self.soldiers[team].append(soldier)
+                self.player_teams[soldier.soldier_id] = team
+                self.spatial_index.add(base_pos, soldier, 'soldier')
+        self.all_soldiers = [soldier for team_soldiers in self.soldiers.values() for soldier in team_soldiers]
+
+        # Items (inklusive Flagge)
+        self.item_manager = ItemManager(self.grid, self.base_positions,
+                                        [soldier.position for soldier in self.all_soldiers], self.clock,
+                                        **(item_rules or {}))
+        self.item_manager.place_initial_items()
+        # Für die Snapshots: Items beim Start einmal kopiert, danach nur noch Änderungen
+        self.initial_items = tuple(self.item_manager.items_on_map.items())
+
+        self.game_state = GameState(self.grid)
+        self._update_game_state()
+        self.ai_agent = AIAgent(self.game_state)
+
+    def _place_bases(self):
+        """Verteilt die Basen zufällig auf freie Felder mit Mindestabstand zueinander."""
+        empty_cells = self.grid.free_cells()
+        random.shuffle(empty_cells)
+
+        positions = {}
+        for team in self.team_names:
+            for x, y in empty_cells:
+                if all(abs(x - bx) + abs(y - by) >= MIN_BASE_DISTANCE for bx, by in positions.values()):
+                    positions[team] = (x, y)
+                    print(f"DEBUG: Basis für {team} bei ({x}, {y}) platziert.")
+                    break
+            else:
+                print(f"WARNUNG: Konnte keine geeignete Position für die Basis von {team} finden. Möglicherweise sind zu viele Teams für die Kartengröße ausgewählt.")
+        return positions
+
+    @property
+    def elapsed(self):
+        """Vergangene Spielzeit der Runde in Sekunden."""
+        return self.clock.now() - self.score_manager.round_start_time
+
+    def time_left(self):
+        """Verbleibende Rundenzeit in ganzen Sekunden."""
+        return self.score_manager.get_time_left()
+
+    @property
+    def is_over(self):
+        return self.elapsed >= self.round_duration
+
+    def step(self):
+        """Rechnet einen Tick. Gibt False zurück, sobald die Runde vorbei ist."""
+        if self.is_over:
+            return False
+        self.tick_count += 1
+        if isinstance(self.clock, VirtualClock):
+            self.clock.advance()
+
+        planned_moves = self._plan_batched_moves()
+        for soldier in self.all_soldiers:
+            self._update_soldier(soldier, planned_moves.get(soldier.soldier_id))
+        self._resolve_combat()
+
+        self.item_manager.update_item_respawn()
+        alive_positions = {soldier.soldier_id: soldier.position
+                           for soldier in self.all_soldiers if soldier.is_alive}
+        BaseManager.check_all_bases(list(self.bases.values()), alive_positions, self.player_teams)
+
+        self._update_game_state()
+        return not self.is_over
+
+    def snapshot(self):
+        """Unveränderliches Abbild des aktuellen Zustands für die Oberfläche (siehe SimulationWorker)."""
+        now = self.clock.now()
+        soldiers = []
+        for soldier in self.all_soldiers:
+            weapon = soldier.inventory.get('weapon')
+            attack_range = self.game_state.get_item_properties(weapon).get('range', DEFAULT_ATTACK_RANGE) if weapon else DEFAULT_ATTACK_RANGE
+            respawn_left = 0.0 if soldier.is_alive else max(0.0, soldier.respawn_delay - (now - soldier.last_death_time))
+            soldiers.append(SoldierSnapshot(soldier.soldier_id, soldier.team, soldier.position, soldier.is_alive,
+                                            soldier.health, soldier.attack, attack_range, respawn_left))
+        item_changes = self.item_manager.item_changes
+        return Snapshot(tick=self.tick_count, game_time=now, time_left=self.time_left(),
+                        initial_items=self.initial_items, item_changes=item_changes,
+                        item_version=len(item_changes), soldiers=tuple(soldiers),
+                        scores=dict(self.score_manager.get_current_scores()), is_over=self.is_over,
+                        wall_time=time.perf_counter())
+
+    def _update_game_state(self):
+        time_left_fraction = max(0.0, 1 - self.elapsed / self.round_duration) if self.round_duration else 0.0
+        self.game_state.update(self.soldiers, self.item_manager.items_on_map, self.item_manager.flow_field,
+                               self.base_positions, time_left_fraction)
+
+    def run(self, ticks=None):
+        """
+        Rechnet `ticks` Ticks oder, ohne Angabe, bis die Runde vorbei ist.
+        Gibt das Ergebnis der Runde zurück.
+        """
+        if ticks is None:
+            while self.step():
+                pass
+        else:
+            for _ in range(ticks):
+                if not self.step():
+                    break
+        return self.result()
+
+    def _plan_batched_moves(self):
+        """Ein Forward-Pass pro Modell für alle lebenden Soldaten, die es steuert."""
+        groups = {}
+        for soldier in self.all_soldiers:
+            policy = self.policies.get(soldier.team)
+            if soldier.is_alive and policy is not None and InferenceScheduler.is_batched(policy):
+                groups.setdefault(id(policy), (policy, []))[1].append(soldier)
+        if not groups:
+            return {}
+        return self.inference_scheduler.plan_moves(list(groups.values()), self.game_state)
+
+    def _update_soldier(self, soldier, planned_move=None):
+        """Respawn, Bewegung und Einsammeln für einen Soldaten."""
+        if not soldier.is_alive:
+            soldier.update()
+            if soldier.is_alive:
+                self.spatial_index.add(soldier.position, soldier, 'soldier')
+                self.item_manager.free_cells.add_soldier(soldier.position)
+            return
+
+        old_pos = soldier.position
+        if planned_move is not None:
+            new_pos = planned_move
+        else:
+            policy = self.policies.get(soldier.team)
+            new_pos = policy(soldier, self.game_state) if policy else self.ai_agent.get_move(soldier)
+        if new_pos != old_pos:
+            soldier.position = new_pos
+            self.spatial_index.move(soldier, new_pos)
+            self.item_manager.move_soldier(old_pos, new_pos)
+
+        item_type = self.item_manager.collect_item(new_pos)
+        if item_type is not None:
+            soldier.collect_item(item_type, self.game_state.get_item_properties(item_type))
+            if item_type == 'flag':
+                self.score_manager.add_points(soldier.team, 'flag_collect')
+            elif item_type == 'pink duck':
+                self.score_manager.add_points(soldier.team, 'pink_duck')
+
+        # Flagge an der eigenen Basis abgeben
+        if 'flag' in soldier.inventory and new_pos == self.base_positions.get(soldier.team):
+            soldier.lose_flag()
+            self.score_manager.add_points(soldier.team, 'flag_return')
+            self.item_manager._place_specific_item('flag')
+
+    def _resolve_combat(self):
+        """Jeder lebende Soldat greift den ersten Gegner in Reichweite seiner Waffe an."""
+        for soldier in self.all_soldiers:
+            if not soldier.is_alive:
+                continue
+            weapon = soldier.inventory.get('weapon')
+            attack_range = self.game_state.get_item_properties(weapon).get('range', DEFAULT_ATTACK_RANGE) if weapon else DEFAULT_ATTACK_RANGE
+
+            for target in self.spatial_index.within(soldier.position, attack_range, 'soldier', metric='manhattan'):
+                if target.team == soldier.team or not target.is_alive:
+                    continue
+                target.take_damage(soldier.attack)
+                if not target.is_alive:
+                    self._handle_death(target)
+                    self.kills[soldier.team] += 1
+                    self.score_manager.add_points(soldier.team, 'kill')
+                break
+
+    def _handle_death(self, soldier):
+        """Tote Soldaten belegen keine Felder mehr; eine getragene Flagge kommt zurück auf die Karte."""
+        self.spatial_index.remove(soldier)
+        self.item_manager.free_cells.remove_soldier(soldier.position)
+        if soldier.lose_flag():
+            self.item_manager._place_specific_item('flag')
+
+    def winner(self):
+        """Team mit den meisten Punkten oder None bei Gleichstand."""
+        scores = self.score_manager.get_current_scores()
+        best = max(scores.values(), default=0)
+        leaders = [team for team, score in scores.items() if score == best]
+        return leaders[0] if len(leaders) == 1 else None
+
+    def result(self):
+        """Zusammenfassung der Runde."""
+        return {
+            'ticks': self.tick_count,
+            'elapsed': self.elapsed,
+            'scores': dict(self.score_manager.get_current_scores()),
+            'kills': dict(self.kills),
+            'winner': self.winner(),
+        }
+
+
+def run_match(map_data, teams, best_of=3, seed=None, max_ticks=None, **kwargs):
+    """
+    Spielt eine Partie über `best_of` Runden; sie endet vorzeitig, sobald ein Team
+    die Mehrheit der Runden gewonnen hat. Jede Runde bekommt einen eigenen Seed.
+    """
+    rounds = []
+    wins = {}
+    for round_no in range(best_of):
+        round_seed = None if seed is None else seed + round_no
+        simulation = Simulation(map_data, teams, seed=round_seed, **kwargs)
+        result = simulation.run(max_ticks)
+        rounds.append(result)
+        winner = result['winner']
+        if winner is not None:
+            wins[winner] = wins.get(winner, 0) + 1
+            if wins[winner] > best_of // 2:
+                break
+
+    best = max(wins.values(), default=0)
+    leaders = [team for team, count in wins.items() if count == best]
+    return {
+        'rounds': rounds,
+        'wins': wins,
+        'winner': leaders[0] if len(leaders) == 1 else None,
+    }
@@ -0,0 +1,132 @@
+import collections
+import threading
+import time
+
+# Unveränderliche, kompakte Abbilder des Spielzustands nach einem Tick.
+# Positionen sind (x, y), Soldaten Tupel, Punkte eine eigene Kopie. Die Items
+# werden nicht pro Tick kopiert (auf großen Karten sind es ~100.000): ein Snapshot
+# enthält die Items vom Rundenstart (`initial_items`, ein Tupel für die ganze
+# Runde), die gemeinsame, nur wachsende Änderungsliste des ItemManagers
+# (`item_changes`) und `item_version`, die Zahl der Änderungen bis zu diesem Tick.
+# Wer die Items darstellt, spielt nur die neuen Änderungen nach.
+SoldierSnapshot = collections.namedtuple(
+    'SoldierSnapshot', ['soldier_id', 'team', 'position', 'alive', 'health', 'attack', 'attack_range', 'respawn_left'])
+Snapshot = collections.namedtuple(
+    'Snapshot', ['tick', 'game_time', 'time_left', 'initial_items', 'item_changes', 'item_version',
+                 'soldiers', 'scores', 'is_over', 'wall_time'])
+
+
+def item_changes_between(snapshot, version):
+    """Änderungen (Position, Typ oder None) seit `version` bis zum Stand des Snapshots."""
+    return snapshot.item_changes[version:snapshot.item_version]
+
+
+def items_at(snapshot):
+    """Alle Items zum Stand des Snapshots als {Position: Typ} (baut sie komplett auf)."""
+    items = dict(snapshot.initial_items)
+    for position, item_type in item_changes_between(snapshot, 0):
+        if item_type is None:
+            items.pop(position, None)
+        else:
+            items[position] = item_type
+    return items
+
+
+class SnapshotBuffer:
+    """
+    Übergabe der Snapshots vom Simulations-Thread an die Oberfläche ohne Lock:
+    der einzige Schreiber ersetzt das Paar (vorheriger, neuester) als Ganzes,
+    Leser bekommen immer ein vollständiges Paar (Zuweisung einer Referenz ist
+    atomar). Ältere Snapshots werden einfach überschrieben.
+    """
+    def __init__(self):
+        self._pair = (None, None)
+
+    def publish(self, snapshot):
+        self._pair = (self._pair[1], snapshot)
+
+    def latest(self):
+        return self._pair[1]
+
+    def pair(self):
+        """(vorheriger, neuester) Snapshot, z.B. zum Interpolieren."""
+        return self._pair
+
+
+class SimulationWorker(threading.Thread):
+    """
+    Rechnet die Simulation auf einem eigenen Thread und veröffentlicht nach
+    jedem Tick einen Snapshot im SnapshotBuffer. `speed` ist das Verhältnis von
+    Spielzeit zu Wanduhrzeit (1 = Echtzeit, 4 = viermal so schnell); mit
+    speed=None läuft sie so schnell wie die CPU erlaubt. Die Oberfläche greift
+    danach nie mehr direkt auf die Simulation zu.
+
+    Statt einer fertigen Simulation kann `simulation` auch eine Funktion sein, die
+    sie baut: auf großen Karten dauert das Sekunden und läuft dann ebenfalls auf
+    diesem Thread. Bis dahin ist `latest()` des SnapshotBuffers None; `ready`
+    wird gesetzt, sobald die Simulation steht (oder `error` den Fehler enthält).
+    """
+    def __init__(self, simulation, speed=1.0, snapshots=None):
+        super().__init__(name="simulation", daemon=True)
+        self.speed = speed
+        self.snapshots = snapshots or SnapshotBuffer()
+        self.ready = threading.Event()
+        self.error = None
+        self._stop_event = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+        if callable(simulation):
+            self.simulation = None
+            self._build = simulation
+        else:
+            self.simulation = simulation
+            self._build = None
+            self.snapshots.publish(simulation.snapshot())
+            self.ready.set()
+
+    def run(self):
+        if self._build is not None:
+            try:
+                self.simulation = self._build()
+            except Exception as e:
+                print(f"FEHLER: Simulation konnte nicht erstellt werden: {e}")
+                self.error = e
+                self.ready.set()
+                return
+            self.snapshots.publish(self.simulation.snapshot())
+            self.ready.set()
+
+        interval = self.simulation.tick_seconds / self.speed if self.speed else 0.0
+        deadline = time.perf_counter()
+        while not self._stop_event.is_set():
+            if not self._running.wait(timeout=0.1):
+                deadline = time.perf_counter()
+                continue
+            running = self.simulation.step()
+            self.snapshots.publish(self.simulation.snapshot())
+            if not running:
+                break
+            if interval:
+                deadline += interval
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    self._stop_event.wait(delay)
+                elif delay < -5 * interval:
+                    # Deutlich im Rückstand (z.B. ein langsamer Tick): nicht nachholen
+                    deadline = time.perf_counter()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        self._running.set()
+        if self.is_alive():
+            self.join(timeout)
@@ -1,10 +1,10 @@
-import time
+from src.game_logic.clock import REAL_TIME_CLOCK
 
 class Soldier:
     """
     Repräsentiert einen einzelnen Soldaten im Spiel.
     """
-    def __init__(self, team, soldier_id, start_position):
+    def __init__(self, team, soldier_id, start_position, clock=None):
         self.team = team
         self.soldier_id = soldier_id
         self.position = start_position
@@ -16,6 +16,7 @@ class Soldier:
         self.last_death_time = 0
         self.respawn_delay = 5  # Sekunden
         self.inventory = {} # Inventar für gesammelte Waffen
+        self.clock = clock or REAL_TIME_CLOCK # Echtzeit (GUI) oder Spielzeit (Simulation)
 
     def take_damage(self, amount):
         """
@@ -24,7 +25,7 @@ class Soldier:
         self.health -= amount
         if self.health <= 0:
             self.is_alive = False
-            self.last_death_time = time.time()
+            self.last_death_time = self.clock.now()
             print(f"Soldat {self.soldier_id} von Team {self.team} wurde getötet.")
 
     def update(self):
@@ -32,7 +33,7 @@ class Soldier:
         Aktualisiert den Zustand des Soldaten (z.B. Respawn-Timer).
         """
         if not self.is_alive:
-            if time.time() - self.last_death_time >= self.respawn_delay:
+            if self.clock.now() - self.last_death_time >= self.respawn_delay:
                 self.respawn()
 
     def respawn(self):
@@ -0,0 +1,87 @@
+class SpatialIndex:
+    """
+    Räumlicher Hash: Feld -> alle Objekte, die sich darauf befinden.
+
+    Jede Bewegung, jedes Einsammeln, Spawnen und jeder Tod aktualisiert den
+    Index. Kollisionen lassen sich dann pro Soldat mit einem Nachschlagen prüfen,
+    und Umkreis-Abfragen (Kampf, Basen) sehen sich nur belegte Felder an.
+    Einträge haben eine Art ('soldier', 'object', 'base', ...) zum Filtern.
+    """
+    def __init__(self):
+        self._cells = {}      # Position -> {id(Objekt): (Art, Objekt)}
+        self._positions = {}  # id(Objekt) -> Position
+
+    def add(self, pos, occupant, kind):
+        self._cells.setdefault(pos, {})[id(occupant)] = (kind, occupant)
+        self._positions[id(occupant)] = pos
+
+    def remove(self, occupant):
+        """Entfernt ein Objekt; gibt seine letzte Position zurück (oder None)."""
+        pos = self._positions.pop(id(occupant), None)
+        if pos is None:
+            return None
+        occupants = self._cells[pos]
+        del occupants[id(occupant)]
+        if not occupants:
+            del self._cells[pos]
+        return pos
+
+    def move(self, occupant, new_pos):
+        key = id(occupant)
+        old_pos = self._positions.get(key)
+        if old_pos == new_pos or old_pos is None:
+            return
+        kind = self._cells[old_pos][key][0]
+        self.remove(occupant)
+        self.add(new_pos, occupant, kind)
+
+    def position_of(self, occupant):
+        return self._positions.get(id(occupant))
+
+    def __contains__(self, occupant):
+        return id(occupant) in self._positions
+
+    def at(self, pos, kind=None):
+        """Alle Objekte auf einem Feld, optional nur einer Art."""
+        occupants = self._cells.get(pos)
+        if not occupants:
+            return []
+        return [obj for k, obj in occupants.values() if kind is None or k == kind]
+
+    def within(self, pos, radius, kind=None, metric='euclidean'):
+        """
+        Alle Objekte im Umkreis (euklidisch oder 'manhattan') um ein Feld.
+        Ist das Suchfenster größer als die Zahl belegter Felder, werden nur diese geprüft.
+        """
+        x, y = pos
+        r_squared = radius * radius
+        span = int(radius)
+        window = (2 * span + 1) ** 2
+
+        if window <= len(self._cells):
+            candidates = ((x + dx, y + dy) for dy in range(-span, span + 1)
+                          for dx in range(-span, span + 1))
+            candidates = [cell for cell in candidates if cell in self._cells]
+        else:
+            candidates = list(self._cells)
+
+        result = []
+        for cx, cy in candidates:
+            dx, dy = cx - x, cy - y
+            if metric == 'manhattan':
+                inside = abs(dx) + abs(dy) <= radius
+            else:
+                inside = dx * dx + dy * dy <= r_squared
+            if inside:
+                result.extend(self.at((cx, cy), kind))
+        return result
+
+    def occupied_cells(self, kind=None):
+        if kind is None:
+            return list(self._cells)
+        return [pos for pos, occupants in self._cells.items()
+                if any(k == kind for k, _ in occupants.values())]
+
+    def clear(self):
+        self._cells.clear()
+        self._positions.clear()
@@ -0,0 +1,208 @@
+import collections
+from array import array
+from src.game_logic.path_cache import DistanceFieldCache
+from src.game_logic.junction_graph import JunctionGraph
+
+# Wie viele Orakel gleichzeitig im Speicher gehalten werden
+MAX_CACHED_ORACLES = 8
+
+# Karten, die sich als kein Baum erwiesen haben (damit die Prüfung nicht wiederholt wird)
+_non_tree_maps = collections.OrderedDict()
+
+
+class TreeDistanceOracle:
+    """
+    Distanz-Orakel für perfekte Labyrinthe.
+
+    Die Labyrinthe aus MazeGenerator.carve_path sind Spannbäume: zwischen zwei
+    Zellen gibt es genau einen Weg. Die Distanz ist daher
+    Tiefe(a) + Tiefe(b) - 2 * Tiefe(LCA(a, b)). Der niedrigste gemeinsame Vorfahre
+    wird über eine Euler-Tour mit Sparse-Table in O(1) bestimmt, ganz ohne Suche.
+    Karten mit Schleifen (z.B. von Hand bearbeitet) werden von `build` erkannt.
+    """
+    _instances = collections.OrderedDict()
+
+    def __init__(self, path_cache):
+        self.width = path_cache.width
+        self.height = path_cache.height
+        self.walkable = path_cache.walkable
+
+        size = self.width * self.height
+        self.depth = array('i', [-1]) * size
+        self.parent = array('i', [-1]) * size
+        self.component = array('i', [-1]) * size
+        self.first = array('i', [0]) * size  # erstes Vorkommen in der Euler-Tour
+        self.last = array('i', [0]) * size   # letztes Vorkommen in der Euler-Tour
+        self.euler = array('i')
+
+        self._build_euler_tour()
+        self._build_sparse_table()
+
+    @classmethod
+    def build(cls, map_data):
+        """
+        Erstellt das Orakel, falls die Karte ein Baum (bzw. Wald) ist, sonst None.
+        """
+        path_cache = DistanceFieldCache.for_map(map_data)
+        if not cls.is_tree(path_cache):
+            return None
+        return cls(path_cache)
+
+    @staticmethod
+    def is_tree(path_cache):
+        """
+        Eine Karte ist schleifenfrei, wenn Kanten = Zellen - Zusammenhangskomponenten gilt.
+        """
+        width, height, walkable = path_cache.width, path_cache.height, path_cache.walkable
+        cells = edges = 0
+        for idx in range(width * height):
+            if walkable[idx]:
+                cells += 1
+                if idx % width < width - 1 and walkable[idx + 1]:
+                    edges += 1
+                if idx + width < width * height and walkable[idx + width]:
+                    edges += 1
+
+        seen = bytearray(width * height)
+        components = 0
+        for idx in range(width * height):
+            if walkable[idx] and not seen[idx]:
+                components += 1
+                seen[idx] = 1
+                stack = [idx]
+                while stack:
+                    current = stack.pop()
+                    for n in _neighbours(current, width, height, walkable):
+                        if not seen[n]:
+                            seen[n] = 1
+                            stack.append(n)
+        return edges == cells - components
+
+    def _build_euler_tour(self):
+        width, height, walkable = self.width, self.height, self.walkable
+        depth, parent, euler = self.depth, self.parent, self.euler
+        component = 0
+        for root in range(width * height):
+            if not walkable[root] or depth[root] >= 0:
+                continue
+            depth[root] = 0
+            self.component[root] = component
+            self.first[root] = len(euler)
+            euler.append(root)
+            # Iterative Tiefensuche: (Zelle, noch nicht besuchte Nachbarn)
+            stack = [(root, iter(_neighbours(root, width, height, walkable)))]
+            while stack:
+                current, remaining = stack[-1]
+                for n in remaining:
+                    if depth[n] < 0:
+                        depth[n] = depth[current] + 1
+                        parent[n] = current
+                        self.component[n] = component
+                        self.first[n] = len(euler)
+                        euler.append(n)
+                        stack.append((n, iter(_neighbours(n, width, height, walkable))))
+                        break
+                else:
+                    stack.pop()
+                    self.last[current] = len(euler) - 1
+                    if stack:
+                        euler.append(stack[-1][0])
+            component += 1
+
+    def _build_sparse_table(self):
+        """table[k][i] = Zelle mit minimaler Tiefe in euler[i : i + 2**k]."""
+        depth = self.depth
+        self.table = [array('i', self.euler)]
+        length = len(self.euler)
+        k = 1
+        while (1 << k) <= length:
+            previous = self.table[-1]
+            half = 1 << (k - 1)
+            level = array('i', previous[:length - (1 << k) + 1])
+            for i in range(len(level)):
+                right = previous[i + half]
+                if depth[right] < depth[level[i]]:
+                    level[i] = right
+            self.table.append(level)
+            k += 1
+
+    def _lca(self, a, b):
+        left, right = self.first[a], self.first[b]
+        if left > right:
+            left, right = right, left
+        k = (right - left + 1).bit_length() - 1
+        candidate_left = self.table[k][left]
+        candidate_right = self.table[k][right - (1 << k) + 1]
+        return candidate_left if self.depth[candidate_left] <= self.depth[candidate_right] else candidate_right
+
+    def _index(self, pos):
+        x, y = pos
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return None
+        idx = y * self.width + x
+        return idx if self.walkable[idx] else None
+
+    def distance(self, start_pos, target_pos):
+        """Exakte Weglänge zwischen zwei Zellen oder None, falls unerreichbar."""
+        a, b = self._index(start_pos), self._index(target_pos)
+        if a is None or b is None or self.component[a] != self.component[b]:
+            return None
+        return self.depth[a] + self.depth[b] - 2 * self.depth[self._lca(a, b)]
+
+    def next_step(self, start_pos, target_pos):
+        """
+        Nächstes Feld auf dem (einzigen) Weg zum Ziel.
+        Liegt das Ziel nicht im Teilbaum des Starts, geht es zum Elternknoten,
+        sonst zu dem Kind, dessen Euler-Intervall das Ziel enthält.
+        """
+        a, b = self._index(start_pos), self._index(target_pos)
+        if a is None or b is None or a == b or self.component[a] != self.component[b]:
+            return None
+        if not (self.first[a] <= self.first[b] <= self.last[a]):
+            step = self.parent[a]
+        else:
+            step = next(c for c in _neighbours(a, self.width, self.height, self.walkable)
+                        if self.parent[c] == a and self.first[c] <= self.first[b] <= self.last[c])
+        return (step % self.width, step // self.width)
+
+
+def _neighbours(idx, width, height, walkable):
+    x = idx % width
+    result = []
+    if x > 0 and walkable[idx - 1]:
+        result.append(idx - 1)
+    if x < width - 1 and walkable[idx + 1]:
+        result.append(idx + 1)
+    if idx >= width and walkable[idx - width]:
+        result.append(idx - width)
+    if idx + width < width * height and walkable[idx + width]:
+        result.append(idx + width)
+    return result
+
+
+def get_distance_oracle(map_data):
+    """
+    Gibt das passende Distanz-Orakel für eine Karte zurück: das Baum-Orakel für
+    perfekte Labyrinthe, sonst den gemeinsamen Kreuzungsgraphen der Karte (aus
+    dessen eigenem Cache). Beide bieten `distance(a, b)` und `next_step(a, b)`.
+    """
+    key = DistanceFieldCache._map_key(map_data)
+    oracle = TreeDistanceOracle._instances.get(key)
+    if oracle is not None:
+        TreeDistanceOracle._instances.move_to_end(key)
+        return oracle
+    if key in _non_tree_maps:
+        _non_tree_maps.move_to_end(key)
+        return JunctionGraph.for_map(map_data)
+
+    oracle = TreeDistanceOracle.build(map_data)
+    if oracle is None:
+        print("INFO: Karte enthält Schleifen, verwende den Kreuzungsgraphen für Distanzen.")
+        _non_tree_maps[key] = True
+        while len(_non_tree_maps) > MAX_CACHED_ORACLES:
+            _non_tree_maps.popitem(last=False)
+        return JunctionGraph.for_map(map_data)
+    TreeDistanceOracle._instances[key] = oracle
+    while len(TreeDistanceOracle._instances) > MAX_CACHED_ORACLES:
+        TreeDistanceOracle._instances.popitem(last=False)
+    return oracle
@@ -0,0 +1,358 @@
+import time
+import numpy as np
+from src.game_logic.grid import Grid
+from src.game_logic.game_state import GameState, ITEM_TYPES, ITEM_CODES
+from src.game_logic.score_manager import ScoreManager
+from src.game_logic.observation import ObservationEncoder, DEFAULT_RADIUS, ACTION_DELTAS
+
+FLAG = ITEM_CODES['flag']
+NUKE = ITEM_CODES['nuke']
+WEAPONS = ['knife', 'gun', 'grenade', 'nuke']
+# Zufällige Items beim Start bzw. beim Auffüllen (wie ItemManager)
+INITIAL_ITEMS = np.array([ITEM_CODES[name] for name in
+                          ['red pill', 'blue pill', 'knife', 'gun', 'grenade', 'pink duck', 'fake_flag', 'binoculars']])
+START_NUKE_CHANCE = 0.10
+RESPAWN_NUKE_CHANCE = 0.05
+
+# Startwerte eines Soldaten (wie Soldier)
+START_HEALTH = 25
+START_ATTACK = 1
+START_RANGE = 1
+START_VISION = 2
+RESPAWN_SECONDS = 5
+ITEM_RESPAWN_SECONDS = 30
+
+MIN_BASE_DISTANCE = 4
+MAX_PLACEMENT_TRIES = 32
+
+DEFAULT_TEAMS = ("Team Rot", "Team Blau")
+
+
+class VecEnv:
+    """
+    N unabhängige Partien auf derselben Karte, die im Gleichschritt laufen.
+
+    Der komplette Zustand liegt in NumPy-Arrays der Form (N, ...): Positionen,
+    Gesundheit, Angriff und Reichweite der Soldaten sowie ein Item-Raster pro
+    Partie. Bewegung, Einsammeln, Kampf und Respawn werden mit Array-Operationen
+    über alle Partien gleichzeitig berechnet (Schleifen nur über die wenigen
+    Agenten einer Partie). Die Regeln und Zeiten entsprechen der Simulation.
+
+    Gym-artige Schnittstelle: `reset()` -> Beobachtungen, `step(actions)` ->
+    (Beobachtungen, Belohnungen, dones, info). Beobachtungen kommen aus dem
+    ObservationEncoder (Form (N, Agenten, encoder.size), immer derselbe Puffer).
+    Aktionen sind Indizes in ACTION_DELTAS (Oben, Unten, Links, Rechts, Nichts)
+    mit Form (N, Agenten).
+    Belohnungen stammen aus der Punktetabelle des ScoreManagers. Partien, deren
+    Runde abgelaufen ist, werden automatisch neu gestartet.
+
+    Positionen sind flache Indizes in die mit Mauern aufgefüllte Karte
+    (Breite + 2), dadurch braucht kein Schritt eine Grenzprüfung.
+    """
+    def __init__(self, map_data, num_envs=64, teams=DEFAULT_TEAMS, soldiers_per_team=2,
+                 round_duration=300, tick_seconds=0.1, seed=None, observation_radius=DEFAULT_RADIUS):
+        self.grid = Grid.from_map_data(map_data)
+        self.num_envs = num_envs
+        self.team_names = list(teams)
+        self.num_teams = len(self.team_names)
+        self.soldiers_per_team = soldiers_per_team
+        self.num_agents = self.num_teams * soldiers_per_team
+        self.team_of_agent = np.repeat(np.arange(self.num_teams), soldiers_per_team)
+        self.enemy = self.team_of_agent[:, None] != self.team_of_agent[None, :]
+        self.rng = np.random.default_rng(seed)
+
+        self.round_ticks = int(round(round_duration / tick_seconds))
+        self.respawn_ticks = int(round(RESPAWN_SECONDS / tick_seconds))
+        self.item_respawn_ticks = int(round(ITEM_RESPAWN_SECONDS / tick_seconds))
+
+        self.padded_width = self.grid.width + 2
+        self.free = self.grid.padded_free.ravel()
+        self.free_cells = np.flatnonzero(self.free)
+        self.free_x = self.free_cells % self.padded_width
+        self.free_y = self.free_cells // self.padded_width
+        self.moves = np.array([dy * self.padded_width + dx for dx, dy in ACTION_DELTAS])
+        self.max_items = (self.grid.width * self.grid.height) // 20
+
+        # Tabellen pro Item-Code aus GameState und ScoreManager
+        properties = GameState(None).item_properties
+        points = ScoreManager([]).points
+        self.points = points
+        codes = len(ITEM_TYPES)
+        self.health_gain = np.zeros(codes, dtype=np.int32)
+        self.vision_boost = np.zeros(codes, dtype=np.int32)
+        self.weapon_attack = np.zeros(codes, dtype=np.int32)
+        self.weapon_range = np.zeros(codes, dtype=np.int32)
+        self.is_weapon = np.zeros(codes, dtype=bool)
+        self.item_points = np.zeros(codes, dtype=np.int32)
+        for name, code in ITEM_CODES.items():
+            props = properties[name]
+            if name in WEAPONS:
+                self.is_weapon[code] = True
+                self.weapon_attack[code] = props['attack']
+                self.weapon_range[code] = props['range']
+            elif name in ('red pill', 'blue pill'):
+                self.health_gain[code] = props['health']
+            self.vision_boost[code] = props['vision_boost']
+        self.item_points[FLAG] = points['flag_collect']
+        self.item_points[ITEM_CODES['pink duck']] = points['pink_duck']
+
+        n, a = num_envs, self.num_agents
+        self.items = np.zeros((n, self.free.size), dtype=np.int8)
+        self.item_count = np.zeros(n, dtype=np.int32)
+        self.bases = np.zeros((n, self.num_teams), dtype=np.int64)
+        self.pos = np.zeros((n, a), dtype=np.int64)
+        self.health = np.zeros((n, a), dtype=np.int32)
+        self.attack = np.zeros((n, a), dtype=np.int32)
+        self.attack_range = np.zeros((n, a), dtype=np.int32)
+        self.vision = np.zeros((n, a), dtype=np.int32)
+        self.alive = np.zeros((n, a), dtype=bool)
+        self.carrying_flag = np.zeros((n, a), dtype=bool)
+        self.death_tick = np.zeros((n, a), dtype=np.int64)
+        self.tick = np.zeros(n, dtype=np.int64)
+        self.last_item_tick = np.zeros(n, dtype=np.int64)
+        self.scores = np.zeros((n, self.num_teams), dtype=np.int32)
+        self.kills = np.zeros((n, self.num_teams), dtype=np.int32)
+        self.rewards = np.zeros((n, a), dtype=np.float32)
+        self.encoder = ObservationEncoder(self.grid, observation_radius)
+        self.observations = self.encoder.allocate(n, a)
+        self._rows = np.arange(n)
+
+    # --- Gym-Schnittstelle ---
+
+    def reset(self):
+        """Startet alle Partien neu und gibt die Beobachtungen zurück."""
+        self._reset_envs(self._rows)
+        return self._observe()
+
+    def step(self, actions):
+        """Rechnet einen Tick in allen Partien."""
+        actions = np.asarray(actions).reshape(self.num_envs, self.num_agents)
+        rows = self._rows
+        self.rewards.fill(0)
+        self.tick += 1
+
+        # Wer zu Beginn des Ticks tot ist, kann respawnen, bewegt sich aber erst im nächsten Tick
+        was_alive = self.alive.copy()
+        self._respawn()
+
+        new_pos = self.pos + self.moves[actions]
+        np.copyto(self.pos, new_pos, where=was_alive & self.free[new_pos])
+
+        for agent in range(self.num_agents):
+            self._pick_up(agent, was_alive[:, agent])
+        self._return_flags(was_alive)
+        self._fight()
+        self._refill_items()
+
+        dones = self.tick >= self.round_ticks
+        info = {}
+        if dones.any():
+            finished = rows[dones]
+            info['final_scores'] = self.scores[finished].copy()
+            info['final_kills'] = self.kills[finished].copy()
+            self._reset_envs(finished)
+        return self._observe(), self.rewards, dones, info
+
+    # --- Spielregeln ---
+
+    def _respawn(self):
+        respawn = ~self.alive & ((self.tick[:, None] - self.death_tick) >= self.respawn_ticks)
+        if not respawn.any():
+            return
+        self.alive[respawn] = True
+        self.health[respawn] = START_HEALTH
+        self.attack[respawn] = START_ATTACK
+        self.attack_range[respawn] = START_RANGE
+        self.vision[respawn] = START_VISION
+        self.pos[respawn] = self.bases[:, self.team_of_agent][respawn]
+
+    def _pick_up(self, agent, active):
+        """Ein Agent sammelt in allen Partien das Item unter sich ein (Reihenfolge wie in der Simulation)."""
+        cells = self.pos[:, agent]
+        codes = self.items[self._rows, cells]
+        got = active & (codes != 0)
+        if not got.any():
+            return
+        envs = self._rows[got]
+        codes = codes[got]
+        self.items[envs, cells[got]] = 0
+        self.item_count[envs] -= 1
+
+        weapon = self.is_weapon[codes]
+        self.attack[envs, agent] = np.where(weapon, self.weapon_attack[codes], self.attack[envs, agent])
+        self.attack_range[envs, agent] = np.where(weapon, self.weapon_range[codes], self.attack_range[envs, agent])
+        self.health[envs, agent] += self.health_gain[codes]
+        self.vision[envs, agent] += self.vision_boost[codes]
+        self.carrying_flag[envs[codes == FLAG], agent] = True
+        self._award(envs, agent, self.item_points[codes])
+
+    def _return_flags(self, was_alive):
+        home = self.carrying_flag & was_alive & (self.pos == self.bases[:, self.team_of_agent])
+        if not home.any():
+            return
+        envs, agents = np.nonzero(home)
+        self.carrying_flag[envs, agents] = False
+        self._award(envs, agents, self.points['flag_return'])
+        self._place_items(envs, np.full(len(envs), FLAG))
+
+    def _fight(self):
+        """Jeder lebende Agent greift den ersten Gegner in Reichweite (Manhattan) an."""
+        x = self.pos % self.padded_width
+        y = self.pos // self.padded_width
+        distance = np.abs(x[:, :, None] - x[:, None, :]) + np.abs(y[:, :, None] - y[:, None, :])
+        in_range = (distance <= self.attack_range[:, :, None]) & self.enemy
+
+        for agent in range(self.num_agents):
+            targets = in_range[:, agent, :] & self.alive
+            hit = self.alive[:, agent] & targets.any(axis=1)
+            if not hit.any():
+                continue
+            envs = self._rows[hit]
+            target = targets[hit].argmax(axis=1)
+            self.health[envs, target] -= self.attack[envs, agent]
+            killed = self.health[envs, target] <= 0
+            if not killed.any():
+                continue
+            envs, target = envs[killed], target[killed]
+            self.alive[envs, target] = False
+            self.death_tick[envs, target] = self.tick[envs]
+            self.kills[envs, self.team_of_agent[agent]] += 1
+            self._award(envs, agent, self.points['kill'])
+
+            # Eine getragene Flagge kommt zurück auf die Karte
+            dropped = self.carrying_flag[envs, target]
+            if dropped.any():
+                self.carrying_flag[envs[dropped], target[dropped]] = False
+                self._place_items(envs[dropped], np.full(int(dropped.sum()), FLAG))
+
+    def _refill_items(self):
+        """Alle 30 Spielsekunden ein neues Item, solange das Maximum nicht erreicht ist."""
+        due = (self.item_count < self.max_items) & ((self.tick - self.last_item_tick) > self.item_respawn_ticks)
+        if not due.any():
+            return
+        envs = self._rows[due]
+        codes = self.rng.choice(INITIAL_ITEMS, size=len(envs))
+        # Höchstens eine Nuke gleichzeitig
+        nuke = (self.rng.random(len(envs)) < RESPAWN_NUKE_CHANCE) & ~(self.items[envs] == NUKE).any(axis=1)
+        codes[nuke] = NUKE
+        placed = self._place_items(envs, codes)
+        self.last_item_tick[envs[placed]] = self.tick[envs[placed]]
+
+    def _award(self, envs, agents, points):
+        self.rewards[envs, agents] += points
+        np.add.at(self.scores, (envs, self.team_of_agent[agents]), points)
+
+    def _place_items(self, envs, codes):
+        """
+        Legt je ein Item pro Eintrag auf ein zufälliges freies Feld ohne Item, Basis
+        oder lebenden Soldaten (Zurückweisungsverfahren, vektorisiert über alle Partien).
+        Gibt zurück, welche Einträge platziert wurden.
+        """
+        placed = np.zeros(len(envs), dtype=bool)
+        pending = np.arange(len(envs))
+        for _ in range(MAX_PLACEMENT_TRIES):
+            if not len(pending):
+                break
+            e = envs[pending]
+            cells = self.free_cells[self.rng.integers(len(self.free_cells), size=len(pending))]
+            ok = ((self.items[e, cells] == 0)
+                  & ~(self.bases[e] == cells[:, None]).any(axis=1)
+                  & ~((self.pos[e] == cells[:, None]) & self.alive[e]).any(axis=1))
+            # Zwei Einträge derselben Partie dürfen nicht auf dasselbe Feld fallen
+            ok_idx = np.flatnonzero(ok)
+            _, first = np.unique(e[ok_idx] * self.free.size + cells[ok_idx], return_index=True)
+            ok_idx = ok_idx[first]
+
+            self.items[e[ok_idx], cells[ok_idx]] = codes[pending[ok_idx]]
+            np.add.at(self.item_count, e[ok_idx], 1)
+            placed[pending[ok_idx]] = True
+            pending = np.setdiff1d(pending, pending[ok_idx], assume_unique=True)
+        return placed
+
+    def _reset_envs(self, envs):
+        """Neue Runde: Basen, Soldaten und Start-Items für die angegebenen Partien."""
+        for env in envs:
+            self.bases[env] = self._pick_bases()
+        agents_base = self.bases[envs][:, self.team_of_agent]
+        self.pos[envs] = agents_base
+        self.health[envs] = START_HEALTH
+        self.attack[envs] = START_ATTACK
+        self.attack_range[envs] = START_RANGE
+        self.vision[envs] = START_VISION
+        self.alive[envs] = True
+        self.carrying_flag[envs] = False
+        self.death_tick[envs] = 0
+        self.tick[envs] = 0
+        # Erstes Auffüllen sofort möglich (wie beim ItemManager)
+        self.last_item_tick[envs] = -self.item_respawn_ticks - 1
+        self.scores[envs] = 0
+        self.kills[envs] = 0
+        self.items[envs] = 0
+        self.item_count[envs] = 0
+
+        # Flagge, optional eine Nuke, dann zufällige Items bis zur Hälfte des Maximums
+        self._place_items(envs, np.full(len(envs), FLAG))
+        nuke = self.rng.random(len(envs)) < START_NUKE_CHANCE
+        self._place_items(envs[nuke], np.full(int(nuke.sum()), NUKE))
+        for _ in range(self.max_items // 2):
+            missing = envs[self.item_count[envs] < self.max_items // 2]
+            if not len(missing):
+                break
+            self._place_items(missing, self.rng.choice(INITIAL_ITEMS, size=len(missing)))
+
+    def _pick_bases(self):
+        """Zufällige Basisfelder mit Mindestabstand (Manhattan) zueinander."""
+        order = self.rng.permutation(len(self.free_cells))
+        chosen = []
+        for _ in range(self.num_teams):
+            ok = np.ones(len(order), dtype=bool)
+            for idx in chosen:
+                ok &= (np.abs(self.free_x[order] - self.free_x[idx])
+                       + np.abs(self.free_y[order] - self.free_y[idx])) >= MIN_BASE_DISTANCE
+            candidates = order[ok]
+            # Reicht der Platz nicht, teilen sich Basen notfalls ein Feld
+            chosen.append(candidates[0] if len(candidates) else order[0])
+        return self.free_cells[chosen]
+
+    def _observe(self):
+        """Kodiert alle Agenten aller Partien in den vorab angelegten Beobachtungspuffer."""
+        width = self.padded_width
+        height = self.grid.height + 2
+        state = {
+            'items': self.items.reshape(self.num_envs, height, width)[:, 1:-1, 1:-1],
+            'x': self.pos % width - 1,
+            'y': self.pos // width - 1,
+            'team': self.team_of_agent,
+            'alive': self.alive,
+            'carrying_flag': self.carrying_flag,
+            'health': self.health,
+            'attack': self.attack,
+            'attack_range': self.attack_range,
+            'vision': self.vision,
+            'bases_x': self.bases % width - 1,
+            'bases_y': self.bases // width - 1,
+            'time_left': 1 - self.tick / self.round_ticks,
+        }
+        return self.encoder.encode_batch(state, self.observations)
+
+    def positions(self, env):
+        """Positionen (x, y) der Agenten einer Partie, z.B. zur Anzeige oder Kontrolle."""
+        width = self.padded_width
+        return [(int(p % width) - 1, int(p // width) - 1) for p in self.pos[env]]
+
+
+if __name__ == '__main__':
+    # Benchmark: Agenten-Schritte pro Sekunde mit zufälligen Aktionen
+    import os
+    map_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'maps', '31test.map')
+    for num_envs in (64, 256, 1024):
+        env = VecEnv(Grid.load(map_path), num_envs=num_envs, seed=0)
+        env.reset()
+        rng = np.random.default_rng(0)
+        actions = rng.integers(len(ACTION_DELTAS), size=(200, num_envs, env.num_agents))
+        start = time.perf_counter()
+        for step_actions in actions:
+            env.step(step_actions)
+        duration = time.perf_counter() - start
+        agent_steps = len(actions) * num_envs * env.num_agents
+        print(f"{num_envs:5d} Partien: {agent_steps / duration:10.0f} Agenten-Schritte/s")
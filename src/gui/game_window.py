@@ -1,29 +1,67 @@
 import sys
 import os
-import random
+import math
+import time
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton,
-    QHBoxLayout, QGroupBox, QListWidget, QProgressBar
+    QHBoxLayout, QGroupBox, QListWidget, QProgressBar, QSizePolicy
 )
-from PyQt6.QtGui import QPixmap, QFont, QPainter, QColor
-from PyQt6.QtCore import Qt, QTimer, QRectF
+from PyQt6.QtGui import QFont, QPainter, QColor, QRegion, QPen
+from PyQt6.QtCore import Qt, QTimer, QRectF, QRect, QSize
+from src.game_logic.grid import Grid
+from src.game_logic.simulation import Simulation
+from src.game_logic.item_manager import GUI_ITEM_RULES
+from src.game_logic.snapshot import SimulationWorker, item_changes_between
+from src.gui.maze_renderer import MazeRenderer
+from src.gui.sprites import SpriteManager, TEAM_SPRITES
+
+MAX_CELL_SIZE = 64 # Stärkster Zoom in Pixeln pro Zelle
+ZOOM_STEP = 1.25 # Zoomfaktor pro Mausrad-Raste bzw. Taste
+MIN_SPRITE_SIZE = 4 # Darunter werden Soldaten als farbige Punkte gezeichnet
+DEAD_SOLDIER_OPACITY = 0.35 # Tote Soldaten werden bis zum Respawn blass gezeichnet
+MINIMAP_MARGIN = 8
+ITEM_CHUNK = 32 # Items werden in Blöcken von ITEM_CHUNK x ITEM_CHUNK Zellen geführt (nur sichtbare zeichnen)
+BACKGROUND_COLOR = QColor(51, 51, 51)
 
 class MapWidget(QWidget):
     """
     Ein benutzerdefiniertes Widget zum Zeichnen der Labyrinth-Karte.
+
+    Das Widget zeigt einen Ausschnitt der Karte: `cell_size` ist der Zoom
+    (Pixel pro Zelle), (view_x, view_y) die Zelle in der linken oberen Ecke.
+    Mausrad zoomt um den Mauszeiger, Ziehen mit der linken Maustaste oder die
+    Pfeiltasten verschieben den Ausschnitt, +/- zoomen und 0 zeigt die ganze
+    Karte. Ist die Karte größer als der Ausschnitt, zeigt eine Minimap oben
+    rechts die Übersicht; ein Klick darauf springt an die Stelle. Gezeichnet
+    werden nur die Kacheln und Figuren im sichtbaren Ausschnitt; die Items liegen
+    dafür in Blöcken (ITEM_CHUNK), von denen nur die sichtbaren durchlaufen werden.
     """
     def __init__(self, map_name, teams_info, parent=None):
         super().__init__(parent)
         self.map_name = map_name
         self.teams_info = teams_info
-        self.map_data = []
+        self.grid = None
         self.cell_size = 0
+        self.view_x = 0.0
+        self.view_y = 0.0
+        self._user_view = False # Hat der Spieler gezoomt oder verschoben? Sonst passt die Karte sich an
+        self._drag_start = None
+        self._minimap_drag = False
         self.map_width = 0
         self.map_height = 0
-        self.bases = []
-        self.flag_pos = None  # Position der Flagge
-        self.objects_to_draw = [] # Liste der Objekte, die gezeichnet werden sollen
+        self.bases = [] # Werden vom GameWindow aus der Simulation übernommen
+        self.item_chunks = {} # (Block-x, Block-y) -> {Position: Item-Typ}, aus den Snapshots nachgeführt
+        self._item_source = None # initial_items der Runde, zu der self.items gehört
+        self._item_version = 0 # Anzahl bereits übernommener Item-Änderungen
         self.soldiers_to_draw = [] # Liste der Soldaten, die gezeichnet werden sollen
+        self.maze_renderer = None # Vorgerenderte Ebene mit Mauern und Wegen
+        self._dirty_cells = set() # Zellen, die sich seit dem letzten Frame geändert haben
+        self._repaint_pending = False
+        self.snapshots = None # SnapshotBuffer der laufenden Simulation
+        self._shown_tick = None
+        self._interpolating = False
+        self.frame_timer = QTimer(self)
+        self.frame_timer.timeout.connect(self.next_frame)
 
         # Zuordnung der Teamnamen zu den Farben
         self.team_colors = {
@@ -34,39 +72,20 @@ class MapWidget(QWidget):
             "Team Gold": QColor(255, 215, 0)
         }
 
-        # Pfade zu den Bilddateien
-        base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        self.image_paths = {
-            'wall': os.path.join(base_path, 'assets', 'images', 'wall.png'),
-            'flag': os.path.join(base_path, 'assets', 'images', 'flag.png'),
-            'knife': os.path.join(base_path, 'assets', 'images', 'knife.png'),
-            'gun': os.path.join(base_path, 'assets', 'images', 'gun.png'),
-            'grenade': os.path.join(base_path, 'assets', 'images', 'grenade.png'),
-            'nuke': os.path.join(base_path, 'assets', 'images', 'nuke.png'),
-            'pink_duck': os.path.join(base_path, 'assets', 'images', 'pink_duck.png'),
-            'red pill': os.path.join(base_path, 'assets', 'images', 'redpill.png'),
-            'blue pill': os.path.join(base_path, 'assets', 'images', 'bluepill.png'),
-            'fake flag': os.path.join(base_path, 'assets', 'images', 'fake_flag.png'),
-            'fernglas': os.path.join(base_path, 'assets', 'images', 'binoculars.png'),
-            # Korrigierte Dateinamen für Soldatenbilder
-            'soldier-red': os.path.join(base_path, 'assets', 'images', 'soldier-red.png'),
-            'soldier-blue': os.path.join(base_path, 'assets', 'images', 'soldier-blue.png'),
-            'soldier-green': os.path.join(base_path, 'assets', 'images', 'soldier-green.png'),
-            'soldier-pink': os.path.join(base_path, 'assets', 'images', 'soldier-pink.png'),
-            'soldier-gold': os.path.join(base_path, 'assets', 'images', 'soldier-gold.png'),
-            'dead-soldier': os.path.join(base_path, 'assets', 'images', 'dead-soldier.png'),
-        }
+        # Soldaten-Sprite -> Teamfarbe (Punkte bei kleinem Zoom und in der Minimap)
+        self.sprite_colors = {TEAM_SPRITES[name]: color for name, color in self.team_colors.items()}
+
+        # Alle Bilder kommen aus dem prozessweiten Sprite-Atlas (einmal geladen)
+        self.sprites = SpriteManager.instance()
 
-        # Lade alle Pixmaps und prüfe auf Fehler
-        self.pixmaps = {}
-        for name, path in self.image_paths.items():
-            self.pixmaps[name] = QPixmap(path)
-            if self.pixmaps[name].isNull():
-                print(f"FEHLER: Bilddatei für '{name}' nicht gefunden oder fehlerhaft: {path}")
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        self.setMinimumSize(400, 300)
 
         self.load_map()
-        self.place_bases()
-        self.place_flag()
+
+    def sizeHint(self):
+        return QSize(800, 600)
 
     def load_map(self):
         """Lädt die Labyrinth-Daten aus der .map-Datei."""
@@ -76,191 +95,367 @@ class MapWidget(QWidget):
 
             print(f"DEBUG: Versuche, Karte zu laden von: {map_path}")
             
-            with open(map_path, 'r') as f:
-                lines = [line.strip() for line in f if line.strip()]
-                self.map_data = [list(line) for line in lines]
+            self.grid = Grid.load(map_path)
             
-            self.map_height = len(self.map_data)
-            self.map_width = len(self.map_data[0])
+            self.map_height = self.grid.height
+            self.map_width = self.grid.width
+            if not self.grid:
+                raise IndexError("Karte enthält keine Zeilen")
             print(f"DEBUG: Karte erfolgreich geladen. Abmessungen: {self.map_width}x{self.map_height}")
+            self.maze_renderer = MazeRenderer(self.grid, self.sprites.pixmap('wall'))
             
         except FileNotFoundError:
             print(f"FEHLER: Kartendatei nicht gefunden: {self.map_name}")
-            self.map_data = []
+            self.grid = None
         except IndexError:
             print(f"FEHLER: Leere oder fehlerhafte Kartendatei: {self.map_name}")
-            self.map_data = []
+            self.grid = None
         except Exception as e:
             print(f"SCHWERER FEHLER: Ein unerwarteter Fehler beim Laden der Karte ist aufgetreten: {e}")
-            self.map_data = []
+            self.grid = None
+            self.maze_renderer = None
 
-    def place_bases(self):
-        """Platziert die Basen der Teams zufällig auf der Karte."""
-        if not self.map_data:
-            return
+    def set_snapshot_source(self, snapshots, fps=60):
+        """Zeichnet ab jetzt mit `fps` Bildern pro Sekunde den jeweils neuesten Snapshot."""
+        self.snapshots = snapshots
+        self.frame_timer.start(int(1000 / fps))
 
-        empty_cells = []
-        for y in range(self.map_height):
-            for x in range(self.map_width):
-                if self.map_data[y][x] == '.':
-                    empty_cells.append((x, y))
+    def next_frame(self):
+        """
+        Übernimmt den neuesten Snapshot der Simulation. Soldaten werden zwischen
+        den letzten beiden Ticks interpoliert, damit die Bewegung bei 60 fps
+        flüssig ist, egal wie schnell die Simulation tickt.
+        """
+        previous, latest = self.snapshots.pair()
+        if latest is None:
+            return
+        new_tick = latest.tick != self._shown_tick
+        if not new_tick and not self._interpolating:
+            return
+        if new_tick:
+            self._shown_tick = latest.tick
+            self.apply_item_changes(latest)
+
+        alpha = 1.0
+        if previous is not None and latest.wall_time > previous.wall_time:
+            alpha = min(1.0, (time.perf_counter() - latest.wall_time) / (latest.wall_time - previous.wall_time))
+        previous_positions = {soldier.soldier_id: soldier.position
+                              for soldier in previous.soldiers if soldier.alive} if previous is not None else {}
+
+        soldiers = []
+        self._interpolating = False
+        for soldier in latest.soldiers:
+            x, y = soldier.position
+            start = previous_positions.get(soldier.soldier_id)
+            # Nur echte Schritte interpolieren, keine Respawns
+            if soldier.alive and start and alpha < 1.0 and abs(start[0] - x) + abs(start[1] - y) == 1:
+                x = start[0] + (x - start[0]) * alpha
+                y = start[1] + (y - start[1]) * alpha
+                self._interpolating = True
+            soldiers.append({'pos': (x, y),
+                             'health': soldier.health if soldier.alive else 0,
+                             'image': TEAM_SPRITES.get(soldier.team)})
+        self.update_soldiers_to_draw(soldiers)
+
+    # --- Ausschnitt und Zoom ---
+
+    def fit_cell_size(self):
+        """Zellgröße, bei der die ganze Karte ins Widget passt (zugleich der kleinste Zoom)."""
+        if not self.grid or self.width() <= 0 or self.height() <= 0:
+            return 0
+        return min(self.width() / self.map_width, self.height() / self.map_height, MAX_CELL_SIZE)
+
+    def fit_to_view(self):
+        """Zeigt die ganze Karte zentriert."""
+        self._user_view = False
+        self.set_view(self.fit_cell_size(), 0.0, 0.0)
+
+    def set_view(self, cell_size, view_x, view_y):
+        """Setzt Zoom und Ausschnitt (begrenzt auf die Karte) und zeichnet neu."""
+        if not self.grid:
+            return
+        fit = self.fit_cell_size()
+        if fit <= 0:
+            return
+        self.cell_size = max(fit, min(cell_size, MAX_CELL_SIZE))
+        self.view_x = self._clamp_view(view_x, self.width() / self.cell_size, self.map_width)
+        self.view_y = self._clamp_view(view_y, self.height() / self.cell_size, self.map_height)
+        self.sprites.set_cell_size(self.cell_size)
+        self.update()
+
+    @staticmethod
+    def _clamp_view(start, visible, total):
+        # Passt die Karte ganz hinein, wird sie zentriert, sonst bleibt der Ausschnitt auf der Karte
+        if visible >= total:
+            return (total - visible) / 2
+        return max(0.0, min(start, total - visible))
+
+    def zoom_at(self, x, y, factor):
+        """Zoomt um den Widget-Punkt (x, y): die Zelle unter dem Punkt bleibt, wo sie ist."""
+        if not self.cell_size:
+            return
+        cell_x = self.view_x + x / self.cell_size
+        cell_y = self.view_y + y / self.cell_size
+        cell_size = self.cell_size * factor
+        self._user_view = True
+        self.set_view(cell_size, cell_x - x / cell_size, cell_y - y / cell_size)
+
+    def pan(self, dx, dy):
+        """Verschiebt den Ausschnitt um (dx, dy) Pixel."""
+        if not self.cell_size:
+            return
+        self._user_view = True
+        self.set_view(self.cell_size, self.view_x + dx / self.cell_size, self.view_y + dy / self.cell_size)
 
-        if not empty_cells:
-            print(f"FEHLER: Die Karte '{self.map_name}' enthält keine leeren Felder ('.'). Basen können nicht platziert werden.")
+    def center_on(self, cell_x, cell_y):
+        if not self.cell_size:
             return
+        self._user_view = True
+        self.set_view(self.cell_size, cell_x - self.width() / self.cell_size / 2,
+                      cell_y - self.height() / self.cell_size / 2)
+
+    def visible_cells(self):
+        """Sichtbarer Ausschnitt als (x0, y0, x1, y1) in Zellen, eine Zelle Rand für halb sichtbare Figuren."""
+        return (self.view_x - 1, self.view_y - 1,
+                self.view_x + self.width() / self.cell_size + 1, self.view_y + self.height() / self.cell_size + 1)
+
+    def minimap_rect(self):
+        """Lage der Minimap im Widget oder None, wenn die ganze Karte sichtbar ist."""
+        if (self.maze_renderer is None or not self.cell_size
+                or (self.width() / self.cell_size >= self.map_width and self.height() / self.cell_size >= self.map_height)):
+            return None
+        pixmap, _ = self.maze_renderer.minimap()
+        return QRect(self.width() - pixmap.width() - MINIMAP_MARGIN, MINIMAP_MARGIN, pixmap.width(), pixmap.height())
+
+    def _center_on_minimap(self, pos):
+        rect = self.minimap_rect()
+        _, step = self.maze_renderer.minimap()
+        self.center_on((pos.x() - rect.x()) * step, (pos.y() - rect.y()) * step)
+
+    def resizeEvent(self, event):
+        """Ohne eigenen Zoom passt sich die Karte der neuen Größe an, sonst bleibt der Zoom."""
+        super().resizeEvent(event)
+        if self._user_view and self.cell_size:
+            self.set_view(self.cell_size, self.view_x, self.view_y)
+        else:
+            self.fit_to_view()
 
-        random.shuffle(empty_cells)
-        
-        for team in self.teams_info:
-            team_name = team['name']
-            team_color = self.team_colors.get(team_name, QColor(255, 255, 255)) # Standardfarbe
-            
-            found_spot = False
-            # Durchlaufe eine Kopie der Liste, um Modifikationen zu vermeiden
-            for x, y in list(empty_cells):
-                is_far_enough = True
-                for base in self.bases:
-                    # Manhattandistanz-Überprüfung
-                    distance = abs(x - base['x']) + abs(y - base['y'])
-                    # Die Entfernung muss größer oder gleich 4 sein
-                    if distance < 4:
-                        is_far_enough = False
-                        break
-                
-                if is_far_enough:
-                    self.bases.append({
-                        'x': x,
-                        'y': y,
-                        'color': team_color,
-                        'health': team['health'],
-                        'sight_range': team['sight_range'],
-                        'team_name': team_name # Füge den Teamnamen zur Basis hinzu
-                    })
-                    print(f"DEBUG: Basis für {team_name} bei ({x}, {y}) platziert.")
-                    found_spot = True
-                    # Die verwendete Zelle aus der Liste der leeren Zellen entfernen
-                    empty_cells.remove((x, y))
-                    break
-            
-            if not found_spot:
-                print(f"WARNUNG: Konnte keine geeignete Position für die Basis von {team_name} finden. Möglicherweise sind zu viele Teams für die Kartengröße ausgewählt.")
-
-    def place_flag(self):
-        """Platziert die Flagge zufällig auf einem freien Feld auf der Karte."""
-        if not self.map_data or self.flag_pos:
-            return # Platziere nur eine Flagge pro Runde
-
-        empty_cells = []
-        for y in range(self.map_height):
-            for x in range(self.map_width):
-                # Finde leere Felder, die keine Basis sind
-                is_base = any(base['x'] == x and base['y'] == y for base in self.bases)
-                if self.map_data[y][x] == '.' and not is_base:
-                    empty_cells.append((x, y))
-
-        if empty_cells:
-            random.shuffle(empty_cells)
-            self.flag_pos = empty_cells[0]
-            print(f"DEBUG: Flagge bei ({self.flag_pos[0]}, {self.flag_pos[1]}) platziert.")
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() / 120
+        if steps:
+            pos = event.position()
+            self.zoom_at(pos.x(), pos.y(), ZOOM_STEP ** steps)
+        event.accept()
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            rect = self.minimap_rect()
+            if rect is not None and rect.contains(event.position().toPoint()):
+                self._minimap_drag = True
+                self._center_on_minimap(event.position().toPoint())
+            else:
+                self._drag_start = event.position()
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self._minimap_drag:
+            self._center_on_minimap(event.position().toPoint())
+        elif self._drag_start is not None:
+            pos = event.position()
+            self.pan(self._drag_start.x() - pos.x(), self._drag_start.y() - pos.y())
+            self._drag_start = pos
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        self._drag_start = None
+        self._minimap_drag = False
+        super().mouseReleaseEvent(event)
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        step_x, step_y = self.width() / 10, self.height() / 10
+        if key in (Qt.Key.Key_Plus, Qt.Key.Key_Equal):
+            self.zoom_at(self.width() / 2, self.height() / 2, ZOOM_STEP)
+        elif key == Qt.Key.Key_Minus:
+            self.zoom_at(self.width() / 2, self.height() / 2, 1 / ZOOM_STEP)
+        elif key == Qt.Key.Key_0:
+            self.fit_to_view()
+        elif key == Qt.Key.Key_Left:
+            self.pan(-step_x, 0)
+        elif key == Qt.Key.Key_Right:
+            self.pan(step_x, 0)
+        elif key == Qt.Key.Key_Up:
+            self.pan(0, -step_y)
+        elif key == Qt.Key.Key_Down:
+            self.pan(0, step_y)
         else:
-            print("WARNUNG: Keine leeren Felder für die Flagge gefunden.")
+            super().keyPressEvent(event)
 
-    def update_objects_to_draw(self, objects_list):
-        """Aktualisiert die Liste der zu zeichnenden Objekte."""
-        self.objects_to_draw = objects_list
-        self.update() # Löst ein Neuzeichnen des Widgets aus
+    def apply_item_changes(self, snapshot):
+        """
+        Übernimmt nur die Item-Änderungen seit dem zuletzt gezeigten Snapshot;
+        neu gezeichnet werden nur diese Zellen. Bei einer neuen Runde werden die
+        Items einmal komplett übernommen.
+        """
+        if snapshot.initial_items is not self._item_source:
+            self._item_source = snapshot.initial_items
+            self._item_version = 0
+            self.item_chunks = {}
+            for pos, item_type in snapshot.initial_items:
+                self._item_chunk(pos)[pos] = item_type
+            self.update()
+        changes = item_changes_between(snapshot, self._item_version)
+        self._item_version = snapshot.item_version
+        for pos, item_type in changes:
+            if item_type is None:
+                self._item_chunk(pos).pop(pos, None)
+            else:
+                self._item_chunk(pos)[pos] = item_type
+        self.mark_dirty(pos for pos, _ in changes)
+
+    def _item_chunk(self, pos):
+        key = (pos[0] // ITEM_CHUNK, pos[1] // ITEM_CHUNK)
+        chunk = self.item_chunks.get(key)
+        if chunk is None:
+            chunk = self.item_chunks[key] = {}
+        return chunk
+
+    def visible_items(self):
+        """Items im sichtbaren Ausschnitt als (Position, Typ); durchläuft nur die sichtbaren Blöcke."""
+        x0, y0, x1, y1 = self.visible_cells()
+        for chunk_y in range(max(int(y0), 0) // ITEM_CHUNK, int(y1) // ITEM_CHUNK + 1):
+            for chunk_x in range(max(int(x0), 0) // ITEM_CHUNK, int(x1) // ITEM_CHUNK + 1):
+                chunk = self.item_chunks.get((chunk_x, chunk_y))
+                if not chunk:
+                    continue
+                for (x, y), item_type in chunk.items():
+                    if x0 <= x <= x1 and y0 <= y <= y1:
+                        yield (x, y), item_type
 
     def update_soldiers_to_draw(self, soldiers_list):
-        """Aktualisiert die Liste der zu zeichnenden Soldaten."""
+        """Aktualisiert die Liste der zu zeichnenden Soldaten; neu gezeichnet werden nur geänderte Zellen."""
+        def drawn(soldier):
+            return (tuple(soldier['pos']), soldier['health'] <= 0, soldier['image'])
+        old = {drawn(soldier) for soldier in self.soldiers_to_draw}
+        new = {drawn(soldier) for soldier in soldiers_list}
         self.soldiers_to_draw = soldiers_list
-        self.update() # Löst ein Neuzeichnen des Widgets aus
+        self.mark_dirty(pos for pos, _, _ in old ^ new)
+
+    def mark_dirty(self, cells):
+        """
+        Merkt geänderte Zellen vor. Alle Änderungen bis zur Rückkehr in die
+        Event-Loop (also eines ganzen Ticks) werden zu einem update() zusammengefasst.
+        """
+        self._dirty_cells.update(cells)
+        if self._dirty_cells and not self._repaint_pending:
+            self._repaint_pending = True
+            QTimer.singleShot(0, self._flush_dirty_cells)
+
+    def _flush_dirty_cells(self):
+        self._repaint_pending = False
+        cells, self._dirty_cells = self._dirty_cells, set()
+        if not self.cell_size:
+            self.update() # Noch nie gezeichnet: Zellgröße unbekannt
+            return
+        # Ein Pixel Rand gegen Rundungsreste der Sprite-Positionen; Zellen außerhalb des Ausschnitts entfallen
+        size = max(math.ceil(self.cell_size), 2) + 2
+        x0, y0, x1, y1 = self.visible_cells()
+        region = QRegion()
+        for x, y in cells:
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                region += QRect(int((x - self.view_x) * self.cell_size) - 1,
+                                int((y - self.view_y) * self.cell_size) - 1, size, size)
+        # Die Minimap zeigt alle Soldaten und wird daher bei jeder Änderung mitgezeichnet
+        minimap = self.minimap_rect()
+        if minimap is not None:
+            region += minimap
+        if not region.isEmpty():
+            self.update(region)
 
 
     def paintEvent(self, event):
-        """Zeichnet die Labyrinth-Zellen, Basen, Spielfiguren und Soldaten."""
+        """Zeichnet die sichtbaren Labyrinth-Kacheln, Basen, Spielfiguren, Soldaten und die Minimap."""
         painter = QPainter(self)
-        if not self.map_data:
+        if not self.grid:
             painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "FEHLER: Karte nicht geladen")
             return
+        painter.setClipRect(event.rect())
+        painter.fillRect(event.rect(), BACKGROUND_COLOR)
+        if not self.cell_size:
+            return # Noch keine Größe (resizeEvent setzt den Ausschnitt)
+        cell_size = self.cell_size
+        view_x, view_y = self.view_x, self.view_y
+        sprite_size = int(cell_size * 0.6)
+
+        # Labyrinth (Mauern und Wege) aus vorgerenderten Kacheln: nur die im Ausschnitt.
+        # Fehlen noch Kacheln (Zeitbudget pro Frame aufgebraucht), gleich noch einmal zeichnen
+        if not self.maze_renderer.draw(painter, view_x, view_y, cell_size, self.width(), self.height()):
+            QTimer.singleShot(0, self.update)
+        if self.snapshots is not None and self.snapshots.latest() is None:
+            painter.setPen(QColor(255, 255, 255))
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Simulation wird vorbereitet ...")
+        painter.setPen(Qt.PenStyle.NoPen)
+
+        x0, y0, x1, y1 = self.visible_cells()
+
+        def visible(x, y):
+            return x0 <= x <= x1 and y0 <= y <= y1
+
+        def screen(x, y, inset):
+            return int((x - view_x + inset) * cell_size), int((y - view_y + inset) * cell_size)
 
-        # Berechne die Zellgröße basierend auf der Größe des Widgets
-        cell_width = self.width() / self.map_width
-        cell_height = self.height() / self.map_height
-        self.cell_size = min(cell_width, cell_height)
-
-        # Zeichne das Labyrinth-Gitter
-        for row_idx, row in enumerate(self.map_data):
-            for col_idx, cell in enumerate(row):
-                rect = QRectF(col_idx * self.cell_size, row_idx * self.cell_size, self.cell_size, self.cell_size)
-                
-                if cell == '#':
-                    # Zeichne die Wand mit dem Bild
-                    if 'wall' in self.pixmaps and not self.pixmaps['wall'].isNull():
-                        scaled_pixmap = self.pixmaps['wall'].scaled(int(self.cell_size), int(self.cell_size), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                        painter.drawPixmap(rect.toRect(), scaled_pixmap)
-                    else:
-                        painter.setBrush(QColor(0, 0, 0)) # Fallback, falls das Bild nicht geladen werden kann
-                        painter.drawRect(rect)
-                else:
-                    # Zeichne den Weg mit der gewünschten Farbe
-                    painter.setBrush(QColor(200, 200, 200)) # Graue Wege
-                    painter.setPen(Qt.PenStyle.NoPen)
-                    painter.drawRect(rect)
-        
         # Zeichne die Basen
-        if self.bases:
-            for base in self.bases:
-                painter.setBrush(base['color'])
-                painter.setPen(Qt.PenStyle.NoPen)
-                base_rect = QRectF(
-                    base['x'] * self.cell_size + self.cell_size * 0.25,
-                    base['y'] * self.cell_size + self.cell_size * 0.25,
-                    self.cell_size * 0.5,
-                    self.cell_size * 0.5
-                )
-                painter.drawEllipse(base_rect)
-
-        # Zeichne die Flagge, falls vorhanden
-        if self.flag_pos and 'flag' in self.pixmaps and not self.pixmaps['flag'].isNull():
-            flag_rect = QRectF(
-                self.flag_pos[0] * self.cell_size + self.cell_size * 0.2,
-                self.flag_pos[1] * self.cell_size + self.cell_size * 0.2,
-                self.cell_size * 0.6,
-                self.cell_size * 0.6
-            )
-            scaled_pixmap = self.pixmaps['flag'].scaled(int(flag_rect.width()), int(flag_rect.height()), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-            painter.drawPixmap(flag_rect.toRect(), scaled_pixmap)
-            
-        # Zeichne die Objekte
-        for obj in self.objects_to_draw:
-            obj_type = obj['type']
-            if obj_type in self.pixmaps and not self.pixmaps[obj_type].isNull():
-                obj_rect = QRectF(
-                    obj['pos'][0] * self.cell_size + self.cell_size * 0.2,
-                    obj['pos'][1] * self.cell_size + self.cell_size * 0.2,
-                    self.cell_size * 0.6,
-                    self.cell_size * 0.6
-                )
-                scaled_pixmap = self.pixmaps[obj_type].scaled(int(obj_rect.width()), int(obj_rect.height()), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                painter.drawPixmap(obj_rect.toRect(), scaled_pixmap)
-
-        # Zeichne die Soldaten
+        for base in self.bases:
+            if not visible(base['x'], base['y']):
+                continue
+            painter.setBrush(base['color'])
+            painter.drawEllipse(QRectF((base['x'] - view_x + 0.25) * cell_size, (base['y'] - view_y + 0.25) * cell_size,
+                                       max(cell_size * 0.5, 2), max(cell_size * 0.5, 2)))
+
+        # Zeichne die Objekte (bereits skalierte Sprites: nur Blits)
+        if sprite_size >= MIN_SPRITE_SIZE:
+            for (x, y), item_type in self.visible_items():
+                self.sprites.draw(painter, item_type, *screen(x, y, 0.2), sprite_size)
+
+        # Zeichne die Soldaten; bei kleinem Zoom als Punkte in der Teamfarbe
         for soldier in self.soldiers_to_draw:
-            # Zeige tote Soldaten mit dem dead-soldier Bild an
+            x, y = soldier['pos']
+            if not visible(x, y):
+                continue
+            if sprite_size < MIN_SPRITE_SIZE:
+                if soldier['health'] > 0:
+                    left, top = screen(x, y, 0)
+                    dot = max(int(cell_size), 2)
+                    painter.fillRect(left, top, dot, dot, self.sprite_colors.get(soldier['image'], QColor(255, 255, 255)))
+                continue
+            # Tote Soldaten (bis zum Respawn) blass in ihrer Teamfarbe
             if soldier['health'] <= 0:
-                soldier_type = 'dead-soldier'
-            else:
-                soldier_type = soldier['image']
-
-            if soldier_type in self.pixmaps and not self.pixmaps[soldier_type].isNull():
-                soldier_rect = QRectF(
-                    soldier['pos'][0] * self.cell_size + self.cell_size * 0.2,
-                    soldier['pos'][1] * self.cell_size + self.cell_size * 0.2,
-                    self.cell_size * 0.6,
-                    self.cell_size * 0.6
-                )
-                scaled_pixmap = self.pixmaps[soldier_type].scaled(int(soldier_rect.width()), int(soldier_rect.height()), Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                painter.drawPixmap(soldier_rect.toRect(), scaled_pixmap)
+                painter.setOpacity(DEAD_SOLDIER_OPACITY)
+            self.sprites.draw(painter, soldier['image'], *screen(x, y, 0.2), sprite_size)
+            painter.setOpacity(1.0)
+
+        self._draw_minimap(painter)
+
+    def _draw_minimap(self, painter):
+        """Übersichtskarte mit dem aktuellen Ausschnitt als Rahmen und allen Soldaten als Punkte."""
+        rect = self.minimap_rect()
+        if rect is None:
+            return
+        pixmap, step = self.maze_renderer.minimap()
+        painter.drawPixmap(rect.topLeft(), pixmap)
+        for base in self.bases:
+            painter.fillRect(rect.x() + int(base['x'] / step) - 2, rect.y() + int(base['y'] / step) - 2, 5, 5, base['color'])
+        for soldier in self.soldiers_to_draw:
+            if soldier['health'] > 0:
+                painter.fillRect(rect.x() + int(soldier['pos'][0] / step) - 1, rect.y() + int(soldier['pos'][1] / step) - 1,
+                                 3, 3, self.sprite_colors.get(soldier['image'], QColor(255, 255, 255)))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.setPen(QPen(QColor(255, 215, 0), 1))
+        painter.drawRect(QRectF(rect.x() + self.view_x / step, rect.y() + self.view_y / step,
+                                self.width() / self.cell_size / step, self.height() / self.cell_size / step)
+                         .intersected(QRectF(rect)))
+        painter.setPen(QPen(QColor(85, 85, 85), 1))
+        painter.drawRect(rect)
 
 class GameWindow(QMainWindow):
     """
@@ -285,14 +480,8 @@ class GameWindow(QMainWindow):
             "Team Gold": QColor(255, 215, 0)
         }
 
-        # Zuordnung der deutschen Teamnamen zu den englischen Bildnamen
-        self.team_name_to_image_name = {
-            'Team Rot': 'soldier-red',
-            'Team Blau': 'soldier-blue',
-            'Team Grün': 'soldier-green',
-            'Team Pink': 'soldier-pink',
-            'Team Gold': 'soldier-gold',
-        }
+        # Zuordnung der deutschen Teamnamen zu den Soldaten-Sprites
+        self.team_name_to_image_name = TEAM_SPRITES
         
         # Erstelle eine neue Teams-Info-Liste mit den erforderlichen Werten
         self.teams_info = []
@@ -326,7 +515,6 @@ class GameWindow(QMainWindow):
         
         # Linke Seite: Spielfeld und Buttons
         self.left_v_layout = QVBoxLayout()
-        self.left_v_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.left_v_layout.setSpacing(20)
 
         # Titel-Label
@@ -342,45 +530,26 @@ class GameWindow(QMainWindow):
         self.left_v_layout.addWidget(self.round_time_label)
 
         # Spielfeld-Widget (ersetzt den alten QLabel-Platzhalter)
+        # Keine feste Größe mehr: das Spielfeld füllt den Platz, große Karten werden gezoomt und verschoben
         self.game_area = MapWidget(self.map_name, self.teams_info)
-        self.game_area.setFixedSize(800, 600)
         self.game_area.setStyleSheet("border: 2px solid #555555;")
-        self.left_v_layout.addWidget(self.game_area)
-
-        # --- Objekt-Logik Hinzufügung ---
-        self.objects = []
-        self.max_objects = (self.game_area.map_width * self.game_area.map_height) // 50
-        print(f"DEBUG: Maximale Objektanzahl für diese Karte: {self.max_objects}")
-        
-        self.object_types = {
-            'knife': {'image': 'knife', 'attack': 2, 'radius': 2},
-            'gun': {'image': 'gun', 'attack': 3, 'radius': 3},
-            'grenade': {'image': 'grenade', 'attack': 5, 'radius': 4},
-            'nuke': {'image': 'nuke', 'attack': 'all', 'radius': 'all'},
-            'pink_duck': {'image': 'pink_duck', 'points': 3},
-            'red pill': {'image': 'red pill', 'health': 25},
-            'blue pill': {'image': 'blue pill', 'health': 10},
-            'fake flag': {'image': 'fake flag', 'effect': 'deception'},
-            'fernglas': {'image': 'fernglas', 'sight_range': 4},
-        }
-
-        # --- Soldaten-Logik Hinzufügung (Reihenfolge korrigiert) ---
-        self.soldiers = []
-        self.soldier_stats = {
-            'health': 25,
-            'sight_range': 3,
-            'attack': 1,
-            'attack_range': 1
-        }
-        self.place_initial_soldiers()
-        # --- Ende Soldaten-Logik Hinzufügung ---
-        
-        # --- Objekt-Logik Hinzufügung (jetzt nach Soldaten-Initialisierung) ---
-        self.place_initial_objects()
-        self.object_spawn_timer = QTimer(self)
-        self.object_spawn_timer.timeout.connect(self.spawn_new_object)
-        self.object_spawn_timer.start(20000) # 20 Sekunden
-        # --- Ende Objekt-Logik Hinzufügung ---
+        self.left_v_layout.addWidget(self.game_area, 1)
+
+        # Die Spiellogik läuft komplett in der headless Simulation auf einem eigenen Thread;
+        # das Fenster zeigt nur die Snapshots, die sie nach jedem Tick veröffentlicht
+        # Auf großen Karten dauert der Aufbau der Simulation Sekunden, deshalb baut
+        # der Worker sie selbst; bis dahin zeigt das Spielfeld nur das Labyrinth.
+        self.simulation_worker = None
+        self._bases_shown = False
+        if self.game_area.grid:
+            grid = self.game_area.grid
+            team_names = [team['name'] for team in self.teams_info]
+            round_duration = self.round_time_limit
+            # Im Fenster gelten weiter die Item-Regeln des ursprünglichen GUI-Spiels
+            self.simulation_worker = SimulationWorker(
+                lambda: Simulation(grid, team_names, round_duration=round_duration, item_rules=GUI_ITEM_RULES),
+                speed=1.0)
+            self.game_area.set_snapshot_source(self.simulation_worker.snapshots)
 
 
         # Buttons
@@ -458,7 +627,7 @@ class GameWindow(QMainWindow):
         self.main_h_layout.addLayout(self.left_v_layout, 7) # größeres Stretch-Verhältnis
         self.main_h_layout.addLayout(self.right_v_layout, 3) # kleineres Stretch-Verhältnis
         
-        # Haupt-Timer für die Spiel-Logik und UI-Updates
+        # Timer für die Team-Übersicht (die Karte aktualisiert sich selbst mit 60 fps)
         self.game_loop_timer = QTimer(self)
         self.game_loop_timer.timeout.connect(self.check_game_state)
         self.game_loop_timer.start(100) # Läuft alle 100ms
@@ -468,17 +637,24 @@ class GameWindow(QMainWindow):
         self.round_time_timer.timeout.connect(self.update_round_time)
         self.round_time_timer.start(1000)
 
+        if self.simulation_worker is not None:
+            self.simulation_worker.start()
+
     def update_round_time(self):
         """Aktualisiert das Rundenzeit-Label jede Sekunde."""
+        # Die Rundenzeit ist Spielzeit der Simulation, nicht Wanduhrzeit
+        if self.simulation_worker is not None:
+            latest = self.simulation_worker.snapshots.latest()
+            if latest is None:
+                return # Simulation wird noch aufgebaut
+            self.time_left = latest.time_left
         if self.time_left > 0:
-            self.time_left -= 1
             minutes = self.time_left // 60
             seconds = self.time_left % 60
             self.round_time_label.setText(f"Zeit: {minutes:02}:{seconds:02}")
         else:
             self.round_time_timer.stop()
             self.game_loop_timer.stop()
-            self.object_spawn_timer.stop()
             self.round_time_label.setText("Zeit abgelaufen!")
             # Hier könnte Logik für das Ende der Runde eingefügt werden
 
@@ -491,167 +667,53 @@ class GameWindow(QMainWindow):
             self.round_time_timer.stop()
         if self.game_loop_timer.isActive():
             self.game_loop_timer.stop()
-        if self.object_spawn_timer.isActive():
-            self.object_spawn_timer.stop()
+        self.game_area.frame_timer.stop()
+        if self.simulation_worker is not None:
+            self.simulation_worker.stop()
         self.start_dialog.show()
         event.accept()
 
     def check_game_state(self):
-        """Überprüft den Spielzustand, Kollisionen und respawned Soldaten."""
-        self.check_collisions()
-        self.check_and_respawn_soldiers()
-        self.update_ui_details()
-        
-    def check_collisions(self):
-        """Prüft auf Kollisionen zwischen Soldaten und Objekten."""
-        soldiers_to_check = self.soldiers.copy()
-        
-        for soldier in soldiers_to_check:
-            # Nur lebende Soldaten können Objekte aufsammeln
-            if soldier['health'] <= 0:
-                continue
-
-            for obj in self.objects.copy():
-                if soldier['pos'] == obj['pos']:
-                    print(f"DEBUG: {soldier['id']} hat Objekt {obj['type']} bei {obj['pos']} aufgesammelt.")
-                    
-                    # Hier könnte die Logik zum Anwenden des Objekt-Effekts stehen
-                    # z.B. soldier['health'] += self.object_types[obj['type']]['health']
-                    # Die Logik zum Töten eines Soldaten wurde entfernt.
-                    
-                    self.objects.remove(obj)
-                    self.game_area.update_objects_to_draw(self.objects)
-                    # Da ein Objekt aufgesammelt wurde, verlassen wir die innere Schleife
-                    # und gehen zum nächsten Soldaten
-                    break
-
-
-    def check_and_respawn_soldiers(self):
-        """Überprüft tote Soldaten und respawned sie, wenn der Timer abgelaufen ist."""
-        for soldier in self.soldiers:
-            if soldier['health'] <= 0:
-                # Zeige toten Soldaten auf der Karte an
-                soldier['image'] = 'dead-soldier'
-                if soldier['respawn_timer'] > 0:
-                    soldier['respawn_timer'] -= 1
-                    # print(f"DEBUG: {soldier['id']} respawnt in {soldier['respawn_timer']/10:.1f}s.")
-                else:
-                    base_info = next((base for base in self.game_area.bases if base['team_name'] == soldier['team_name']), None)
-                    if base_info:
-                        soldier['pos'] = (base_info['x'], base_info['y'])
-                        soldier['health'] = self.soldier_stats['health']
-                        soldier['respawn_timer'] = -1 # Timer zurücksetzen
-                        # Setze das Bild des Soldaten auf das ursprüngliche Team-Bild zurück
-                        soldier['image'] = self.team_name_to_image_name.get(soldier['team_name'])
-                        print(f"DEBUG: {soldier['id']} respawned an Basis bei {soldier['pos']}.")
-                    else:
-                        print(f"FEHLER: Basis für Team {soldier['team_name']} nicht gefunden!")
-
-        # Aktualisiere die Soldaten auf der Karte
-        self.game_area.update_soldiers_to_draw(self.soldiers)
-
-    def update_ui_details(self):
-        """Aktualisiert die UI-Elemente basierend auf dem aktuellen Spielzustand."""
-        soldiers_by_team = {}
-        for soldier in self.soldiers:
-            team_name = soldier['team_name']
-            if team_name not in soldiers_by_team:
-                soldiers_by_team[team_name] = []
-            soldiers_by_team[team_name].append(soldier)
-        
-        for team_name, team_soldiers in soldiers_by_team.items():
-            if team_name in self.team_ui_elements:
-                labels = self.team_ui_elements[team_name]['soldier_labels']
-                for i, soldier in enumerate(team_soldiers):
-                    if soldier['health'] > 0:
-                        labels[i].setText(f"Soldat {i+1}: Health {soldier['health']} | Attack {soldier['attack']} | Range {soldier['attack_range']}")
-                    else:
-                        respawn_time_seconds = soldier['respawn_timer'] / 10
-                        labels[i].setText(f"Soldat {i+1}: respawning in {respawn_time_seconds:.1f}s")
-    
-    def place_initial_objects(self):
-        """Platziert die Hälfte der maximalen Objekte beim Spielstart."""
-        initial_count = self.max_objects // 2
-        print(f"DEBUG: Platziere {initial_count} Objekte beim Spielstart.")
-        for _ in range(initial_count):
-            self.spawn_new_object(initial=True)
-
-    def spawn_new_object(self, initial=False):
-        """Platziert ein neues Objekt auf der Karte."""
-        if len(self.objects) >= self.max_objects:
-            # Maximale Objektzahl erreicht, Timer stoppen
-            if not initial:
-                print("DEBUG: Maximale Objektanzahl erreicht. Timer wird gestoppt.")
-                self.object_spawn_timer.stop()
+        """Aktualisiert die Team-Übersicht aus dem neuesten Snapshot der Simulation."""
+        if self.simulation_worker is None or not self.simulation_worker.ready.is_set():
             return
-
-        # Liste der Objekte zur Auswahl, mit Gewichten
-        object_choices = ['knife', 'gun', 'grenade', 'pink_duck', 'red pill', 'blue pill', 'fake flag', 'fernglas']
-        weights = [10, 8, 5, 5, 6, 7, 3, 4]
-
-        # Die 'nuke' darf nicht am Anfang platziert werden und ist sehr selten
-        if not initial:
-            object_choices.append('nuke')
-            weights.append(1)
-
-        # Wähle ein Objekt basierend auf den Gewichten
-        chosen_type = random.choices(object_choices, weights=weights, k=1)[0]
-        
-        # Finde eine leere Zelle, die weder eine Basis noch ein Objekt oder Soldat ist
-        empty_cells = []
-        for y in range(self.game_area.map_height):
-            for x in range(self.game_area.map_width):
-                is_occupied = any((x, y) == obj['pos'] for obj in self.objects) or \
-                             any((x, y) == (base['x'], base['y']) for base in self.game_area.bases) or \
-                             any((x, y) == soldier['pos'] and soldier['health'] > 0 for soldier in self.soldiers)
-                if self.game_area.map_data[y][x] == '.' and not is_occupied:
-                    empty_cells.append((x, y))
-        
-        if empty_cells:
-            pos = random.choice(empty_cells)
-            
-            # Erstelle die Objektinstanz
-            new_obj = {
-                'type': chosen_type,
-                'pos': pos
-            }
-            self.objects.append(new_obj)
-            print(f"DEBUG: Neues Objekt '{chosen_type}' bei ({pos[0]}, {pos[1]}) platziert.")
-
-            # Aktualisiere die Objekte, die gezeichnet werden sollen
-            self.game_area.update_objects_to_draw(self.objects)
-        else:
-            print("WARNUNG: Konnte kein freies Feld für neues Objekt finden.")
-
-    def place_initial_soldiers(self):
-        """Platziert 2 Soldaten für jedes Team an ihrer jeweiligen Basis."""
+        if not self._bases_shown:
+            self._show_bases()
+        latest = self.simulation_worker.snapshots.latest()
+        if latest is not None:
+            self.update_ui_details(latest)
+
+    def _show_bases(self):
+        """Übernimmt die Basen, sobald der Worker die Simulation gebaut hat (ändern sich danach nicht)."""
+        self._bases_shown = True
+        simulation = self.simulation_worker.simulation
+        if simulation is None:
+            return # Aufbau fehlgeschlagen (siehe simulation_worker.error)
         for team in self.teams_info:
-            base_info = next((base for base in self.game_area.bases if base['team_name'] == team['name']), None)
-            
-            if base_info:
-                team_name = team['name']
-                team_image_name = self.team_name_to_image_name.get(team_name)
-
-                if not team_image_name:
-                    print(f"WARNUNG: Kein Bildname für Team '{team_name}' gefunden. Überspringe Soldatenerstellung.")
-                    continue
-                
-                # Platzierung für 2 Soldaten pro Team
-                for i in range(2):
-                    new_soldier = {
-                        'id': f"{team_name}-soldier-{i+1}",
-                        'pos': (base_info['x'], base_info['y']),
-                        'team_name': team_name,
-                        'health': self.soldier_stats['health'],
-                        'sight_range': self.soldier_stats['sight_range'],
-                        'attack': self.soldier_stats['attack'],
-                        'attack_range': self.soldier_stats['attack_range'],
-                        'image': team_image_name,
-                        'respawn_timer': -1 # -1 bedeutet nicht im Respawn
-                    }
-                    self.soldiers.append(new_soldier)
-                    print(f"DEBUG: {new_soldier['id']} für {team_name} bei ({new_soldier['pos'][0]}, {new_soldier['pos'][1]}) platziert.")
-
-        # Aktualisiere die Soldaten, die gezeichnet werden sollen
-        self.game_area.update_soldiers_to_draw(self.soldiers)
-
+            base_pos = simulation.base_positions.get(team['name'])
+            if base_pos:
+                self.game_area.bases.append({
+                    'x': base_pos[0],
+                    'y': base_pos[1],
+                    'color': team['color'],
+                    'health': team['health'],
+                    'sight_range': team['sight_range'],
+                    'team_name': team['name']
+                })
+        self.game_area.update()
+
+    def update_ui_details(self, snapshot):
+        """Aktualisiert die UI-Elemente basierend auf einem Snapshot des Spielzustands."""
+        team_soldiers = {}
+        for soldier in snapshot.soldiers:
+            team_soldiers.setdefault(soldier.team, []).append(soldier)
+        for team_name, soldiers in team_soldiers.items():
+            if team_name not in self.team_ui_elements:
+                continue
+            ui = self.team_ui_elements[team_name]
+            ui['score_label'].setText(f"{team_name}: {snapshot.scores.get(team_name, 0)} Punkte | 0 Runden")
+            for i, (label, soldier) in enumerate(zip(ui['soldier_labels'], soldiers)):
+                if soldier.alive:
+                    label.setText(f"Soldat {i+1}: Health {soldier.health} | Attack {soldier.attack} | Range {soldier.attack_range}")
+                else:
+                    label.setText(f"Soldat {i+1}: respawning in {soldier.respawn_left:.1f}s")
@@ -1,9 +1,17 @@
 import sys
+import threading
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QSlider, QPushButton, QGroupBox, QHBoxLayout, QMessageBox
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 import os
 from ..game_logic.maze_generator import MazeGenerator
 
+# Kantenlängen der generierten Karten (ungerade, damit das Labyrinth einen Mauerrand hat).
+# Große Karten zeigt das Spielfeld als zoombaren Ausschnitt mit Minimap. Erzeugt wird
+# die Karte auf einem eigenen Thread (bei 2001x2001 einige Sekunden), die Simulation
+# baut später der SimulationWorker.
+MIN_MAP_SIZE = 15
+MAX_MAP_SIZE = 2001
+
 class MapSettingsDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -13,6 +21,10 @@ class MapSettingsDialog(QDialog):
         self.map_name = "MeineMap.map"
         self.map_width = 15
         self.map_height = 15
+        self._generator = None # Thread, der gerade eine Karte erzeugt
+        self._generation_error = None
+        self._generation_timer = QTimer(self)
+        self._generation_timer.timeout.connect(self._check_generation)
         
         self.init_ui()
 
@@ -33,8 +45,8 @@ class MapSettingsDialog(QDialog):
         
         self.width_slider_label = QLabel(f"Breite: {self.map_width}")
         self.width_slider = QSlider(Qt.Orientation.Horizontal)
-        self.width_slider.setMinimum(15)
-        self.width_slider.setMaximum(31)
+        self.width_slider.setMinimum(MIN_MAP_SIZE)
+        self.width_slider.setMaximum(MAX_MAP_SIZE)
         self.width_slider.setSingleStep(2)
         self.width_slider.setPageStep(2)
         self.width_slider.setValue(self.map_width)
@@ -42,8 +54,8 @@ class MapSettingsDialog(QDialog):
         
         self.height_slider_label = QLabel(f"Höhe: {self.map_height}")
         self.height_slider = QSlider(Qt.Orientation.Horizontal)
-        self.height_slider.setMinimum(15)
-        self.height_slider.setMaximum(31)
+        self.height_slider.setMinimum(MIN_MAP_SIZE)
+        self.height_slider.setMaximum(MAX_MAP_SIZE)
         self.height_slider.setSingleStep(2)
         self.height_slider.setPageStep(2)
         self.height_slider.setValue(self.map_height)
@@ -56,31 +68,35 @@ class MapSettingsDialog(QDialog):
         size_group.setLayout(size_layout)
         main_layout.addWidget(size_group)
 
+        self.status_label = QLabel("")
+        self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        main_layout.addWidget(self.status_label)
+
         # Buttons
         button_layout = QHBoxLayout()
-        ok_button = QPushButton("OK")
+        self.ok_button = QPushButton("OK")
         cancel_button = QPushButton("Abbrechen")
         
-        ok_button.clicked.connect(self.accept)
+        self.ok_button.clicked.connect(self.accept)
         cancel_button.clicked.connect(self.reject)
         
-        button_layout.addWidget(ok_button)
+        button_layout.addWidget(self.ok_button)
         button_layout.addWidget(cancel_button)
         main_layout.addLayout(button_layout)
         
     def _adjust_width_slider(self, value):
         if value % 2 == 0:
             value = value + 1
-            if value > 31:
-                value = 31
+            if value > MAX_MAP_SIZE:
+                value = MAX_MAP_SIZE
             self.width_slider.setValue(value)
         self.width_slider_label.setText(f"Breite: {value}")
 
     def _adjust_height_slider(self, value):
         if value % 2 == 0:
             value = value + 1
-            if value > 31:
-                value = 31
+            if value > MAX_MAP_SIZE:
+                value = MAX_MAP_SIZE
             self.height_slider.setValue(value)
         self.height_slider_label.setText(f"Höhe: {value}")
     
@@ -95,31 +111,56 @@ class MapSettingsDialog(QDialog):
         if not self.map_name:
             QMessageBox.warning(self, "Fehler", "Bitte gib einen Map-Namen ein.")
             return
-            
+        if self._generator is not None:
+            return # Es wird bereits eine Karte erzeugt
+
+        # Erzeugen und Speichern laufen auf einem eigenen Thread, damit die Oberfläche
+        # reagiert; ein Timer prüft, wann der Thread fertig ist
+        self.ok_button.setEnabled(False)
+        self.status_label.setText(f"Generiere Karte {self.map_width}x{self.map_height} ...")
+        self._generation_error = None
+        self._generator = threading.Thread(target=self._generate_map,
+                                           args=(self.map_name, self.map_width, self.map_height),
+                                           name="map-generator", daemon=True)
+        self._generator.start()
+        self._generation_timer.start(50)
+
+    def _generate_map(self, map_name, width, height):
+        """Läuft auf dem Generator-Thread: erzeugt die Karte und speichert sie."""
         try:
-            # Korrigierter Aufruf, um die statische Methode zu verwenden
-            maze_data = MazeGenerator.generate_maze(self.map_width, self.map_height)
+            maze_data = MazeGenerator.generate_maze(width, height)
             
             maps_path = os.path.join("src", "assets", "maps")
             os.makedirs(maps_path, exist_ok=True)
             
-            file_path = os.path.join(maps_path, self.map_name)
-            
-            # Korrigierter Aufruf, um die statische Methode zu verwenden
+            file_path = os.path.join(maps_path, map_name)
             MazeGenerator.save_map(maze_data, file_path)
+        except Exception as e:
+            self._generation_error = e
 
+    def _check_generation(self):
+        if self._generator is None or self._generator.is_alive():
+            return
+        self._generation_timer.stop()
+        self._generator = None
+        self.ok_button.setEnabled(True)
+        self.status_label.setText("")
+        if self._generation_error is None:
             QMessageBox.information(self, "Erfolg", f"Map '{self.map_name}' wurde erfolgreich mit den Maßen {self.map_width}x{self.map_height} gespeichert.")
             
             if self.parent():
                 self.parent().show()
             super().accept()
-        except Exception as e:
-            QMessageBox.critical(self, "Fehler", f"Ein Fehler ist aufgetreten: {e}")
+        else:
+            QMessageBox.critical(self, "Fehler", f"Ein Fehler ist aufgetreten: {self._generation_error}")
             if self.parent():
                 self.parent().show()
             super().reject()
 
     def reject(self):
+        # Eine laufende Erzeugung wird nicht abgebrochen, ihr Ergebnis aber nicht mehr gemeldet
+        self._generation_timer.stop()
+        self._generator = None
         if self.parent():
             self.parent().show()
         super().reject()
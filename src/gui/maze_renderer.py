@@ -0,0 +1,157 @@
+import collections
+import math
+import time
+import numpy as np
+from PyQt6.QtGui import QPixmap, QPainter, QColor, QImage
+from PyQt6.QtCore import Qt, QRectF
+from src.game_logic.grid import WALL
+
+FLOOR_COLOR = QColor(200, 200, 200) # Graue Wege
+WALL_FALLBACK_COLOR = QColor(0, 0, 0) # Mauern ohne Bild bzw. bei kleinen Zoomstufen
+
+# Zoomstufen (Pixel pro Zelle), für die Kacheln vorgerendert werden. Dazwischen
+# wird die nächstgrößere Stufe beim Blitten verkleinert.
+ZOOM_LEVELS = (0.25, 0.5, 1, 2, 4, 8, 16, 32)
+# Ab dieser Zoomstufe werden Mauern mit dem Mauerbild gezeichnet statt als Farbfläche
+WALL_SPRITE_MIN_LEVEL = 8
+# Kantenlänge einer Kachel in Pixeln (bei jeder Zoomstufe gleich)
+TILE_PIXELS = 256
+# Höchstens so viele Kacheln im Speicher (je 256 KB)
+MAX_TILES = 256
+# Zeit pro Frame zum Rendern neuer Kacheln; was danach fehlt, kommt im nächsten Frame
+TILE_TIME_BUDGET = 0.008
+MINIMAP_SIZE = 160
+
+
+def _rgba(color):
+    return [color.red(), color.green(), color.blue(), 255]
+
+
+class MazeRenderer:
+    """
+    Zeichnet das unveränderliche Labyrinth (Mauern und Wege) aus vorgerenderten
+    Kacheln. Jede Kachel ist TILE_PIXELS groß und deckt je nach Zoomstufe
+    unterschiedlich viele Zellen ab; gerendert wird sie beim ersten Gebrauch und
+    danach in einem LRU-Cache gehalten. Pro Frame werden nur die Kacheln
+    geblittet, die im sichtbaren Ausschnitt liegen, dadurch hängt die Zeit pro
+    Frame nicht von der Kartengröße ab. Neue Kacheln (z.B. nach einem Zoom)
+    werden nur bis TILE_TIME_BUDGET pro Frame gerendert, der Rest vorläufig aus
+    der gröbsten Zoomstufe hochskaliert. Dazu eine kleine Übersichtskarte (Minimap).
+    """
+    def __init__(self, grid, wall_pixmap=None):
+        self.grid = grid
+        self.wall_pixmap = wall_pixmap
+        self.walls = grid.cells == WALL
+        self._colors = np.array([_rgba(FLOOR_COLOR), _rgba(WALL_FALLBACK_COLOR)], dtype=np.uint8)
+        self._tiles = collections.OrderedDict() # (Zoomstufe, Kachel-x, Kachel-y) -> QPixmap
+        self._wall_sprites = {} # Zoomstufe -> skaliertes Mauerbild
+        self._minimap = None
+
+    def invalidate(self):
+        self._tiles.clear()
+        self._wall_sprites.clear()
+        self._minimap = None
+
+    @staticmethod
+    def level_for(cell_size):
+        """Kleinste vorgerenderte Zoomstufe, die mindestens `cell_size` Pixel pro Zelle hat."""
+        for level in ZOOM_LEVELS:
+            if level >= cell_size:
+                return level
+        return ZOOM_LEVELS[-1]
+
+    @staticmethod
+    def cells_per_tile(level):
+        return int(TILE_PIXELS / level)
+
+    def _wall_sprite(self, level):
+        sprite = self._wall_sprites.get(level)
+        if sprite is None:
+            sprite = self.wall_pixmap.scaled(level, level, Qt.AspectRatioMode.KeepAspectRatio,
+                                             Qt.TransformationMode.SmoothTransformation)
+            self._wall_sprites[level] = sprite
+        return sprite
+
+    def tile(self, level, tile_x, tile_y):
+        key = (level, tile_x, tile_y)
+        pixmap = self._tiles.get(key)
+        if pixmap is None:
+            pixmap = self._render_tile(level, tile_x, tile_y)
+            self._tiles[key] = pixmap
+            if len(self._tiles) > MAX_TILES:
+                self._tiles.popitem(last=False)
+        else:
+            self._tiles.move_to_end(key)
+        return pixmap
+
+    def _render_tile(self, level, tile_x, tile_y):
+        cells = self.cells_per_tile(level)
+        x0, y0 = tile_x * cells, tile_y * cells
+        walls = self.walls[y0:y0 + cells, x0:x0 + cells]
+        if level < 1:
+            # Ein Pixel pro 1/level Zellen (nächster Nachbar)
+            step = int(1 / level)
+            pixels = self._colors[walls[::step, ::step].astype(np.uint8)]
+        else:
+            pixels = self._colors[walls.astype(np.uint8)]
+            pixels = np.repeat(np.repeat(pixels, level, axis=0), level, axis=1)
+        pixels = np.ascontiguousarray(pixels)
+        height, width = pixels.shape[:2]
+        image = QImage(pixels.data, width, height, width * 4, QImage.Format.Format_RGBA8888)
+        pixmap = QPixmap.fromImage(image.copy())
+
+        if level >= WALL_SPRITE_MIN_LEVEL and self.wall_pixmap is not None and not self.wall_pixmap.isNull():
+            sprite = self._wall_sprite(level)
+            painter = QPainter(pixmap)
+            for row_idx, col_idx in np.argwhere(walls).tolist():
+                painter.drawPixmap(col_idx * level, row_idx * level, sprite)
+            painter.end()
+        return pixmap
+
+    def draw(self, painter, view_x, view_y, cell_size, width, height):
+        """
+        Blittet die sichtbaren Kacheln. (view_x, view_y) ist die Zelle (als
+        Kommazahl) in der linken oberen Ecke des Widgets. Gibt False zurück, wenn
+        noch Kacheln vorläufig gezeichnet wurden (dann bald erneut zeichnen).
+        """
+        deadline = time.perf_counter() + TILE_TIME_BUDGET
+        complete = True
+        level = self.level_for(cell_size)
+        cells = self.cells_per_tile(level)
+        first_x = max(int(view_x // cells), 0)
+        first_y = max(int(view_y // cells), 0)
+        last_x = min(int((view_x + width / cell_size) // cells), (self.grid.width - 1) // cells)
+        last_y = min(int((view_y + height / cell_size) // cells), (self.grid.height - 1) // cells)
+        for tile_y in range(first_y, last_y + 1):
+            for tile_x in range(first_x, last_x + 1):
+                x0, y0 = tile_x * cells, tile_y * cells
+                tile_width = min(cells, self.grid.width - x0)
+                tile_height = min(cells, self.grid.height - y0)
+                target = QRectF((x0 - view_x) * cell_size, (y0 - view_y) * cell_size,
+                                tile_width * cell_size, tile_height * cell_size)
+                if (level, tile_x, tile_y) not in self._tiles and level != ZOOM_LEVELS[0] \
+                        and time.perf_counter() > deadline:
+                    self._draw_coarse(painter, target, x0, y0, tile_width, tile_height)
+                    complete = False
+                    continue
+                pixmap = self.tile(level, tile_x, tile_y)
+                painter.drawPixmap(target, pixmap, QRectF(0, 0, tile_width * level, tile_height * level))
+        return complete
+
+    def _draw_coarse(self, painter, target, x0, y0, tile_width, tile_height):
+        # Jede Kachel liegt ganz in einer Kachel der gröbsten Zoomstufe (die Kachelgrößen teilen sich)
+        level = ZOOM_LEVELS[0]
+        cells = self.cells_per_tile(level)
+        pixmap = self.tile(level, x0 // cells, y0 // cells)
+        painter.drawPixmap(target, pixmap, QRectF((x0 % cells) * level, (y0 % cells) * level,
+                                                  tile_width * level, tile_height * level))
+
+    def minimap(self):
+        """Übersichtskarte mit höchstens MINIMAP_SIZE Pixeln Kantenlänge (einmal pro Karte)."""
+        if self._minimap is None:
+            step = max(1, math.ceil(max(self.grid.width, self.grid.height) / MINIMAP_SIZE))
+            pixels = np.ascontiguousarray(self._colors[self.walls[::step, ::step].astype(np.uint8)])
+            height, width = pixels.shape[:2]
+            image = QImage(pixels.data, width, height, width * 4, QImage.Format.Format_RGBA8888)
+            self._minimap = (QPixmap.fromImage(image.copy()), step)
+        return self._minimap
@@ -0,0 +1,158 @@
+import os
+from PyQt6.QtGui import QPixmap, QPainter, QImage
+from PyQt6.QtCore import Qt, QRect
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'images')
+
+# Die einzige Zuordnung Sprite -> Bilddatei. Sprite-Namen sind die Item-Typen der
+# Spiellogik ('red pill', 'binoculars', ...), damit nichts umbenannt werden muss.
+# fake-flag.png ist eine unbenutzte Dublette von fake_flag.png.
+SPRITE_FILES = {
+    'wall': 'wall.png',
+    'flag': 'flag.png',
+    'knife': 'knife.png',
+    'gun': 'gun.png',
+    'grenade': 'grenade.png',
+    'nuke': 'nuke.png',
+    'pink duck': 'pink_duck.png',
+    'red pill': 'redpill.png',
+    'blue pill': 'bluepill.png',
+    'fake_flag': 'fake_flag.png',
+    'binoculars': 'binoculars.png',
+    'soldier-red': 'soldier-red.png',
+    'soldier-blue': 'soldier-blue.png',
+    'soldier-green': 'soldier-green.png',
+    'soldier-pink': 'soldier-pink.png',
+    'soldier-gold': 'soldier-gold.png',
+}
+
+# Abweichende Schreibweisen (Dateinamen, alte Bildnamen der Karte) -> Sprite-Name
+SPRITE_ALIASES = {
+    'pink_duck': 'pink duck',
+    'redpill': 'red pill',
+    'bluepill': 'blue pill',
+    'fake flag': 'fake_flag',
+    'fake-flag': 'fake_flag',
+    'fernglas': 'binoculars',
+}
+
+# Teamname -> Soldaten-Sprite
+TEAM_SPRITES = {
+    'Team Rot': 'soldier-red',
+    'Team Blau': 'soldier-blue',
+    'Team Grün': 'soldier-green',
+    'Team Pink': 'soldier-pink',
+    'Team Gold': 'soldier-gold',
+}
+
+ATLAS_MAX_WIDTH = 2048
+
+
+def sprite_name(name):
+    return SPRITE_ALIASES.get(name, name)
+
+
+class SpriteManager:
+    """
+    Lädt alle Bilder einmal pro Prozess in einen gepackten Atlas (eine QPixmap,
+    Regale von links nach rechts). Für jede Pixelgröße entsteht daraus einmal ein
+    skalierter Atlas, in dem jedes Sprite ein Quadrat dieser Größe belegt; `draw`
+    blittet daraus mit dem Quellrechteck des Sprites. Pro Frame wird damit nur
+    geblittet, nicht skaliert, und alle Sprites kommen aus derselben Pixmap.
+    Ändert sich die Zellgröße, werden die skalierten Atlanten verworfen.
+    Braucht eine laufende QApplication; `instance()` legt ihn beim ersten Aufruf an.
+    """
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, files=None, images_dir=IMAGES_DIR):
+        self.atlas = None
+        self.rects = {} # Sprite -> Rechteck im Atlas
+        self.slots = {} # Sprite -> Platz im skalierten Atlas
+        self._scaled = {} # Pixelgröße -> skalierter Atlas
+        self.cell_size = None
+        self._build_atlas(files or SPRITE_FILES, images_dir)
+
+    def _build_atlas(self, files, images_dir):
+        images = {}
+        for name, file_name in files.items():
+            path = os.path.join(images_dir, file_name)
+            image = QImage(path)
+            if image.isNull():
+                print(f"FEHLER: Bilddatei für '{name}' nicht gefunden oder fehlerhaft: {path}")
+                continue
+            images[name] = image
+
+        # Regal-Packung: nach Höhe sortiert, Zeile für Zeile bis ATLAS_MAX_WIDTH
+        x = y = shelf_height = width = 0
+        for name, image in sorted(images.items(), key=lambda entry: -entry[1].height()):
+            if x > 0 and x + image.width() > ATLAS_MAX_WIDTH:
+                x, y = 0, y + shelf_height
+                shelf_height = 0
+            self.rects[name] = QRect(x, y, image.width(), image.height())
+            x += image.width()
+            width = max(width, x)
+            shelf_height = max(shelf_height, image.height())
+
+        atlas = QImage(max(width, 1), max(y + shelf_height, 1), QImage.Format.Format_ARGB32_Premultiplied)
+        atlas.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(atlas)
+        for name, rect in self.rects.items():
+            painter.drawImage(rect.topLeft(), images[name])
+        painter.end()
+        self.atlas = QPixmap.fromImage(atlas)
+        self.slots = {name: slot for slot, name in enumerate(sorted(self.rects))}
+
+    def has(self, name):
+        return sprite_name(name) in self.rects
+
+    def pixmap(self, name):
+        """
+        Ungeskaliertes Sprite als eigene Pixmap (Kopie aus dem Atlas) oder None,
+        wenn es kein Bild dafür gibt. Für einmalige Verwendung, z.B. Kacheln.
+        """
+        name = sprite_name(name)
+        if name not in self.rects:
+            return None
+        return self.atlas.copy(self.rects[name])
+
+    def set_cell_size(self, cell_size):
+        """Verwirft die skalierten Sprites, wenn sich die Zellgröße der Karte ändert."""
+        if cell_size != self.cell_size:
+            self.cell_size = cell_size
+            self._scaled.clear()
+
+    def _scaled_atlas(self, size):
+        """Atlas mit allen Sprites als Quadrate von `size` Pixeln (einmal pro Größe skaliert)."""
+        atlas = self._scaled.get(size)
+        if atlas is None:
+            columns = max(1, min(len(self.slots), ATLAS_MAX_WIDTH // size))
+            rows = -(-len(self.slots) // columns)
+            atlas = QPixmap(columns * size, max(rows, 1) * size)
+            atlas.fill(Qt.GlobalColor.transparent)
+            painter = QPainter(atlas)
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            for name, slot in self.slots.items():
+                target = QRect((slot % columns) * size, (slot // columns) * size, size, size)
+                painter.drawPixmap(target, self.atlas, self.rects[name])
+            painter.end()
+            self._scaled[size] = atlas
+        return atlas
+
+    def draw(self, painter, name, x, y, size):
+        """
+        Blittet das Sprite als Quadrat mit `size` Pixeln Kantenlänge an (x, y) aus
+        dem skalierten Atlas. Gibt False zurück, wenn es kein Bild dafür gibt.
+        """
+        slot = self.slots.get(sprite_name(name))
+        if slot is None or size <= 0:
+            return False
+        atlas = self._scaled_atlas(size)
+        columns = atlas.width() // size
+        painter.drawPixmap(x, y, atlas, (slot % columns) * size, (slot // columns) * size, size, size)
+        return True
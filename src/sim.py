@@ -0,0 +1,66 @@
+"""
+Startet Partien ohne Oberfläche (kein PyQt6 nötig), z.B. für Training und Benchmarks:
+
+    python -m src.sim --map 31test.map --teams "Team Rot,Team Blau" --seed 1
+    python -m src.sim --matches 32 --workers 8 --ai-models "Torch,BFS"
+"""
+import argparse
+import time
+from src.game_logic.match_runner import make_spec, run_matches, aggregate
+from src.utils.config import ConfigManager
+
+
+def parse_args(argv=None):
+    settings = ConfigManager().load_settings()
+    parser = argparse.ArgumentParser(description="MAZE-AI WAR ohne Oberfläche simulieren.")
+    parser.add_argument('--map', default='31test.map', help="Kartendatei (Name in assets/maps oder Pfad)")
+    parser.add_argument('--teams', default="Team Rot,Team Blau", help="Kommagetrennte Teamnamen")
+    parser.add_argument('--ai-models', default="",
+                        help="Kommagetrennt pro Team: Torch, TensorFlow, LLM oder BFS (Standard: BFS)")
+    parser.add_argument('--best-of', type=int, default=settings.get('best_of', 3), help="Anzahl Runden pro Partie")
+    parser.add_argument('--round-time', type=float, default=settings.get('round_time', 5),
+                        help="Rundenzeit in Minuten (Spielzeit)")
+    parser.add_argument('--ticks', type=int, default=None, help="Höchstens so viele Ticks pro Runde")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--soldiers', type=int, default=2, help="Soldaten pro Team")
+    parser.add_argument('--matches', type=int, default=1, help="Anzahl Partien")
+    parser.add_argument('--workers', type=int, default=1, help="Prozesse (0 = alle Kerne)")
+    parser.add_argument('--verbose', action='store_true', help="Spielmeldungen ausgeben")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    team_names = [name.strip() for name in args.teams.split(',') if name.strip()]
+    ai_models = [model.strip() for model in args.ai_models.split(',')] if args.ai_models else []
+    teams = [{'name': name, 'ai_model': ai_models[i] if i < len(ai_models) else 'BFS'}
+             for i, name in enumerate(team_names)]
+
+    specs = []
+    for match_no in range(args.matches):
+        # Jede Partie bekommt eigene Seeds für ihre Runden
+        seed = None if args.seed is None else args.seed + match_no * args.best_of
+        specs.append(make_spec(args.map, teams, seed=seed, best_of=args.best_of, max_ticks=args.ticks,
+                               soldiers_per_team=args.soldiers, round_duration=args.round_time * 60))
+
+    start = time.perf_counter()
+    results = []
+    for match in run_matches(specs, max_workers=args.workers or None, verbose=args.verbose):
+        results.append(match)
+        for round_no, result in enumerate(match['rounds'], start=1):
+            print(f"Seed {match['spec']['seed']} Runde {round_no}: Sieger {result['winner'] or 'unentschieden'} | "
+                  f"Punkte {result['scores']} | Kills {result['kills']} | "
+                  f"{result['ticks']} Ticks ({result['elapsed']:.0f}s Spielzeit)")
+        print(f"Partie: Sieger {match['winner'] or 'unentschieden'} | Rundensiege {match['wins']}")
+    duration = time.perf_counter() - start
+
+    totals = aggregate(results)
+    if args.matches > 1:
+        print(f"Gesamt: {totals['matches']} Partien, {totals['rounds']} Runden | Partiesiege {totals['match_wins']} | "
+              f"Rundensiege {totals['round_wins']} | Punkte {totals['scores']} | Kills {totals['kills']}")
+    print(f"INFO: {totals['ticks']} Ticks in {duration:.2f}s ({totals['ticks'] / max(duration, 1e-9):.0f} Ticks/s)")
+    return totals
+
+
+if __name__ == '__main__':
+    main()
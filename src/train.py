@@ -0,0 +1,43 @@
+"""
+Trainiert den Torch-Agenten per Self-Play ohne Oberfläche (nur CPU):
+
+    python -m src.train --updates 20000
+    python -m src.train --actors 6 --envs 64 --map 31test.map
+"""
+import argparse
+from src.agents.self_play import DEFAULT_CONFIG, train
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Self-Play-Training für den Torch-Agenten von MAZE-AI WAR.")
+    parser.add_argument('--map', default=DEFAULT_CONFIG['map'], help="Kartendatei (Name in assets/maps oder Pfad)")
+    parser.add_argument('--actors', type=int, default=DEFAULT_CONFIG['actors'],
+                        help="Actor-Prozesse (0 = alle Kerne bis auf einen)")
+    parser.add_argument('--envs', type=int, default=DEFAULT_CONFIG['envs_per_actor'], help="Partien pro Actor")
+    parser.add_argument('--updates', type=int, default=DEFAULT_CONFIG['updates'], help="Lernschritte insgesamt")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_CONFIG['batch_size'])
+    parser.add_argument('--lr', type=float, default=DEFAULT_CONFIG['learning_rate'])
+    parser.add_argument('--gamma', type=float, default=DEFAULT_CONFIG['gamma'])
+    parser.add_argument('--publish-every', type=int, default=DEFAULT_CONFIG['publish_every'],
+                        help="Updates zwischen zwei Gewichts-Veröffentlichungen an die Actors")
+    parser.add_argument('--checkpoint-every', type=int, default=DEFAULT_CONFIG['checkpoint_every'])
+    parser.add_argument('--buffer-capacity', type=int, default=DEFAULT_CONFIG['buffer_capacity'],
+                        help="Übergänge im Replay-Puffer insgesamt (über alle Actors)")
+    parser.add_argument('--buffer-path', default=DEFAULT_CONFIG['buffer_path'],
+                        help="Verzeichnis für den Replay-Puffer als memmap statt im Arbeitsspeicher")
+    parser.add_argument('--model', default=DEFAULT_CONFIG['model_file'], help="Modelldatei in models/")
+    parser.add_argument('--seed', type=int, default=DEFAULT_CONFIG['seed'])
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    return train(map=args.map, actors=args.actors, envs_per_actor=args.envs, updates=args.updates,
+                 batch_size=args.batch_size, learning_rate=args.lr, gamma=args.gamma,
+                 publish_every=args.publish_every, checkpoint_every=args.checkpoint_every,
+                 buffer_capacity=args.buffer_capacity, buffer_path=args.buffer_path,
+                 model_file=args.model, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()